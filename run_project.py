@@ -174,6 +174,19 @@ class ProjetoRedes:
                 print("ou use a opção 8 (Executar tudo) para executar testes e análises automaticamente.")
                 return False
     
+    def executar_benchmark_local(self):
+        #Executa a matriz de testes com servidores locais no loopback (sem Docker)
+        print("")
+        print("=== Executando benchmark local (sem Docker) ===")
+        
+        try:
+            subprocess.run([sys.executable, 'testes/harness_local.py'], check=True)
+            print(Cores.sucesso("Benchmark local concluído"))
+            return True
+        except subprocess.CalledProcessError:
+            print(Cores.erro("Falha no benchmark local"))
+            return False
+    
     def parar_conteineres(self):
         #Para contêineres
         print("")
@@ -260,14 +273,15 @@ class ProjetoRedes:
             'analisar': self.gerar_analises,
             'shell': self.entrar_conteiner_teste,
             'all': self.executar_tudo,
-            'tudo': self.executar_tudo
+            'tudo': self.executar_tudo,
+            'local': self.executar_benchmark_local
         }
         
         if comando in comandos:
             return comandos[comando]()
         else:
             print(f"Opção inválida: {comando}")
-            print("Opções: iniciar, conectividade, teste-completo, analisar, shell, tudo")
+            print("Opções: iniciar, conectividade, teste-completo, analisar, shell, tudo, local")
             return False
     
     def menu_interativo(self):
@@ -308,6 +322,10 @@ class ProjetoRedes:
 def main():
     projeto = ProjetoRedes()
     
+    #O benchmark local não depende do Docker
+    if len(sys.argv) > 1 and sys.argv[1] == 'local':
+        sys.exit(0 if projeto.executar_benchmark_local() else 1)
+    
     #Verifica Docker
     if not projeto.verificar_docker():
         print("Não é possível continuar sem Docker funcionando")
@@ -323,7 +341,7 @@ def main():
         parser.add_argument('comando', choices=[
             'start', 'iniciar', 'conectividade', 'teste-conectividade',
             'full-test', 'teste-completo', 'analyze', 'analisar',
-            'shell', 'all', 'tudo'
+            'shell', 'all', 'tudo', 'local'
         ], help='Comando para executar')
         
         args = parser.parse_args()
@@ -0,0 +1,146 @@
+#Balanceamento de carga entre réplicas do servidor (upstreams) usado pelo proxy reverso
+#Estratégias: round-robin, menos conexões e duas escolhas aleatórias (power of two choices)
+#Cada upstream mantém um pool de conexões keep-alive ociosas e é ejetado por um tempo após falhas seguidas
+#(verificação de saúde passiva: só as requisições reais contam, não há sondas periódicas)
+
+import time
+import random
+import socket
+import threading
+
+class Upstream:
+    def __init__(self, host, porta, tamanho_pool):
+        self.host = host
+        self.porta = porta
+        self.tamanho_pool = tamanho_pool
+        self.pool = []  #(conexão, instante da devolução) ociosas (LIFO: a mais recente tem menos chance de ter sido fechada)
+        self.ativas = 0  #Requisições em andamento neste upstream
+        self.requisicoes = 0
+        self.falhas = 0
+        self.falhas_seguidas = 0
+        self.ejecoes = 0
+        self.ejetado_ate = 0.0
+        self.conexoes_abertas = 0  #Conexões novas (as demais reaproveitaram o pool)
+
+    def endereco(self):
+        return f"{self.host}:{self.porta}"
+
+    def disponivel(self, agora):
+        return agora >= self.ejetado_ate
+
+class BalanceadorCarga:
+    ESTRATEGIAS = ('round_robin', 'menos_conexoes', 'duas_escolhas')
+
+    def __init__(self, enderecos, estrategia='round_robin', tamanho_pool=32, falhas_para_ejecao=3, tempo_ejecao=10,
+                 timeout_conexao=2, tempo_ocioso_pool=4):
+        if estrategia not in self.ESTRATEGIAS:
+            raise ValueError(f"Estratégia desconhecida: {estrategia} (use {', '.join(self.ESTRATEGIAS)})")
+        if not enderecos:
+            raise ValueError("Nenhum upstream informado")
+        self.upstreams = [Upstream(host, porta, tamanho_pool) for host, porta in enderecos]
+        self.estrategia = estrategia
+        self.falhas_para_ejecao = falhas_para_ejecao
+        self.tempo_ejecao = tempo_ejecao
+        self.timeout_conexao = timeout_conexao
+        #Conexões ociosas há mais tempo que isso não são reaproveitadas: o upstream fecha as suas após o próprio
+        #tempo ocioso (TEMPO_OCIOSO_KEEPALIVE) e a requisição enviada nelas receberia só o EOF
+        self.tempo_ocioso_pool = tempo_ocioso_pool
+        self.lock = threading.Lock()
+        self.proximo = 0  #Posição do round-robin
+
+    def escolher(self, excluidos=()):
+        #Reserva um upstream disponível (incrementa ativas); retorna None se todos estiverem ejetados ou excluídos
+        #Com todos ejetados, usa o que sai da ejeção primeiro em vez de recusar tudo (evita que falhas curtas derrubem o proxy)
+        agora = time.monotonic()
+        with self.lock:
+            candidatos = [u for u in self.upstreams if u not in excluidos]
+            if not candidatos:
+                return None
+            saudaveis = [u for u in candidatos if u.disponivel(agora)]
+            if not saudaveis:
+                saudaveis = [min(candidatos, key=lambda u: u.ejetado_ate)]
+
+            if self.estrategia == 'round_robin':
+                escolhido = saudaveis[self.proximo % len(saudaveis)]
+                self.proximo += 1
+            elif self.estrategia == 'menos_conexoes':
+                menor = min(u.ativas for u in saudaveis)
+                empatados = [u for u in saudaveis if u.ativas == menor]
+                escolhido = empatados[self.proximo % len(empatados)]  #Desempate rotativo
+                self.proximo += 1
+            else:
+                #Duas escolhas aleatórias: quase o equilíbrio de menos_conexoes sem varrer todos os upstreams
+                a, b = random.sample(saudaveis, 2) if len(saudaveis) > 1 else (saudaveis[0], saudaveis[0])
+                escolhido = a if a.ativas <= b.ativas else b
+
+            escolhido.ativas += 1
+            escolhido.requisicoes += 1
+            return escolhido
+
+    def obter_conexao(self, upstream):
+        #Retorna (socket, reaproveitada); conexões do pool podem ter sido fechadas pelo upstream enquanto ociosas
+        expiradas = []
+        with self.lock:
+            if upstream.pool:
+                conexao, devolvida_em = upstream.pool.pop()
+                if time.monotonic() - devolvida_em <= self.tempo_ocioso_pool:
+                    return conexao, True
+                #A mais recente expirou, então as demais (mais antigas) também
+                expiradas = [conexao] + [antiga for antiga, _ in upstream.pool]
+                upstream.pool = []
+        for conexao in expiradas:
+            conexao.close()
+        #Erros e timeouts do connect propagam como OSError (só conexões estabelecidas entram na contagem)
+        conexao = socket.create_connection((upstream.host, upstream.porta), timeout=self.timeout_conexao)
+        conexao.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        with self.lock:
+            upstream.conexoes_abertas += 1
+        return conexao, False
+
+    def devolver_conexao(self, upstream, conexao, reutilizavel):
+        #Devolve ao pool (se couber e o upstream aceitou keep-alive) ou fecha
+        if reutilizavel:
+            with self.lock:
+                if len(upstream.pool) < upstream.tamanho_pool:
+                    upstream.pool.append((conexao, time.monotonic()))
+                    return
+        conexao.close()
+
+    def liberar(self, upstream, sucesso):
+        #Fim da requisição: atualiza ativas e a saúde passiva do upstream
+        descartadas = []
+        with self.lock:
+            upstream.ativas -= 1
+            if sucesso:
+                upstream.falhas_seguidas = 0
+                return
+            upstream.falhas += 1
+            upstream.falhas_seguidas += 1
+            if upstream.falhas_seguidas >= self.falhas_para_ejecao:
+                upstream.ejetado_ate = time.monotonic() + self.tempo_ejecao
+                upstream.falhas_seguidas = 0
+                upstream.ejecoes += 1
+                descartadas, upstream.pool = upstream.pool, []  #Conexões de um upstream com falha não são reaproveitadas
+        for conexao, _ in descartadas:
+            conexao.close()
+
+    def estatisticas(self):
+        agora = time.monotonic()
+        with self.lock:
+            return {
+                "estrategia": self.estrategia,
+                "upstreams": [{
+                    "endereco": u.endereco(),
+                    "ativas": u.ativas,
+                    "requisicoes": u.requisicoes,
+                    "falhas": u.falhas,
+                    "ejecoes": u.ejecoes,
+                    "ejetado": not u.disponivel(agora),
+                    "conexoes_ociosas": len(u.pool),
+                    "conexoes_abertas": u.conexoes_abertas
+                } for u in self.upstreams]
+            }
+
+    def descricao(self):
+        return (f"{self.estrategia} entre {', '.join(u.endereco() for u in self.upstreams)} "
+                f"(pool {self.upstreams[0].tamanho_pool}, ejeção após {self.falhas_para_ejecao} falhas por {self.tempo_ejecao}s)")
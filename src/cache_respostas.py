@@ -0,0 +1,134 @@
+#Cache em processo do conteúdo das rotas, compartilhado pelos servidores sequencial e concorrente
+#Entradas expiram após o TTL da rota; durante a janela stale-while-revalidate a entrada vencida ainda é servida
+#enquanto uma thread recalcula o conteúdo. O total é limitado em bytes (tamanho do JSON) com expulsão LRU
+#Só o conteúdo da rota é guardado: os campos por requisição da resposta continuam individuais
+
+import json
+import time
+import threading
+from collections import OrderedDict
+
+class EntradaCache:
+    def __init__(self, conteudo, tamanho, ttl):
+        self.conteudo = conteudo
+        self.tamanho = tamanho
+        self.ttl = ttl
+        self.criada_em = time.monotonic()
+        self.revalidando = False
+
+    def idade(self):
+        return time.monotonic() - self.criada_em
+
+def interpretar_cache_control(valor):
+    #'no-cache, max-age=5' -> {'no-cache': None, 'max-age': 5}
+    diretivas = {}
+    for parte in (valor or '').split(','):
+        nome, _, argumento = parte.strip().lower().partition('=')
+        if not nome:
+            continue
+        try:
+            diretivas[nome] = int(argumento.strip('"')) if argumento else None
+        except ValueError:
+            diretivas[nome] = None
+    return diretivas
+
+class CacheRespostas:
+    def __init__(self, capacidade_bytes, ttl, janela_obsoleta):
+        self.capacidade_bytes = capacidade_bytes
+        self.ttl = ttl  #TTL padrão das rotas sem ttl_cache próprio
+        self.janela_obsoleta = janela_obsoleta  #Segundos após o TTL em que a entrada ainda é servida (stale-while-revalidate)
+        self.lock = threading.Lock()
+        self.entradas = OrderedDict()  #chave -> EntradaCache, da menos para a mais recentemente usada
+        self.bytes_ocupados = 0
+        self.acertos = 0
+        self.falhas = 0
+        self.obsoletos = 0  #Servidos vencidos enquanto revalidavam
+        self.ignorados = 0  #Requisições com Cache-Control: no-cache/no-store
+        self.revalidacoes = 0
+        self.expulsoes = 0
+
+    def obter(self, chave, funcao, cabecalhos_requisicao=None, ttl=None):
+        #Retorna (conteudo, estado, idade); estado é HIT, MISS, STALE ou BYPASS
+        #Exceções de funcao (ex.: ErroHTTP) são propagadas e nada é guardado
+        ttl = self.ttl if ttl is None else ttl
+        diretivas = interpretar_cache_control((cabecalhos_requisicao or {}).get('Cache-Control'))
+        if 'no-cache' in diretivas or 'no-store' in diretivas:
+            with self.lock:
+                self.ignorados += 1
+            conteudo = funcao()
+            if 'no-store' not in diretivas:
+                self.guardar(chave, conteudo, ttl)
+            return conteudo, 'BYPASS', 0
+
+        idade_maxima = diretivas.get('max-age')
+        with self.lock:
+            entrada = self.entradas.get(chave)
+            if entrada is not None:
+                idade = entrada.idade()
+                aceita_cliente = idade_maxima is None or idade <= idade_maxima
+                if idade <= entrada.ttl and aceita_cliente:
+                    self.entradas.move_to_end(chave)
+                    self.acertos += 1
+                    return entrada.conteudo, 'HIT', idade
+                if idade <= entrada.ttl + self.janela_obsoleta and aceita_cliente:
+                    self.entradas.move_to_end(chave)
+                    self.obsoletos += 1
+                    if not entrada.revalidando:
+                        entrada.revalidando = True
+                        self.revalidacoes += 1
+                        threading.Thread(target=self.revalidar, args=(chave, funcao, ttl), daemon=True).start()
+                    return entrada.conteudo, 'STALE', idade
+            self.falhas += 1
+
+        conteudo = funcao()
+        self.guardar(chave, conteudo, ttl)
+        return conteudo, 'MISS', 0
+
+    def revalidar(self, chave, funcao, ttl):
+        #Recalcula em segundo plano; em caso de erro a entrada vencida continua até sair da janela
+        try:
+            conteudo = funcao()
+        except Exception:
+            with self.lock:
+                entrada = self.entradas.get(chave)
+                if entrada is not None:
+                    entrada.revalidando = False
+            return
+        self.guardar(chave, conteudo, ttl)
+
+    def guardar(self, chave, conteudo, ttl):
+        if ttl <= 0:
+            return
+        tamanho = len(json.dumps(conteudo))
+        if tamanho > self.capacidade_bytes:
+            return  #Maior que o cache inteiro: não expulsa tudo por uma única entrada
+        with self.lock:
+            anterior = self.entradas.pop(chave, None)
+            if anterior is not None:
+                self.bytes_ocupados -= anterior.tamanho
+            self.entradas[chave] = EntradaCache(conteudo, tamanho, ttl)
+            self.bytes_ocupados += tamanho
+            while self.bytes_ocupados > self.capacidade_bytes:
+                _, expulsa = self.entradas.popitem(last=False)
+                self.bytes_ocupados -= expulsa.tamanho
+                self.expulsoes += 1
+
+    def cabecalho_cache_control(self, ttl=None):
+        ttl = self.ttl if ttl is None else ttl
+        return f"max-age={int(ttl)}, stale-while-revalidate={int(self.janela_obsoleta)}"  #Cache-Control só aceita segundos inteiros
+
+    def estatisticas(self):
+        with self.lock:
+            consultas = self.acertos + self.obsoletos + self.falhas
+            return {
+                "entradas": len(self.entradas),
+                "bytes": self.bytes_ocupados,
+                "capacidade_bytes": self.capacidade_bytes,
+                "acertos": self.acertos,
+                "falhas": self.falhas,
+                "obsoletos": self.obsoletos,
+                "ignorados": self.ignorados,
+                "revalidacoes": self.revalidacoes,
+                "expulsoes": self.expulsoes,
+                "taxa_acerto": (self.acertos + self.obsoletos) / consultas if consultas else 0.0
+            }
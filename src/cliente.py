@@ -4,12 +4,15 @@ import socket
 import time
 import json
 import threading
-from configuracao import ID_CUSTOMIZADO, PORTA_SERVIDOR
+from configuracao import ID_CUSTOMIZADO, PORTA_SERVIDOR, PREFIXO_UNIX
+from protocolo import interpretar_resposta, interpretar_server_timing
 
 class ClienteHTTP:
     def __init__(self, host_servidor, porta_servidor=PORTA_SERVIDOR):
         self.host_servidor = host_servidor
         self.porta_servidor = porta_servidor
+        #host_servidor 'unix:/caminho' conecta por AF_UNIX (a porta é ignorada)
+        self.caminho_unix = host_servidor[len(PREFIXO_UNIX):] if host_servidor.startswith(PREFIXO_UNIX) else None
         
     def enviar_requisicao(self, metodo='GET', caminho='/', cabecalhos=None, corpo=None):
         #Envia uma requisição HTTP para o servidor
@@ -18,24 +21,26 @@ class ClienteHTTP:
         
         #Adiciona o cabeçalho customizado obrigatório
         cabecalhos['X-Custom-ID'] = ID_CUSTOMIZADO
-        cabecalhos['Host'] = f"{self.host_servidor}:{self.porta_servidor}"
+        cabecalhos['Host'] = 'localhost' if self.caminho_unix else f"{self.host_servidor}:{self.porta_servidor}"
         cabecalhos['Connection'] = 'close'
         
         try:
             #Cria conexão
-            socket_cliente = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+            familia = socket.AF_UNIX if self.caminho_unix else socket.AF_INET
+            socket_cliente = socket.socket(familia, socket.SOCK_STREAM)
             socket_cliente.settimeout(10)  #Timeout de 10 segundos
             
             tempo_inicio = time.time()
-            socket_cliente.connect((self.host_servidor, self.porta_servidor))
+            socket_cliente.connect(self.caminho_unix or (self.host_servidor, self.porta_servidor))
             tempo_conexao = time.time() - tempo_inicio
             
-            #Monta a requisição HTTP
+            #Monta a requisição HTTP (Content-Length antes dos cabeçalhos serem serializados)
+            if corpo:
+                cabecalhos['Content-Length'] = str(len(corpo.encode('utf-8')))
             linha_requisicao = f"{metodo} {caminho} HTTP/1.1\r\n"
             linhas_cabecalho = "\r\n".join([f"{chave}: {valor}" for chave, valor in cabecalhos.items()])
             
             if corpo:
-                cabecalhos['Content-Length'] = str(len(corpo))
                 requisicao = f"{linha_requisicao}{linhas_cabecalho}\r\n\r\n{corpo}"
             else:
                 requisicao = f"{linha_requisicao}{linhas_cabecalho}\r\n\r\n"
@@ -80,25 +85,7 @@ class ClienteHTTP:
             socket_cliente.close()
             
             #Parse da resposta
-            texto_resposta = dados_resposta.decode('utf-8')
-            
-            #Dicionário de cabeçalhos
-            cabecalhos = {}
-            
-            if "\r\n\r\n" in texto_resposta:
-                parte_cabecalhos, parte_corpo = texto_resposta.split("\r\n\r\n", 1)
-                linhas_cabecalhos = parte_cabecalhos.split('\r\n')
-                linha_status = linhas_cabecalhos[0]
-                codigo_status = int(linha_status.split(' ')[1])
-                
-                #Parse dos cabeçalhos
-                for linha in linhas_cabecalhos[1:]:
-                    if ': ' in linha:
-                        chave, valor = linha.split(': ', 1)
-                        cabecalhos[chave] = valor
-            else:
-                codigo_status = 0
-                parte_corpo = ""
+            codigo_status, cabecalhos, parte_corpo = interpretar_resposta(dados_resposta)
             
             return {
                 'codigo_status': codigo_status,
@@ -108,6 +95,7 @@ class ClienteHTTP:
                 'tempo_conexao': tempo_conexao,
                 'tempo_envio': tempo_envio,
                 'tempo_recepcao': tempo_recepcao,
+                'tempos_servidor': interpretar_server_timing(cabecalhos.get('Server-Timing', '')),
                 'sucesso': True
             }
             
@@ -120,6 +108,7 @@ class ClienteHTTP:
                 'tempo_conexao': 0,
                 'tempo_envio': 0,
                 'tempo_recepcao': 0,
+                'tempos_servidor': {},
                 'sucesso': False,
                 'erro': str(e)
             }
@@ -0,0 +1,66 @@
+#Coalescência de requisições idênticas em andamento (single-flight)
+#A primeira requisição de uma chave executa o manipulador; as que chegam enquanto ela está em andamento
+#aguardam e recebem o mesmo conteúdo (ou a mesma exceção). Nada é guardado depois que a execução termina
+
+import threading
+
+#Cabeçalhos que podem mudar o conteúdo e por isso entram na chave
+CABECALHOS_CHAVE = ('Accept', 'Accept-Encoding', 'Accept-Language')
+
+def chave_requisicao(metodo, caminho, cabecalhos):
+    #(método, alvo com query string, cabeçalhos relevantes)
+    return (metodo, caminho) + tuple(cabecalhos.get(nome, '') for nome in CABECALHOS_CHAVE)
+
+class ExecucaoEmAndamento:
+    def __init__(self):
+        self.concluida = threading.Event()
+        self.resultado = None
+        self.excecao = None
+
+class CoalescedorRequisicoes:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.em_andamento = {}  #chave -> ExecucaoEmAndamento
+        self.execucoes = 0  #Requisições que executaram o manipulador
+        self.coalescidas = 0  #Requisições atendidas pelo resultado de outra
+
+    def executar(self, chave, funcao):
+        #Retorna (resultado, compartilhado); compartilhado indica que outra requisição executou a função
+        with self.lock:
+            execucao = self.em_andamento.get(chave)
+            lider = execucao is None
+            if lider:
+                execucao = ExecucaoEmAndamento()
+                self.em_andamento[chave] = execucao
+                self.execucoes += 1
+            else:
+                self.coalescidas += 1
+
+        if not lider:
+            execucao.concluida.wait()
+            if execucao.excecao is not None:
+                raise execucao.excecao
+            return execucao.resultado, True
+
+        try:
+            execucao.resultado = funcao()
+            return execucao.resultado, False
+        except BaseException as excecao:
+            execucao.excecao = excecao
+            raise
+        finally:
+            #Remove antes de liberar: quem chegar depois executa de novo em vez de ler um resultado antigo
+            with self.lock:
+                del self.em_andamento[chave]
+            execucao.concluida.set()
+
+    def estatisticas(self):
+        with self.lock:
+            total = self.execucoes + self.coalescidas
+            return {
+                "requisicoes": total,
+                "execucoes": self.execucoes,
+                "coalescidas": self.coalescidas,
+                "razao_coalescencia": self.coalescidas / total if total else 0.0,
+                "em_andamento": len(self.em_andamento)
+            }
@@ -1,4 +1,5 @@
 import hashlib
+import os
 
 #Matrícula e informações do aluno
 MATRICULA = "20239057601"
@@ -14,9 +15,70 @@ SUB_REDE = f"{BASE_SUBNET}.0.0/16"
 IP_SERVIDOR = f"{BASE_SUBNET}.0.10"
 IP_BASE_CLIENTE = f"{BASE_SUBNET}.0"
 
+#Leitura de configurações a partir de variáveis de ambiente (usadas pelo docker-compose e pelos benchmarks)
+def ler_inteiro_ambiente(nome, padrao):
+    valor = os.environ.get(nome)
+    return int(valor) if valor not in (None, '') else padrao
+
+def ler_booleano_ambiente(nome, padrao):
+    valor = os.environ.get(nome)
+    if valor in (None, ''):
+        return padrao
+    return valor.strip().lower() in ('1', 'true', 'sim', 'yes', 'on')
+
+def ler_decimal_ambiente(nome, padrao):
+    valor = os.environ.get(nome)
+    return float(valor) if valor not in (None, '') else padrao
+
 #Configurações do servidor
-PORTA_SERVIDOR = 8080
+HOST_SERVIDOR = os.environ.get('HOST_SERVIDOR', '0.0.0.0')
+PORTA_SERVIDOR = ler_inteiro_ambiente('PORTA_SERVIDOR', 8080)  #0 = porta efêmera escolhida pelo sistema
 MAX_CONEXOES = 100
+SOCKET_UNIX = os.environ.get('SOCKET_UNIX', '')  #Caminho de um socket AF_UNIX no lugar do TCP (vazio = TCP)
+PREFIXO_UNIX = 'unix:'  #Endereços 'unix:/caminho' são aceitos pelo cliente e impressos pelos servidores
+
+#Opções de socket dos servidores
+BACKLOG_SEQUENCIAL = ler_inteiro_ambiente('BACKLOG_SEQUENCIAL', 1)  #Fila de conexões pendentes do listen()
+BACKLOG_CONCORRENTE = ler_inteiro_ambiente('BACKLOG_CONCORRENTE', MAX_CONEXOES)
+TCP_NODELAY_ATIVO = ler_booleano_ambiente('TCP_NODELAY', False)  #Desativa o algoritmo de Nagle nas conexões aceitas
+TAMANHO_BUFFER_RECEPCAO = ler_inteiro_ambiente('SO_RCVBUF', 0)  #0 = padrão do sistema operacional
+TAMANHO_BUFFER_ENVIO = ler_inteiro_ambiente('SO_SNDBUF', 0)  #0 = padrão do sistema operacional
+TCP_DEFER_ACCEPT_SEGUNDOS = ler_inteiro_ambiente('TCP_DEFER_ACCEPT', 0)  #0 = desativado (somente Linux)
+TCP_FASTOPEN_FILA = ler_inteiro_ambiente('TCP_FASTOPEN', 0)  #0 = desativado
+LOTE_ACCEPT = ler_inteiro_ambiente('LOTE_ACCEPT', 1)  #Máximo de conexões aceitas por rodada (1 = sem lote)
+TEMPO_OCIOSO_KEEPALIVE = ler_decimal_ambiente('TEMPO_OCIOSO_KEEPALIVE', 5)  #Espera por nova requisição (Connection: keep-alive)
+
+#Prazos por conexão em segundos (0 = sem prazo): encerram clientes lentos ou parados (ex.: slowloris)
+PRAZO_CABECALHOS = ler_decimal_ambiente('PRAZO_CABECALHOS', 10)  #Linha de requisição e cabeçalhos completos
+PRAZO_CORPO = ler_decimal_ambiente('PRAZO_CORPO', 30)  #Corpo (Content-Length) após os cabeçalhos
+PRAZO_ESCRITA = ler_decimal_ambiente('PRAZO_ESCRITA', 30)  #Resposta inteira consumida pelo cliente
+
+#Coalescência de GETs idênticos em andamento no servidor concorrente (single-flight; desativada por padrão)
+COALESCER_REQUISICOES = ler_booleano_ambiente('COALESCER', False)
+
+#Escalonamento por classe de rota no servidor concorrente: 'classe:limite,...' (vazio = desativado)
+#O limite é o número de manipuladores da classe executando ao mesmo tempo; o excedente espera em fila FIFO
+ESCALONADOR_CLASSES = os.environ.get('ESCALONADOR_CLASSES', '')  #Ex.: 'rapida:32,lenta:4'
+
+#Proxy reverso / balanceador entre réplicas (servidor_proxy.py)
+PROXY_UPSTREAMS = os.environ.get('PROXY_UPSTREAMS', '')  #'host:porta,host:porta,...'
+PROXY_ESTRATEGIA = os.environ.get('PROXY_ESTRATEGIA', 'round_robin')  #round_robin, menos_conexoes ou duas_escolhas
+PROXY_POOL = ler_inteiro_ambiente('PROXY_POOL', 32)  #Conexões keep-alive ociosas guardadas por upstream
+PROXY_FALHAS_EJECAO = ler_inteiro_ambiente('PROXY_FALHAS_EJECAO', 3)  #Falhas seguidas até ejetar o upstream
+PROXY_TEMPO_EJECAO = ler_decimal_ambiente('PROXY_TEMPO_EJECAO', 10)  #Segundos fora da rotação após a ejeção
+PROXY_TIMEOUT_UPSTREAM = ler_decimal_ambiente('PROXY_TIMEOUT_UPSTREAM', 30)  #Espera máxima pela resposta do upstream
+PROXY_OCIOSO_POOL = ler_decimal_ambiente('PROXY_OCIOSO_POOL', 4)  #Conexões ociosas há mais tempo são fechadas (abaixo do TEMPO_OCIOSO_KEEPALIVE das réplicas)
+
+#Cache de respostas das rotas cacheáveis, compartilhado pelos dois servidores (0 bytes = desativado)
+CACHE_BYTES = ler_inteiro_ambiente('CACHE_BYTES', 0)  #Limite total do conteúdo guardado (expulsão LRU)
+CACHE_TTL = ler_decimal_ambiente('CACHE_TTL', 5)  #Segundos em que uma entrada é servida como fresca
+CACHE_SWR = ler_decimal_ambiente('CACHE_SWR', 10)  #Segundos após o TTL servindo a entrada vencida enquanto revalida
+
+#Perfilador por amostragem (desativado por padrão; sem custo quando desligado)
+PERFILADOR_ATIVO = ler_booleano_ambiente('PERFILAR', False)
+PERFILADOR_TAXA_HZ = ler_inteiro_ambiente('PERFILAR_TAXA_HZ', 100)  #Amostras por segundo
+PERFILADOR_ARQUIVO = os.environ.get('PERFILAR_ARQUIVO', '')  #Vazio = resultados/perfil_<tipo>.folded
+PERFILADOR_INTERVALO_GRAVACAO = ler_inteiro_ambiente('PERFILAR_INTERVALO_GRAVACAO', 10)  #Segundos entre gravações parciais
 
 #Cabeçalho HTTP personalizado
 def gerar_id_personalizado():
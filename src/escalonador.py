@@ -0,0 +1,98 @@
+#Escalonamento por classe de rota no servidor concorrente
+#Cada classe (ex.: 'rapida', 'lenta') tem um orçamento próprio de manipuladores executando ao mesmo tempo e uma
+#fila FIFO para o excedente. Assim, quando as requisições lentas se acumulam, elas esperam na fila da própria
+#classe e não ocupam as vagas das rápidas (sem o escalonador toda conexão disputa a CPU e o GIL igualmente)
+
+import time
+import threading
+from collections import deque
+
+def interpretar_classes(texto):
+    #'rapida:32,lenta:4' -> {'rapida': 32, 'lenta': 4}
+    limites = {}
+    for item in texto.split(','):
+        item = item.strip()
+        if item:
+            nome, _, limite = item.partition(':')
+            if int(limite) < 1:
+                raise ValueError(f"Limite da classe {nome} deve ser ao menos 1")
+            limites[nome.strip()] = int(limite)
+    return limites
+
+class ClasseEscalonamento:
+    def __init__(self, nome, limite, lock):
+        self.nome = nome
+        self.limite = limite  #Manipuladores desta classe executando ao mesmo tempo
+        self.condicao = threading.Condition(lock)
+        self.fila = deque()  #Fichas das threads esperando, em ordem de chegada
+        self.em_execucao = 0
+        self.atendidas = 0
+        self.enfileiradas = 0  #Atendidas que precisaram esperar vaga
+        self.profundidade_maxima = 0
+        self.espera_total = 0.0
+        self.espera_maxima = 0.0
+
+class EscalonadorClasses:
+    def __init__(self, limites):
+        if not limites:
+            raise ValueError("Nenhuma classe de escalonamento informada")
+        self.lock = threading.Lock()
+        self.classes = {nome: ClasseEscalonamento(nome, limite, self.lock) for nome, limite in limites.items()}
+
+    def executar(self, nome_classe, funcao):
+        #Executa funcao dentro do orçamento da classe; retorna (resultado, segundos esperando na fila)
+        #Classes não configuradas executam sem limite
+        classe = self.classes.get(nome_classe)
+        if classe is None:
+            return funcao(), 0.0
+        espera = self.entrar(classe)
+        try:
+            return funcao(), espera
+        finally:
+            self.sair(classe)
+
+    def entrar(self, classe):
+        inicio = time.perf_counter()
+        with self.lock:
+            if not classe.fila and classe.em_execucao < classe.limite:
+                classe.em_execucao += 1
+                classe.atendidas += 1
+                return 0.0
+
+            ficha = object()
+            classe.fila.append(ficha)
+            classe.profundidade_maxima = max(classe.profundidade_maxima, len(classe.fila))
+            while classe.fila[0] is not ficha or classe.em_execucao >= classe.limite:
+                classe.condicao.wait()
+            classe.fila.popleft()
+            classe.em_execucao += 1
+            classe.atendidas += 1
+            classe.enfileiradas += 1
+            espera = time.perf_counter() - inicio
+            classe.espera_total += espera
+            classe.espera_maxima = max(classe.espera_maxima, espera)
+            if classe.fila and classe.em_execucao < classe.limite:
+                classe.condicao.notify_all()  #Ainda há vaga: a próxima ficha da fila também pode entrar
+            return espera
+
+    def sair(self, classe):
+        with self.lock:
+            classe.em_execucao -= 1
+            if classe.fila:
+                classe.condicao.notify_all()
+
+    def estatisticas(self):
+        with self.lock:
+            return {nome: {
+                "limite": classe.limite,
+                "em_execucao": classe.em_execucao,
+                "profundidade_fila": len(classe.fila),
+                "profundidade_maxima": classe.profundidade_maxima,
+                "atendidas": classe.atendidas,
+                "enfileiradas": classe.enfileiradas,
+                "espera_media": classe.espera_total / classe.enfileiradas if classe.enfileiradas else 0.0,
+                "espera_maxima": classe.espera_maxima
+            } for nome, classe in self.classes.items()}
+
+    def descricao(self):
+        return ", ".join(f"{nome}={classe.limite}" for nome, classe in self.classes.items())
@@ -0,0 +1,98 @@
+#Opções de socket configuráveis dos servidores
+#Centraliza backlog, buffers, TCP_NODELAY, TCP_DEFER_ACCEPT, TCP_FASTOPEN e o accept em lote
+#e a criação do socket de escuta TCP ou AF_UNIX (as opções de TCP são ignoradas no AF_UNIX)
+
+import os
+import stat
+import socket
+from configuracao import (TCP_NODELAY_ATIVO, TAMANHO_BUFFER_RECEPCAO, TAMANHO_BUFFER_ENVIO,
+                          TCP_DEFER_ACCEPT_SEGUNDOS, TCP_FASTOPEN_FILA, LOTE_ACCEPT, PREFIXO_UNIX)
+
+def criar_socket_escuta(host, porta, caminho_unix=''):
+    #Cria e associa o socket de escuta: TCP em (host, porta) ou AF_UNIX em caminho_unix
+    if caminho_unix:
+        remover_socket_unix(caminho_unix)  #Arquivo deixado por uma execução anterior impede o bind
+        socket_servidor = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        socket_servidor.bind(caminho_unix)
+        return socket_servidor
+    socket_servidor = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    socket_servidor.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    socket_servidor.bind((host, porta))
+    return socket_servidor
+
+def remover_socket_unix(caminho_unix):
+    #Remove o arquivo do socket AF_UNIX (apenas se for mesmo um socket)
+    try:
+        if stat.S_ISSOCK(os.stat(caminho_unix).st_mode):
+            os.unlink(caminho_unix)
+    except FileNotFoundError:
+        pass
+
+def descrever_endereco(socket_servidor):
+    #'host:porta' no TCP ou 'unix:/caminho' no AF_UNIX (formato aceito pelo ClienteHTTP e pelo harness)
+    endereco = socket_servidor.getsockname()
+    if socket_servidor.family == socket.AF_UNIX:
+        return f"{PREFIXO_UNIX}{endereco}"
+    return f"{endereco[0]}:{endereco[1]}"
+
+class OpcoesSocket:
+    def __init__(self, backlog, tcp_nodelay=TCP_NODELAY_ATIVO, buffer_recepcao=TAMANHO_BUFFER_RECEPCAO,
+                 buffer_envio=TAMANHO_BUFFER_ENVIO, defer_accept=TCP_DEFER_ACCEPT_SEGUNDOS,
+                 fastopen=TCP_FASTOPEN_FILA, lote_accept=LOTE_ACCEPT):
+        self.backlog = max(0, backlog)
+        self.tcp_nodelay = tcp_nodelay
+        self.buffer_recepcao = buffer_recepcao
+        self.buffer_envio = buffer_envio
+        self.defer_accept = defer_accept
+        self.fastopen = fastopen
+        self.lote_accept = max(1, lote_accept)
+
+    def aplicar_escuta(self, socket_servidor):
+        #Aplica as opções no socket de escuta (deve ser chamado antes do listen)
+        #Os buffers são herdados pelas conexões aceitas e precisam ser definidos antes do handshake
+        if self.buffer_recepcao > 0:
+            socket_servidor.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, self.buffer_recepcao)
+        if self.buffer_envio > 0:
+            socket_servidor.setsockopt(socket.SOL_SOCKET, socket.SO_SNDBUF, self.buffer_envio)
+
+        #Opções específicas de TCP que podem não existir em todas as plataformas
+        if socket_servidor.family == socket.AF_UNIX:
+            return
+        if self.defer_accept > 0 and hasattr(socket, 'TCP_DEFER_ACCEPT'):
+            socket_servidor.setsockopt(socket.IPPROTO_TCP, socket.TCP_DEFER_ACCEPT, self.defer_accept)
+        if self.fastopen > 0 and hasattr(socket, 'TCP_FASTOPEN'):
+            socket_servidor.setsockopt(socket.IPPROTO_TCP, socket.TCP_FASTOPEN, self.fastopen)
+
+    def aplicar_conexao(self, socket_cliente):
+        #Aplica as opções em uma conexão recém aceita
+        if self.tcp_nodelay and socket_cliente.family != socket.AF_UNIX:
+            socket_cliente.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+
+    def aceitar_lote(self, socket_servidor):
+        #Aceita uma conexão (bloqueante) e, se configurado, drena as demais pendentes na fila do kernel
+        #Esvaziar a fila do listen() libera espaço para novos SYNs e evita retransmissões no cliente
+        socket_cliente, endereco_cliente = socket_servidor.accept()
+        self.aplicar_conexao(socket_cliente)
+        conexoes = [(socket_cliente, endereco_cliente)]
+
+        if self.lote_accept > 1:
+            socket_servidor.setblocking(False)
+            try:
+                while len(conexoes) < self.lote_accept:
+                    try:
+                        socket_cliente, endereco_cliente = socket_servidor.accept()
+                    except (BlockingIOError, InterruptedError):
+                        break
+                    socket_cliente.setblocking(True)
+                    self.aplicar_conexao(socket_cliente)
+                    conexoes.append((socket_cliente, endereco_cliente))
+            finally:
+                socket_servidor.setblocking(True)
+
+        return conexoes
+
+    def descricao(self):
+        #Resumo das opções para exibir ao iniciar o servidor
+        return (f"backlog={self.backlog} lote_accept={self.lote_accept} tcp_nodelay={self.tcp_nodelay} "
+                f"rcvbuf={self.buffer_recepcao or 'padrão'} sndbuf={self.buffer_envio or 'padrão'} "
+                f"defer_accept={self.defer_accept} fastopen={self.fastopen}")
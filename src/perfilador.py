@@ -0,0 +1,96 @@
+#Perfilador por amostragem das threads do servidor
+#Amostra periodicamente as pilhas de todas as threads (sys._current_frames) e acumula a contagem de cada
+#pilha no formato "collapsed stacks" (uma linha "thread;func (arquivo);... N"), lido por flamegraph.pl,
+#inferno e speedscope. Quando desativado nenhuma thread é criada e o servidor não paga custo algum.
+
+import os
+import re
+import sys
+import time
+import threading
+from collections import Counter
+from configuracao import PERFILADOR_TAXA_HZ, PERFILADOR_INTERVALO_GRAVACAO
+
+class PerfiladorAmostragem:
+    #Números no nome das threads são removidos para agrupar as threads de atendimento ("Thread-12" -> "Thread")
+    PADRAO_NUMERO_THREAD = re.compile(r'-\d+')
+
+    def __init__(self, taxa_hz=PERFILADOR_TAXA_HZ, arquivo=None, intervalo_gravacao=PERFILADOR_INTERVALO_GRAVACAO):
+        self.intervalo = 1 / max(1, taxa_hz)
+        self.taxa_hz = taxa_hz
+        self.arquivo = arquivo
+        self.intervalo_gravacao = intervalo_gravacao
+        self.contagens = Counter()
+        self.amostras = 0
+        self.lock = threading.Lock()
+        self.evento_parar = threading.Event()
+        self.thread = None
+        self.id_thread_excluida = None  #Thread que atende /debug/profile (só aguardaria o fim da coleta)
+
+    def iniciar(self):
+        #Inicia a thread de amostragem
+        self.evento_parar.clear()
+        self.thread = threading.Thread(target=self.laco_amostragem, name='perfilador', daemon=True)
+        self.thread.start()
+
+    def parar(self):
+        #Para a amostragem e grava o arquivo, se configurado
+        self.evento_parar.set()
+        if self.thread is not None:
+            self.thread.join()
+            self.thread = None
+        if self.arquivo:
+            self.salvar(self.arquivo)
+
+    def executar_por(self, segundos):
+        #Amostra durante o tempo informado e retorna as linhas colapsadas
+        self.iniciar()
+        self.evento_parar.wait(segundos)
+        self.parar()
+        return self.linhas_colapsadas()
+
+    def laco_amostragem(self):
+        ultima_gravacao = time.monotonic()
+        while not self.evento_parar.wait(self.intervalo):
+            self.amostrar()
+
+            #Gravações parciais: o processo pode ser encerrado por sinal sem passar por parar()
+            if self.arquivo and time.monotonic() - ultima_gravacao >= self.intervalo_gravacao:
+                self.salvar(self.arquivo)
+                ultima_gravacao = time.monotonic()
+
+    def amostrar(self):
+        #Registra a pilha atual de cada thread, exceto a do próprio perfilador e a de quem o chamou via rota
+        proprio = threading.get_ident()
+        nomes = {thread.ident: thread.name for thread in threading.enumerate()}
+        pilhas = [
+            self.colapsar(frame, nomes.get(id_thread, 'desconhecida'))
+            for id_thread, frame in sys._current_frames().items()
+            if id_thread != proprio and id_thread != self.id_thread_excluida
+        ]
+        with self.lock:
+            self.contagens.update(pilhas)
+            self.amostras += 1
+
+    def colapsar(self, frame, nome_thread):
+        #Converte a pilha em "thread;raiz;...;folha"
+        funcoes = []
+        while frame is not None:
+            codigo = frame.f_code
+            funcoes.append(f"{codigo.co_name} ({os.path.basename(codigo.co_filename)})")
+            frame = frame.f_back
+        funcoes.append(self.PADRAO_NUMERO_THREAD.sub('', nome_thread))
+        return ';'.join(reversed(funcoes))
+
+    def linhas_colapsadas(self):
+        with self.lock:
+            return [f"{pilha} {contagem}" for pilha, contagem in self.contagens.most_common()]
+
+    def salvar(self, arquivo):
+        #Grava o arquivo colapsado de forma atômica
+        diretorio = os.path.dirname(os.path.abspath(arquivo))
+        os.makedirs(diretorio, exist_ok=True)
+        temporario = arquivo + '.tmp'
+        with open(temporario, 'w', encoding='utf-8') as f:
+            f.write('\n'.join(self.linhas_colapsadas()) + '\n')
+        os.replace(temporario, arquivo)
@@ -0,0 +1,109 @@
+#Prazos por conexão para leitura dos cabeçalhos, leitura do corpo e escrita da resposta
+#Cada prazo é absoluto (contado desde o início da etapa): um cliente que envia um byte por vez (slowloris)
+#não renova o prazo a cada recv. A espera usa o timeout do próprio socket (poll no kernel), sem threads extras
+
+import time
+import socket
+from configuracao import PRAZO_CABECALHOS, PRAZO_CORPO, PRAZO_ESCRITA
+from roteador import ErroHTTP
+
+LIMITE_CABECALHOS_BYTES = 16 * 1024
+LIMITE_CORPO_BYTES = 1024 * 1024
+TAMANHO_LEITURA = 4096
+
+class PrazoEscritaExpirado(Exception):
+    #O cliente não consumiu a resposta dentro do prazo de escrita
+    pass
+
+class PrazosConexao:
+    def __init__(self, cabecalhos=PRAZO_CABECALHOS, corpo=PRAZO_CORPO, escrita=PRAZO_ESCRITA):
+        #Prazos em segundos; 0 desativa o prazo da etapa (espera indefinida, comportamento anterior)
+        self.cabecalhos = cabecalhos
+        self.corpo = corpo
+        self.escrita = escrita
+
+    def ajustar_timeout(self, socket_cliente, limite):
+        #Timeout do próximo recv/send = tempo restante até o limite absoluto
+        if limite is None:
+            socket_cliente.settimeout(None)
+            return
+        restante = limite - time.monotonic()
+        if restante <= 0:
+            raise socket.timeout()
+        socket_cliente.settimeout(restante)
+
+    def ler_requisicao(self, socket_cliente):
+        #Lê cabeçalhos e corpo (Content-Length); retorna (texto dos cabeçalhos, corpo em bytes)
+        #ou (None, b'') se o cliente fechou sem enviar nada. Prazos, limites e cabeçalhos inválidos viram ErroHTTP (400, 408, 413, 431)
+        limite = time.monotonic() + self.cabecalhos if self.cabecalhos > 0 else None
+        dados = b''
+        try:
+            while b'\r\n\r\n' not in dados:
+                if len(dados) > LIMITE_CABECALHOS_BYTES:
+                    raise ErroHTTP(431, "Request Header Fields Too Large")
+                self.ajustar_timeout(socket_cliente, limite)
+                parte = socket_cliente.recv(TAMANHO_LEITURA)
+                if not parte:
+                    if not dados:
+                        return None, b''
+                    break  #Requisição sem linha em branco final: interpretada como veio
+                dados += parte
+        except socket.timeout:
+            raise ErroHTTP(408, "Request Timeout", "prazo dos cabeçalhos expirado")
+
+        bruto_cabecalhos, _, corpo = dados.partition(b'\r\n\r\n')
+        try:
+            texto_cabecalhos = bruto_cabecalhos.decode('utf-8')
+        except UnicodeDecodeError:
+            raise ErroHTTP(400, "Bad Request", "cabeçalhos não são UTF-8 válido")
+        tamanho_corpo = self.tamanho_corpo(texto_cabecalhos)
+        if tamanho_corpo > LIMITE_CORPO_BYTES:
+            raise ErroHTTP(413, "Payload Too Large")
+
+        limite = time.monotonic() + self.corpo if self.corpo > 0 else None
+        try:
+            while len(corpo) < tamanho_corpo:
+                self.ajustar_timeout(socket_cliente, limite)
+                parte = socket_cliente.recv(min(TAMANHO_LEITURA, tamanho_corpo - len(corpo)))
+                if not parte:
+                    raise ErroHTTP(400, "Bad Request", "corpo incompleto")
+                corpo += parte
+        except socket.timeout:
+            raise ErroHTTP(408, "Request Timeout", "prazo do corpo expirado")
+        return texto_cabecalhos, corpo[:tamanho_corpo]
+
+    def tamanho_corpo(self, texto_cabecalhos):
+        for linha in texto_cabecalhos.split('\r\n')[1:]:
+            chave, _, valor = linha.partition(':')
+            if chave.strip().lower() == 'content-length':
+                try:
+                    return max(0, int(valor.strip()))
+                except ValueError:
+                    raise ErroHTTP(400, "Bad Request", "Content-Length inválido")
+        return 0
+
+    def enviar(self, socket_cliente, dados):
+        #Envia todos os bytes dentro do prazo de escrita; dados são bytes ou uma sequência de segmentos (cabeçalhos, corpo)
+        #Vários segmentos vão juntos num sendmsg (scatter-gather), sem concatenar em Python; envios parciais avançam
+        #os memoryviews sem copiar o restante
+        if isinstance(dados, (bytes, bytearray, memoryview)):
+            dados = (dados,)
+        segmentos = [memoryview(segmento) for segmento in dados if segmento]
+        usar_sendmsg = len(segmentos) > 1 and hasattr(socket_cliente, 'sendmsg')
+        limite = time.monotonic() + self.escrita if self.escrita > 0 else None
+        try:
+            while segmentos:
+                self.ajustar_timeout(socket_cliente, limite)
+                enviados = socket_cliente.sendmsg(segmentos) if usar_sendmsg else socket_cliente.send(segmentos[0])
+                while enviados:
+                    if enviados >= len(segmentos[0]):
+                        enviados -= len(segmentos.pop(0))
+                    else:
+                        segmentos[0] = segmentos[0][enviados:]
+                        enviados = 0
+        except socket.timeout:
+            restantes = sum(len(segmento) for segmento in segmentos)
+            raise PrazoEscritaExpirado(f"{restantes} bytes não enviados no prazo de {self.escrita}s")
+
+    def descricao(self):
+        return f"cabecalhos={self.cabecalhos}s corpo={self.corpo}s escrita={self.escrita}s"
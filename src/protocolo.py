@@ -0,0 +1,59 @@
+#Funções de parsing HTTP compartilhadas pelos servidores e pelo cliente
+#Isoladas do socket para poderem ser medidas nos micro-benchmarks
+
+def interpretar_requisicao(dados_requisicao):
+    #Interpreta o texto de uma requisição HTTP e retorna (metodo, caminho, versao, cabecalhos)
+    #Lança ValueError se a linha de requisição for inválida
+    linhas_requisicao = dados_requisicao.split('\n')
+    linha_requisicao = linhas_requisicao[0].strip()
+    metodo, caminho, versao = linha_requisicao.split(' ')
+
+    #Extrai headers (até a linha em branco que separa o corpo)
+    cabecalhos = {}
+    for linha in linhas_requisicao[1:]:
+        if not linha.strip():
+            break
+        if ':' in linha:
+            chave, valor = linha.split(':', 1)
+            cabecalhos[chave.strip()] = valor.strip()
+
+    return metodo, caminho, versao, cabecalhos
+
+def interpretar_resposta(dados_resposta):
+    #Interpreta os bytes de uma resposta HTTP e retorna (codigo_status, cabecalhos, corpo)
+    texto_resposta = dados_resposta.decode('utf-8')
+    cabecalhos = {}
+
+    if "\r\n\r\n" not in texto_resposta:
+        return 0, cabecalhos, ""
+
+    parte_cabecalhos, parte_corpo = texto_resposta.split("\r\n\r\n", 1)
+    linhas_cabecalhos = parte_cabecalhos.split('\r\n')
+    linha_status = linhas_cabecalhos[0]
+    codigo_status = int(linha_status.split(' ')[1])
+
+    #Parse dos cabeçalhos
+    for linha in linhas_cabecalhos[1:]:
+        if ': ' in linha:
+            chave, valor = linha.split(': ', 1)
+            cabecalhos[chave] = valor
+
+    return codigo_status, cabecalhos, parte_corpo
+
+def formatar_server_timing(tempos):
+    #Formata {etapa: segundos} no valor do cabeçalho Server-Timing (durações em milissegundos)
+    return ", ".join(f"{etapa};dur={duracao * 1000:.3f}" for etapa, duracao in tempos.items())
+
+def interpretar_server_timing(valor):
+    #Converte o valor do cabeçalho Server-Timing em {etapa: segundos}; métricas sem dur são ignoradas
+    tempos = {}
+    for metrica in valor.split(','):
+        partes = metrica.strip().split(';')
+        for parametro in partes[1:]:
+            chave, _, duracao = parametro.strip().partition('=')
+            if chave == 'dur':
+                try:
+                    tempos[partes[0]] = float(duracao) / 1000
+                except ValueError:
+                    pass
+    return tempos
@@ -0,0 +1,110 @@
+#Leitura do consumo de recursos de um processo via /proc (Linux)
+#Usada pela rota /recursos dos servidores e pelo amostrador dos testes de carga, que registra
+#CPU, memória, threads, descritores abertos e trocas de contexto durante cada execução
+
+import os
+import json
+import time
+import threading
+
+TICKS_POR_SEGUNDO = os.sysconf('SC_CLK_TCK') if hasattr(os, 'sysconf') else 100
+TAMANHO_PAGINA = os.sysconf('SC_PAGE_SIZE') if hasattr(os, 'sysconf') else 4096
+
+def ler_recursos(pid='self'):
+    #Retorna os contadores acumulados do processo; lança OSError se /proc não estiver disponível
+    with open(f'/proc/{pid}/stat', 'r') as f:
+        #O nome do processo (campo 2) pode conter espaços, então os campos são contados após o ')'
+        campos = f.read().rsplit(')', 1)[1].split()
+    with open(f'/proc/{pid}/status', 'r') as f:
+        status = dict(linha.split(':', 1) for linha in f if ':' in linha)
+
+    return {
+        'cpu_segundos': (int(campos[11]) + int(campos[12])) / TICKS_POR_SEGUNDO,  #utime + stime
+        'threads': int(campos[17]),
+        'rss_bytes': int(campos[21]) * TAMANHO_PAGINA,
+        'fds': len(os.listdir(f'/proc/{pid}/fd')),
+        'trocas_contexto_voluntarias': int(status.get('voluntary_ctxt_switches', 0)),
+        'trocas_contexto_involuntarias': int(status.get('nonvoluntary_ctxt_switches', 0))
+    }
+
+class AmostradorRecursos:
+    #Amostra periodicamente os recursos do servidor em uma thread
+    #Com pid, lê /proc diretamente (servidor na mesma máquina); sem pid, consulta a rota /recursos
+    #do servidor, o que funciona entre containers mas ocupa o servidor durante a medição
+    def __init__(self, pid=None, host=None, porta=None, intervalo=0.5):
+        self.pid = pid
+        self.host = host
+        self.porta = porta
+        self.intervalo = intervalo
+        self.amostras = []
+        self.lock = threading.Lock()
+        self.evento_parar = threading.Event()
+        self.thread = None
+        self.anterior = None  #(contadores, instante) da última leitura
+        self.inicio = None
+
+    def disponivel(self):
+        return self.pid is not None or self.host is not None
+
+    def ler(self):
+        if self.pid is not None:
+            return ler_recursos(self.pid)
+
+        from cliente import ClienteHTTP
+        resposta = ClienteHTTP(self.host, self.porta).enviar_requisicao('GET', '/recursos')
+        if resposta['codigo_status'] != 200:
+            raise OSError(f"/recursos indisponível (status {resposta['codigo_status']})")
+        return json.loads(resposta['corpo'])['conteudo']
+
+    def iniciar(self):
+        self.amostras = []
+        self.anterior = None
+        self.evento_parar.clear()
+        if not self.disponivel():
+            return
+        self.inicio = time.time()
+        self.thread = threading.Thread(target=self.laco_amostragem, name='amostrador-recursos', daemon=True)
+        self.thread.start()
+
+    def parar(self):
+        #Encerra a amostragem e retorna as amostras coletadas
+        #A thread não é aguardada além de um intervalo: uma consulta HTTP presa no servidor não atrasa o teste
+        self.evento_parar.set()
+        if self.thread is not None:
+            self.thread.join(timeout=self.intervalo)
+            finalizada = not self.thread.is_alive()
+            self.thread = None
+            #Amostra final via /proc, para que execuções mais curtas que o intervalo também sejam medidas
+            if finalizada and self.pid is not None:
+                self.amostrar()
+        with self.lock:
+            return list(self.amostras)
+
+    def laco_amostragem(self):
+        self.amostrar()
+        while not self.evento_parar.wait(self.intervalo):
+            self.amostrar()
+
+    def amostrar(self):
+        #Lê os contadores e registra a variação desde a leitura anterior
+        try:
+            atual = self.ler()
+        except (OSError, ValueError, KeyError):
+            return  #Sem /proc, sem a rota ou processo encerrado: a execução segue sem esta amostra
+        instante = time.time()
+
+        if self.anterior is not None:
+            anterior, instante_anterior = self.anterior
+            decorrido = instante - instante_anterior
+            amostra = {
+                't': instante - self.inicio,
+                'cpu_percentual': (atual['cpu_segundos'] - anterior['cpu_segundos']) / decorrido * 100 if decorrido > 0 else 0,
+                'rss_mb': atual['rss_bytes'] / (1024 * 1024),
+                'threads': atual['threads'],
+                'fds': atual['fds'],
+                'trocas_contexto_voluntarias': atual['trocas_contexto_voluntarias'] - anterior['trocas_contexto_voluntarias'],
+                'trocas_contexto_involuntarias': atual['trocas_contexto_involuntarias'] - anterior['trocas_contexto_involuntarias']
+            }
+            with self.lock:
+                self.amostras.append(amostra)
+        self.anterior = (atual, instante)
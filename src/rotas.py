@@ -0,0 +1,118 @@
+#Rotas padrão compartilhadas pelos servidores sequencial e concorrente
+#Cada manipulador recebe o servidor e a requisição e retorna o campo "conteudo" da resposta
+#Rotas que dormem ou ocupam a CPU por tempo relevante são da classe 'lenta'; as demais ficam na 'rapida' (padrão)
+
+import time
+import threading
+from roteador import Roteador, ErroHTTP
+from perfilador import PerfiladorAmostragem
+from recursos import ler_recursos
+
+roteador_padrao = Roteador()
+
+#Limites dos parâmetros da rota /trabalho
+LIMITE_DELAY_MS = 60000
+LIMITE_CPU_MS = 60000
+LIMITE_BYTES = 10 * 1024 * 1024
+
+#Limites da rota /debug/profile
+LIMITE_PERFIL_SEGUNDOS = 60
+LIMITE_PERFIL_HZ = 1000
+
+def ler_parametro_inteiro(consulta, nome, limite, padrao=0):
+    #Lê um parâmetro inteiro não negativo da query string
+    valor = consulta.get(nome) or str(padrao)
+    try:
+        numero = int(valor)
+    except ValueError:
+        raise ErroHTTP(400, "Bad Request", f"{nome} deve ser inteiro")
+    if numero < 0 or numero > limite:
+        raise ErroHTTP(400, "Bad Request", f"{nome} fora do intervalo 0..{limite}")
+    return numero
+
+@roteador_padrao.rota('GET', '/', cacheavel=True)
+def pagina_inicial(servidor, requisicao):
+    return f"Página inicial do servidor {servidor.tipo_servidor}"
+
+@roteador_padrao.rota('GET', '/status', cacheavel=True, ttl_cache=1)
+def status(servidor, requisicao):
+    #Com o cache ativo os contadores podem ter até 1s (+ stale-while-revalidate); sondas usam Cache-Control: no-cache
+    return servidor.gerar_status(requisicao)
+
+@roteador_padrao.rota('GET', '/metrics')
+def metricas(servidor, requisicao):
+    #Contadores do servidor (requisições, prazos expirados, coalescência)
+    return servidor.gerar_metricas(requisicao)
+
+@roteador_padrao.rota('GET', '/recursos')
+def recursos(servidor, requisicao):
+    #Contadores de CPU, memória, threads, descritores e trocas de contexto do próprio processo (/proc/self)
+    try:
+        return ler_recursos()
+    except OSError:
+        raise ErroHTTP(501, "Not Implemented", "/proc indisponível")
+
+@roteador_padrao.rota('GET', '/rapido', cacheavel=True)
+def rapido(servidor, requisicao):
+    #Processamento rápido (sem delay)
+    return f"Endpoint {requisicao['caminho_rota']} processado"
+
+#As rotas de serviço simulado (/medio, /lento e /trabalho) não entram no cache de respostas: servidas do cache elas
+#deixariam de medir o servidor nos benchmarks. Continuam coalescíveis, pois só dividem execuções simultâneas
+@roteador_padrao.rota('GET', '/medio', coalescivel=True, classe='lenta')
+def medio(servidor, requisicao):
+    time.sleep(0.5)  #Processamento médio
+    return f"Endpoint {requisicao['caminho_rota']} processado"
+
+@roteador_padrao.rota('GET', '/lento', coalescivel=True, classe='lenta')
+def lento(servidor, requisicao):
+    time.sleep(2)  #Simula processamento lento
+    return f"Endpoint {requisicao['caminho_rota']} processado"
+
+@roteador_padrao.rota('POST', '/dados')
+def dados(servidor, requisicao):
+    return f"Dados recebidos via POST ({len(requisicao.get('corpo', b''))} bytes)"
+
+@roteador_padrao.rota('GET', '/trabalho', coalescivel=True, classe='lenta')
+def trabalho(servidor, requisicao):
+    #Perfil de serviço sintético: /trabalho?delay_ms=...&cpu_ms=...&bytes=...
+    #delay_ms simula espera de E/S (libera o GIL), cpu_ms ocupa a CPU e bytes define o tamanho do payload
+    consulta = requisicao['consulta']
+    delay_ms = ler_parametro_inteiro(consulta, 'delay_ms', LIMITE_DELAY_MS)
+    cpu_ms = ler_parametro_inteiro(consulta, 'cpu_ms', LIMITE_CPU_MS)
+    tamanho_bytes = ler_parametro_inteiro(consulta, 'bytes', LIMITE_BYTES)
+
+    if delay_ms:
+        time.sleep(delay_ms / 1000)
+
+    iteracoes_cpu = 0
+    if cpu_ms:
+        fim_cpu = time.perf_counter() + cpu_ms / 1000
+        while time.perf_counter() < fim_cpu:
+            iteracoes_cpu += 1
+
+    return {
+        "delay_ms": delay_ms,
+        "cpu_ms": cpu_ms,
+        "bytes": tamanho_bytes,
+        "iteracoes_cpu": iteracoes_cpu,
+        "payload": "x" * tamanho_bytes
+    }
+
+@roteador_padrao.rota('GET', '/debug/profile', classe='lenta')
+def perfil(servidor, requisicao):
+    #Amostra as pilhas de todas as threads por N segundos: /debug/profile?seconds=N&hz=100
+    #Retorna as linhas "collapsed stacks"; no servidor sequencial prefira PERFILAR=1, pois esta rota o bloqueia
+    consulta = requisicao['consulta']
+    segundos = ler_parametro_inteiro(consulta, 'seconds', LIMITE_PERFIL_SEGUNDOS, padrao=5)
+    taxa_hz = ler_parametro_inteiro(consulta, 'hz', LIMITE_PERFIL_HZ, padrao=100) or 1
+
+    perfilador = PerfiladorAmostragem(taxa_hz)
+    perfilador.id_thread_excluida = threading.get_ident()
+    pilhas = perfilador.executar_por(segundos)
+    return {
+        "segundos": segundos,
+        "taxa_hz": taxa_hz,
+        "amostras": perfilador.amostras,
+        "pilhas": pilhas
+    }
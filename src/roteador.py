@@ -0,0 +1,105 @@
+#Roteador declarativo compartilhado pelos servidores
+#Rotas exatas são resolvidas por um dicionário (metodo, caminho) em O(1)
+#Rotas com parâmetros ({nome}) são compiladas em expressões regulares e agrupadas pelo primeiro segmento
+
+import re
+from urllib.parse import urlsplit, parse_qsl
+
+class ErroHTTP(Exception):
+    #Erro que deve ser devolvido ao cliente com o status HTTP correspondente
+    #texto_status vai na linha de status (frase padrão, só ASCII); o detalhe em português vai em mensagem (corpo JSON)
+    def __init__(self, codigo_status, texto_status, mensagem=None):
+        super().__init__(mensagem or texto_status)
+        self.codigo_status = codigo_status
+        self.texto_status = texto_status
+        self.mensagem = mensagem or texto_status
+
+class ErroRoteamento(ErroHTTP):
+    #Erro de roteamento (404 ou 405)
+    pass
+
+def interpretar_alvo(alvo):
+    #Separa o alvo da requisição em caminho e parâmetros da query string ('/x?a=1' -> '/x', {'a': '1'})
+    if '?' not in alvo:
+        return alvo, {}
+    partes = urlsplit(alvo)
+    return partes.path or '/', dict(parse_qsl(partes.query, keep_blank_values=True))
+
+class Rota:
+    def __init__(self, metodo, padrao, manipulador, cacheavel=False, ttl_cache=None, classe='rapida', coalescivel=None):
+        self.metodo = metodo
+        self.padrao = padrao
+        self.manipulador = manipulador
+        self.nome = manipulador.__name__
+        self.cacheavel = cacheavel  #Conteúdo depende só do alvo da requisição (pode ser compartilhado entre requisições)
+        self.ttl_cache = ttl_cache  #TTL próprio no cache de respostas (None = CACHE_TTL)
+        #Requisições idênticas em andamento podem dividir uma execução (COALESCER); por padrão, as rotas cacheáveis
+        self.coalescivel = cacheavel if coalescivel is None else coalescivel
+        self.classe = classe  #Classe de escalonamento no servidor concorrente (ESCALONADOR_CLASSES)
+
+class Roteador:
+    PADRAO_PARAMETRO = re.compile(r'\{(\w+)\}')
+
+    def __init__(self):
+        self.rotas_exatas = {}  #(metodo, caminho) -> Rota
+        self.rotas_parametrizadas = {}  #primeiro segmento -> [(metodo, regex, Rota)]
+        self.metodos_por_caminho = {}  #caminho exato -> métodos registrados (para o 405)
+        self.metodos_conhecidos = set()
+
+    def rota(self, metodo, caminho, cacheavel=False, ttl_cache=None, classe='rapida', coalescivel=None):
+        #Decorador para registrar um manipulador: @roteador.rota('GET', '/itens/{id}')
+        def decorador(manipulador):
+            self.registrar(metodo, caminho, manipulador, cacheavel, ttl_cache, classe, coalescivel)
+            return manipulador
+        return decorador
+
+    def registrar(self, metodo, caminho, manipulador, cacheavel=False, ttl_cache=None, classe='rapida', coalescivel=None):
+        #Registra um manipulador para o método e caminho informados
+        metodo = metodo.upper()
+        rota = Rota(metodo, caminho, manipulador, cacheavel, ttl_cache, classe, coalescivel)
+        self.metodos_conhecidos.add(metodo)
+
+        if not self.PADRAO_PARAMETRO.search(caminho):
+            self.rotas_exatas[(metodo, caminho)] = rota
+            self.metodos_por_caminho.setdefault(caminho, set()).add(metodo)
+            return rota
+
+        #Compila o padrão: cada {nome} casa com um segmento inteiro do caminho
+        partes = self.PADRAO_PARAMETRO.split(caminho)
+        expressao = ''
+        for indice, parte in enumerate(partes):
+            expressao += re.escape(parte) if indice % 2 == 0 else f'(?P<{parte}>[^/]+)'
+        regex = re.compile(f'^{expressao}$')
+
+        prefixo = self.primeiro_segmento(caminho)
+        self.rotas_parametrizadas.setdefault(prefixo, []).append((metodo, regex, rota))
+        return rota
+
+    def primeiro_segmento(self, caminho):
+        #Primeiro segmento do caminho ('/itens/10' -> 'itens'), usado para indexar as rotas parametrizadas
+        return caminho[1:].split('/', 1)[0]
+
+    def resolver(self, metodo, caminho):
+        #Retorna (rota, parametros) ou lança ErroRoteamento
+        rota = self.rotas_exatas.get((metodo, caminho))
+        if rota is not None:
+            return rota, {}
+
+        caminho_existe = caminho in self.metodos_por_caminho
+        for metodo_rota, regex, rota in self.rotas_parametrizadas.get(self.primeiro_segmento(caminho), ()):
+            correspondencia = regex.match(caminho)
+            if correspondencia:
+                if metodo_rota == metodo:
+                    return rota, correspondencia.groupdict()
+                caminho_existe = True
+
+        if metodo not in self.metodos_conhecidos or caminho_existe:
+            raise ErroRoteamento(405, "Método Não Permitido")
+        raise ErroRoteamento(404, "Não Encontrado")
+
+    def listar_rotas(self):
+        #Lista (metodo, padrao) de todas as rotas registradas
+        rotas = [(rota.metodo, rota.padrao) for rota in self.rotas_exatas.values()]
+        for candidatas in self.rotas_parametrizadas.values():
+            rotas.extend((rota.metodo, rota.padrao) for _, _, rota in candidatas)
+        return rotas
@@ -5,39 +5,80 @@ import socket
 import json
 import time
 import threading
+import os
+import select
 from datetime import datetime
-from configuracao import PORTA_SERVIDOR, ID_CUSTOMIZADO, MAX_CONEXOES
+from configuracao import HOST_SERVIDOR, PORTA_SERVIDOR, ID_CUSTOMIZADO, BACKLOG_CONCORRENTE, SOCKET_UNIX
+from configuracao import PERFILADOR_ATIVO, PERFILADOR_ARQUIVO, COALESCER_REQUISICOES
+from configuracao import CACHE_BYTES, CACHE_TTL, CACHE_SWR, TEMPO_OCIOSO_KEEPALIVE, ESCALONADOR_CLASSES
+from opcoes_socket import OpcoesSocket, criar_socket_escuta, descrever_endereco, remover_socket_unix
+from prazos import PrazosConexao, PrazoEscritaExpirado
+from coalescencia import CoalescedorRequisicoes, chave_requisicao
+from cache_respostas import CacheRespostas
+from escalonador import EscalonadorClasses, interpretar_classes
+from protocolo import interpretar_requisicao, formatar_server_timing
+from perfilador import PerfiladorAmostragem
+from roteador import ErroHTTP, interpretar_alvo
+from rotas import roteador_padrao
 
 class ServidorWebConcorrente:
-    def __init__(self, host = '0.0.0.0', porta = PORTA_SERVIDOR):
+    def __init__(self, host = HOST_SERVIDOR, porta = PORTA_SERVIDOR, opcoes_socket = None, roteador = None, prazos = None,
+                 coalescer = COALESCER_REQUISICOES, cache = None, caminho_unix = SOCKET_UNIX, escalonador = None):
+        self.tipo_servidor = "concorrente"
         self.host = host
         self.porta = porta
+        self.caminho_unix = caminho_unix  #Se informado, escuta em AF_UNIX (mesma máquina, sem a pilha TCP/IP)
         self.socket_servidor = None
         self.contador_requisicoes = 0
         self.lock = threading.Lock()
         self.conexoes_ativas = 0
+        self.opcoes_socket = opcoes_socket or OpcoesSocket(BACKLOG_CONCORRENTE)
+        self.roteador = roteador or roteador_padrao
+        self.prazos = prazos or PrazosConexao()
+        self.conexoes_encerradas_por_prazo = 0
+        self.coalescedor = CoalescedorRequisicoes() if coalescer else None  #GETs idênticos simultâneos compartilham o manipulador
+        if cache is None and CACHE_BYTES > 0:
+            cache = CacheRespostas(CACHE_BYTES, CACHE_TTL, CACHE_SWR)
+        self.cache = cache  #Conteúdo das rotas cacheáveis reaproveitado entre requisições (None = desativado)
+        if escalonador is None and ESCALONADOR_CLASSES:
+            escalonador = EscalonadorClasses(interpretar_classes(ESCALONADOR_CLASSES))
+        self.escalonador = escalonador  #Orçamento de manipuladores por classe de rota (None = sem limite)
+        self.perfilador = None
         
     def iniciar(self):
         #Inicia o servidor concorrente"
-        self.socket_servidor = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
-        self.socket_servidor.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
-        
         try:
-            self.socket_servidor.bind((self.host, self.porta))
-            self.socket_servidor.listen(MAX_CONEXOES)
-            print(f"Servidor Concorrente iniciado em {self.host}:{self.porta}")
-            print(f"Máximo de {MAX_CONEXOES} conexões simultâneas")
+            self.socket_servidor = criar_socket_escuta(self.host, self.porta, self.caminho_unix)
+            if not self.caminho_unix:
+                self.porta = self.socket_servidor.getsockname()[1]  #Porta real quando 0 (efêmera)
+            self.opcoes_socket.aplicar_escuta(self.socket_servidor)
+            self.socket_servidor.listen(self.opcoes_socket.backlog)
+            print(f"Servidor Concorrente iniciado em {descrever_endereco(self.socket_servidor)}")
+            print(f"Fila de até {self.opcoes_socket.backlog} conexões pendentes")
+            print(f"Opções de socket: {self.opcoes_socket.descricao()}")
+            print(f"Prazos por conexão: {self.prazos.descricao()}")
+            print(f"Coalescência de requisições: {'ativa' if self.coalescedor else 'desativada'}")
+            print(f"Cache de respostas: {self.descricao_cache()}")
+            print(f"Escalonamento por classe: {self.escalonador.descricao() if self.escalonador else 'desativado'}")
+            
+            #Perfilador contínuo opcional (PERFILAR=1)
+            if PERFILADOR_ATIVO:
+                arquivo_perfil = PERFILADOR_ARQUIVO or os.path.join('resultados', 'perfil_concorrente.folded')
+                self.perfilador = PerfiladorAmostragem(arquivo=arquivo_perfil)
+                self.perfilador.iniciar()
+                print(f"Perfilador ativo ({self.perfilador.taxa_hz} Hz) gravando em {arquivo_perfil}")
             
             while True:
-                socket_cliente, endereco_cliente = self.socket_servidor.accept()
-                
-                #Cria uma thread para cada cliente
-                thread_cliente = threading.Thread(
-                    target=self.gerenciar_cliente,
-                    args=(socket_cliente, endereco_cliente)
-                )
-                thread_cliente.daemon = True
-                thread_cliente.start()
+                conexoes = self.opcoes_socket.aceitar_lote(self.socket_servidor)
+                instante_aceite = time.perf_counter()  #Início da espera até a thread começar o atendimento
+                for socket_cliente, endereco_cliente in conexoes:
+                    #Cria uma thread para cada cliente
+                    thread_cliente = threading.Thread(
+                        target=self.gerenciar_cliente,
+                        args=(socket_cliente, endereco_cliente, instante_aceite)
+                    )
+                    thread_cliente.daemon = True
+                    thread_cliente.start()
                 
         except KeyboardInterrupt:
             print("\nServidor interrompido pelo usuário")
@@ -46,7 +87,7 @@ class ServidorWebConcorrente:
         finally:
             self.parar()
     
-    def gerenciar_cliente(self, socket_cliente, endereco_cliente):
+    def gerenciar_cliente(self, socket_cliente, endereco_cliente, instante_aceite=None):
         #Gerencia a conexão com um cliente em uma thread separada
         with self.lock:
             self.conexoes_ativas += 1
@@ -55,73 +96,147 @@ class ServidorWebConcorrente:
         print(f"Conexão {id_conexao} aceita de {endereco_cliente}")
         
         try:
-            self.processar_requisicao(socket_cliente, endereco_cliente, id_conexao)
+            self.processar_requisicao(socket_cliente, endereco_cliente, id_conexao, instante_aceite)
         finally:
             with self.lock:
                 self.conexoes_ativas -= 1
             print(f"Conexão {id_conexao} finalizada")
     
-    def processar_requisicao(self, socket_cliente, endereco_cliente, id_conexao):
-        #Processa uma requisição HTTP
+    def processar_requisicao(self, socket_cliente, endereco_cliente, id_conexao, instante_aceite=None):
+        #Processa as requisições HTTP da conexão: uma só, ou várias se o cliente pedir Connection: keep-alive
+        #Cada etapa é cronometrada com perf_counter e enviada ao cliente no cabeçalho Server-Timing
         try:
-            tempo_inicio = time.time()
-            
-            #Recebe a requisição
-            dados_requisicao = socket_cliente.recv(4096).decode('utf-8')
-            if not dados_requisicao:
-                return
-            
-            #Parse da requisição HTTP
-            linhas_requisicao = dados_requisicao.split('\n')
-            linha_requisicao = linhas_requisicao[0].strip()
-            metodo, caminho, versao = linha_requisicao.split(' ')
-            
-            #Extrai headers
-            cabecalhos = {}
-            for linha in linhas_requisicao[1:]:
-                if ':' in linha:
-                    chave, valor = linha.split(':', 1)
-                    cabecalhos[chave.strip()] = valor.strip()
-            
-            #Verifica o cabeçalho customizado
-            id_customizado = cabecalhos.get('X-Custom-ID', '')
-            
-            #Validação obrigatória do X-Custom-ID
-            if not id_customizado:
-                resposta_erro = self.gerar_resposta_erro(400, "Bad Request - X-Custom-ID obrigatório", id_conexao, id_customizado)
-                socket_cliente.send(resposta_erro.encode('utf-8'))
-                return
-            
-            with self.lock:
-                self.contador_requisicoes += 1
-                requisicao_atual = self.contador_requisicoes
-            
-            #Gera resposta baseada no método e path
-            resposta = self.gerar_resposta(metodo, caminho, id_customizado, tempo_inicio, requisicao_atual, id_conexao)
-            
-            #Envia resposta
-            socket_cliente.send(resposta.encode('utf-8'))
-            
-            tempo_processamento = time.time() - tempo_inicio
-            print(f"Requisição {requisicao_atual} (conexão {id_conexao}) processada em {tempo_processamento:.4f}s")
+            while True:
+                tempo_inicio = time.time()
+                inicio_atendimento = time.perf_counter()
+                tempos = {'fila': inicio_atendimento - instante_aceite if instante_aceite else 0.0}
+                
+                #Recebe cabeçalhos e corpo dentro dos prazos da conexão
+                try:
+                    dados_requisicao, corpo = self.prazos.ler_requisicao(socket_cliente)
+                except ErroHTTP as erro:
+                    self.registrar_prazo_expirado(erro.codigo_status)
+                    resposta_erro = self.gerar_resposta_erro(erro.codigo_status, erro.texto_status, id_conexao, mensagem=erro.mensagem)
+                    self.prazos.enviar(socket_cliente, resposta_erro)
+                    return
+                if dados_requisicao is None:
+                    return
+                fim_leitura = time.perf_counter()
+                tempos['leitura'] = fim_leitura - inicio_atendimento
+                
+                #Parse da requisição HTTP
+                metodo, caminho, versao, cabecalhos = interpretar_requisicao(dados_requisicao)
+                tempos['parse'] = time.perf_counter() - fim_leitura
+                
+                #Verifica o cabeçalho customizado
+                id_customizado = cabecalhos.get('X-Custom-ID', '')
+                
+                #Validação obrigatória do X-Custom-ID
+                if not id_customizado:
+                    resposta_erro = self.gerar_resposta_erro(400, "Bad Request - X-Custom-ID obrigatório", id_conexao, id_customizado)
+                    self.prazos.enviar(socket_cliente, resposta_erro)
+                    return
+                
+                with self.lock:
+                    self.contador_requisicoes += 1
+                    requisicao_atual = self.contador_requisicoes
+                
+                #Keep-alive só quando pedido explicitamente (ex.: conexões reaproveitadas pelo proxy)
+                manter_conexao = cabecalhos.get('Connection', '').lower() == 'keep-alive'
+                
+                #Gera resposta baseada no método e path
+                resposta = self.gerar_resposta(metodo, caminho, id_customizado, tempo_inicio, requisicao_atual, id_conexao,
+                                               tempos, corpo, cabecalhos, manter_conexao)
+                
+                #Envia resposta (a duração do envio só é conhecida depois, então vai apenas para o log)
+                inicio_envio = time.perf_counter()
+                self.prazos.enviar(socket_cliente, resposta)
+                tempos['envio'] = time.perf_counter() - inicio_envio
+                
+                tempo_processamento = time.time() - tempo_inicio
+                print(f"Requisição {requisicao_atual} (conexão {id_conexao}) processada em {tempo_processamento:.4f}s "
+                      f"[{formatar_server_timing(tempos)}]")
+                
+                if not manter_conexao or not self.aguardar_proxima_requisicao(socket_cliente):
+                    return
+                instante_aceite = None  #Requisições seguintes da conexão não passam pela fila do accept
             
+        except (PrazoEscritaExpirado, OSError) as e:
+            #Cliente parou de ler ou a conexão caiu: não há como responder
+            if isinstance(e, PrazoEscritaExpirado):
+                self.registrar_prazo_expirado(408)
+            print(f"Conexão {id_conexao} encerrada durante o envio: {e}")
         except Exception as e:
             print(f"Erro ao processar requisição na conexão {id_conexao}: {e}")
             id_customizado = ""  #Em caso de erro, pode não ter sido extraído
             resposta_erro = self.gerar_resposta_erro(500, "Erro Interno do Servidor", id_conexao, id_customizado)
-            socket_cliente.send(resposta_erro.encode('utf-8'))
+            try:
+                self.prazos.enviar(socket_cliente, resposta_erro)
+            except (PrazoEscritaExpirado, OSError):
+                pass
         finally:
             socket_cliente.close()
     
-    def gerar_resposta(self, metodo, caminho, id_customizado, tempo_inicio, num_requisicao, id_conexao):
+    def aguardar_proxima_requisicao(self, socket_cliente):
+        #Espera a próxima requisição de uma conexão keep-alive por até TEMPO_OCIOSO_KEEPALIVE segundos
+        #Enquanto ociosa a conexão não conta como ativa (a sonda de resfriamento espera conexoes_ativas <= 1)
+        with self.lock:
+            self.conexoes_ativas -= 1
+        try:
+            legiveis, _, _ = select.select([socket_cliente], [], [], TEMPO_OCIOSO_KEEPALIVE)
+        finally:
+            with self.lock:
+                self.conexoes_ativas += 1
+        return bool(legiveis)
+    
+    def registrar_prazo_expirado(self, codigo_status):
+        #Conta as conexões encerradas por prazo (408); outros erros de leitura (413, 431, 400) não entram
+        if codigo_status == 408:
+            with self.lock:
+                self.conexoes_encerradas_por_prazo += 1
+    
+    def gerar_resposta(self, metodo, caminho, id_customizado, tempo_inicio, num_requisicao, id_conexao, tempos=None,
+                       corpo=b'', cabecalhos=None, manter_conexao=False):
         #Gera resposta HTTP baseada no método e path
+        #tempos recebe as etapas já medidas (fila, leitura, parse) e ganha handler e serializacao
+        if tempos is None:
+            tempos = {}
+        
+        #Despacha pelo roteador compartilhado (dicionário por método e caminho)
+        #A query string é separada do caminho antes do despacho
+        caminho_rota, consulta = interpretar_alvo(caminho)
+        try:
+            rota, parametros = self.roteador.resolver(metodo, caminho_rota)
+        except ErroHTTP as erro:
+            return self.gerar_resposta_erro(erro.codigo_status, erro.texto_status, id_conexao, id_customizado, mensagem=erro.mensagem)
         
-        #Simula diferentes tipos de processamento
-        if caminho == '/lento':
-            time.sleep(2)  #Simula processamento lento
-        elif caminho == '/medio':
-            time.sleep(0.5)  #Processamento médio
-        #Path '/' ou '/rapido' - processamento rápido (sem delay)
+        requisicao = {
+            "metodo": metodo,
+            "caminho": caminho,
+            "caminho_rota": caminho_rota,
+            "parametros": parametros,
+            "consulta": consulta,
+            "corpo": corpo,
+            "num_requisicao": num_requisicao,
+            "id_conexao": id_conexao
+        }
+        inicio_handler = time.perf_counter()
+        compartilhada = False
+        cabecalhos_cache = ''
+        try:
+            if ((self.coalescedor and rota.coalescivel) or (self.cache and rota.cacheavel)) and metodo == 'GET':
+                #Só o conteúdo é compartilhado; os campos por requisição abaixo continuam individuais
+                chave = chave_requisicao(metodo, caminho, cabecalhos or {})
+                conteudo, compartilhada, cabecalhos_cache = self.executar_cacheavel(rota, requisicao, chave, cabecalhos or {})
+            else:
+                conteudo = self.executar_manipulador(rota, requisicao)
+        except ErroHTTP as erro:
+            return self.gerar_resposta_erro(erro.codigo_status, erro.texto_status, id_conexao, id_customizado, mensagem=erro.mensagem)
+        inicio_serializacao = time.perf_counter()
+        if self.escalonador:
+            #A espera pela vaga da classe sai do handler e aparece como etapa própria no Server-Timing
+            tempos['classe'] = requisicao.get('espera_classe', 0.0)
+        tempos['handler'] = inicio_serializacao - inicio_handler - tempos.get('classe', 0.0)
         
         with self.lock:
             ativas_atuais = self.conexoes_ativas
@@ -139,78 +254,121 @@ class ServidorWebConcorrente:
             "id_customizado_valido": id_customizado == ID_CUSTOMIZADO,
             "tempo_processamento": time.time() - tempo_inicio,
             "id_thread": threading.current_thread().ident,
-            "mensagem": f"Resposta do servidor concorrente para {metodo} {caminho}"
+            "mensagem": f"Resposta do servidor concorrente para {metodo} {caminho}",
+            "conteudo": conteudo
         }
         
-        if metodo == 'GET':
-            if caminho == '/':
-                dados_resposta["conteudo"] = "Página inicial do servidor concorrente"
-            elif caminho == '/status':
-                dados_resposta["conteudo"] = {
-                    "status_servidor": "rodando",
-                    "total_requisicoes": num_requisicao,
-                    "conexoes_ativas": ativas_atuais,
-                    "tipo_servidor": "concorrente"
-                }
-            elif caminho in ['/rapido', '/medio', '/lento']:
-                dados_resposta["conteudo"] = f"Endpoint {caminho} processado"
-            else:
-                return self.gerar_resposta_erro(404, "Não Encontrado", id_conexao, id_customizado)
-                
-        elif metodo == 'POST':
-            if caminho == '/dados':
-                dados_resposta["conteudo"] = "Dados recebidos via POST"
-            else:
-                return self.gerar_resposta_erro(404, "Não Encontrado", id_conexao, id_customizado)
-                
-        else:
-            return self.gerar_resposta_erro(405, "Método Não Permitido", id_conexao, id_customizado)
-        
-        resposta_json = json.dumps(dados_resposta, indent=2)
+        corpo_resposta = json.dumps(dados_resposta, indent=2).encode('utf-8')
+        tempos['serializacao'] = time.perf_counter() - inicio_serializacao
         
-        resposta = f"""HTTP/1.1 200 OK\r
+        cabecalhos_resposta = f"""HTTP/1.1 200 OK\r
 Content-Type: application/json\r
-Content-Length: {len(resposta_json)}\r
+Content-Length: {len(corpo_resposta)}\r
 Server: ServidorConcorrente/1.0\r
 X-Server-Type: concorrente\r
 X-Connection-ID: {id_conexao}\r
 X-Thread-ID: {threading.current_thread().ident}\r
 X-Custom-ID: {id_customizado}\r
-Connection: close\r
+X-Coalesced: {int(compartilhada)}\r
+{cabecalhos_cache}Server-Timing: {formatar_server_timing(tempos)}\r
+Connection: {'keep-alive' if manter_conexao else 'close'}\r
 \r
-{resposta_json}"""
+""".encode('utf-8')
+        
+        #Segmentos enviados sem concatenação (sendmsg); Content-Length é o tamanho do corpo em bytes
+        return cabecalhos_resposta, corpo_resposta
+    
+    def executar_manipulador(self, rota, requisicao):
+        #Executa o manipulador dentro do orçamento da classe da rota (sem escalonador, diretamente)
+        if not self.escalonador:
+            return rota.manipulador(self, requisicao)
+        conteudo, requisicao['espera_classe'] = self.escalonador.executar(rota.classe, lambda: rota.manipulador(self, requisicao))
+        return conteudo
+    
+    def executar_cacheavel(self, rota, requisicao, chave, cabecalhos):
+        #Cache na frente da coalescência: acertos não chegam ao manipulador e falhas simultâneas da mesma chave
+        #executam uma única vez. Retorna (conteudo, compartilhada, linhas de cabeçalho do cache)
+        compartilhada = False
+        def executar():
+            nonlocal compartilhada
+            if not (self.coalescedor and rota.coalescivel):
+                return self.executar_manipulador(rota, requisicao)
+            conteudo, compartilhada = self.coalescedor.executar(chave, lambda: self.executar_manipulador(rota, requisicao))
+            return conteudo
+        
+        if not (self.cache and rota.cacheavel):
+            return executar(), compartilhada, ''
+        conteudo, estado, idade = self.cache.obter(chave, executar, cabecalhos, rota.ttl_cache)
+        cabecalhos_cache = (f"X-Cache: {estado}\r\nAge: {int(idade)}\r\n"
+                            f"Cache-Control: {self.cache.cabecalho_cache_control(rota.ttl_cache)}\r\n")
+        return conteudo, compartilhada and estado != 'STALE', cabecalhos_cache
+    
+    def descricao_cache(self):
+        if not self.cache:
+            return "desativado"
+        return (f"{self.cache.capacidade_bytes} bytes, ttl={self.cache.ttl}s, "
+                f"stale-while-revalidate={self.cache.janela_obsoleta}s")
+    
+    def gerar_status(self, requisicao):
+        #Conteúdo da rota /status
+        with self.lock:
+            ativas_atuais = self.conexoes_ativas
         
-        return resposta
+        return {
+            "status_servidor": "rodando",
+            "total_requisicoes": requisicao["num_requisicao"],
+            "conexoes_ativas": ativas_atuais,
+            "conexoes_encerradas_por_prazo": self.conexoes_encerradas_por_prazo,
+            "tipo_servidor": "concorrente"
+        }
     
-    def gerar_resposta_erro(self, codigo_status, texto_status, id_conexao, id_customizado=""):
+    def gerar_metricas(self, requisicao):
+        #Conteúdo da rota /metrics: contadores acumulados desde o início do servidor
+        with self.lock:
+            metricas = {
+                "tipo_servidor": "concorrente",
+                "requisicoes": self.contador_requisicoes,
+                "conexoes_ativas": self.conexoes_ativas,
+                "conexoes_encerradas_por_prazo": self.conexoes_encerradas_por_prazo
+            }
+        metricas["coalescencia"] = self.coalescedor.estatisticas() if self.coalescedor else None
+        metricas["cache"] = self.cache.estatisticas() if self.cache else None
+        metricas["escalonador"] = self.escalonador.estatisticas() if self.escalonador else None
+        return metricas
+    
+    def gerar_resposta_erro(self, codigo_status, texto_status, id_conexao, id_customizado="", mensagem=None):
         #Gera resposta de erro HTTP
         dados_erro = {
             "erro": codigo_status,
-            "mensagem": texto_status,
+            "mensagem": mensagem or texto_status,
             "tipo_servidor": "concorrente",
             "id_conexao": id_conexao,
             "id_thread": threading.current_thread().ident,
             "timestamp": datetime.now().isoformat()
         }
         
-        resposta_json = json.dumps(dados_erro, indent=2)
-        
-        resposta = f"""HTTP/1.1 {codigo_status} {texto_status}\r
+        corpo_resposta = json.dumps(dados_erro, indent=2).encode('utf-8')
+        cabecalhos_resposta = f"""HTTP/1.1 {codigo_status} {texto_status}\r
 Content-Type: application/json\r
-Content-Length: {len(resposta_json)}\r
+Content-Length: {len(corpo_resposta)}\r
 Server: ServidorConcorrente/1.0\r
 X-Connection-ID: {id_conexao}\r
 X-Custom-ID: {id_customizado}\r
 Connection: close\r
 \r
-{resposta_json}"""
+""".encode('utf-8')
         
-        return resposta
+        return cabecalhos_resposta, corpo_resposta
     
     def parar(self):
         #Para o servidor
+        if self.perfilador:
+            self.perfilador.parar()
+            self.perfilador = None
         if self.socket_servidor:
             self.socket_servidor.close()
+            if self.caminho_unix:
+                remover_socket_unix(self.caminho_unix)
             print("Servidor concorrente parado")
 
 if __name__ == "__main__":
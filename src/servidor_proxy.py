@@ -0,0 +1,311 @@
+#Proxy Reverso / Balanceador de Carga
+#Recebe as requisições dos clientes (uma thread por conexão, como o servidor concorrente) e as encaminha para
+#réplicas do servidor usando conexões keep-alive reaproveitadas. A estratégia de balanceamento e a ejeção
+#passiva de upstreams com falha ficam em balanceador.py
+
+import socket
+import json
+import time
+import threading
+from datetime import datetime
+from configuracao import HOST_SERVIDOR, PORTA_SERVIDOR, BACKLOG_CONCORRENTE, PROXY_UPSTREAMS, PROXY_ESTRATEGIA
+from configuracao import PROXY_POOL, PROXY_FALHAS_EJECAO, PROXY_TEMPO_EJECAO, PROXY_TIMEOUT_UPSTREAM, PROXY_OCIOSO_POOL
+from opcoes_socket import OpcoesSocket, criar_socket_escuta, descrever_endereco
+from prazos import PrazosConexao, PrazoEscritaExpirado, LIMITE_CABECALHOS_BYTES, TAMANHO_LEITURA
+from balanceador import BalanceadorCarga
+from roteador import ErroHTTP
+from protocolo import interpretar_requisicao
+
+#Cabeçalhos válidos só entre dois pontos da conexão: não são repassados
+CABECALHOS_SALTO = ('connection', 'keep-alive', 'proxy-connection', 'te', 'trailer', 'upgrade')
+
+#Métodos que podem ser reenviados a outra conexão depois de entregues ao upstream (RFC 9110, 9.2.2)
+METODOS_IDEMPOTENTES = ('GET', 'HEAD', 'OPTIONS', 'TRACE', 'PUT', 'DELETE')
+
+#Rota respondida pelo próprio proxy (as demais vão para os upstreams)
+CAMINHO_STATUS_PROXY = '/proxy/status'
+
+def interpretar_upstreams(texto):
+    #'127.0.0.1:8081,127.0.0.1:8082' -> [('127.0.0.1', 8081), ('127.0.0.1', 8082)]
+    enderecos = []
+    for item in texto.split(','):
+        item = item.strip()
+        if item:
+            host, _, porta = item.rpartition(':')
+            enderecos.append((host, int(porta)))
+    return enderecos
+
+def filtrar_cabecalhos(linhas):
+    #Remove os cabeçalhos hop-by-hop de uma lista de linhas 'Nome: valor'
+    return [linha for linha in linhas if linha.partition(':')[0].strip().lower() not in CABECALHOS_SALTO]
+
+class RespostaVazia(ConnectionError):
+    #O upstream fechou a conexão sem enviar nenhum byte da resposta
+    pass
+
+def ler_resposta_upstream(conexao):
+    #Lê uma resposta HTTP com Content-Length; retorna (codigo, linha de status, linhas de cabeçalho, corpo, reutilizavel)
+    #Sem Content-Length o corpo vai até o fechamento e a conexão não volta ao pool
+    #EOF ou reset antes do primeiro byte levanta RespostaVazia
+    dados = b''
+    while b'\r\n\r\n' not in dados:
+        if len(dados) > LIMITE_CABECALHOS_BYTES:
+            raise ValueError("cabeçalhos da resposta muito grandes")
+        try:
+            parte = conexao.recv(TAMANHO_LEITURA)
+        except ConnectionResetError as e:
+            if not dados:
+                raise RespostaVazia("upstream reiniciou a conexão sem responder") from e
+            raise
+        if not parte:
+            if not dados:
+                raise RespostaVazia("upstream fechou a conexão sem responder")
+            raise ConnectionError("resposta incompleta")
+        dados += parte
+
+    bruto_cabecalhos, _, corpo = dados.partition(b'\r\n\r\n')
+    linha_status, *linhas = bruto_cabecalhos.decode('latin-1').split('\r\n')
+    codigo = int(linha_status.split(' ')[1])
+    tamanho = None
+    reutilizavel = False
+    for linha in linhas:
+        nome, _, valor = linha.partition(':')
+        nome = nome.strip().lower()
+        if nome == 'content-length':
+            tamanho = int(valor.strip())
+        elif nome == 'connection':
+            reutilizavel = valor.strip().lower() == 'keep-alive'
+
+    if tamanho is None:
+        while True:
+            parte = conexao.recv(65536)
+            if not parte:
+                break
+            corpo += parte
+        return codigo, linha_status, linhas, corpo, False
+
+    while len(corpo) < tamanho:
+        parte = conexao.recv(min(65536, tamanho - len(corpo)))
+        if not parte:
+            raise ConnectionError("upstream fechou a conexão no meio do corpo")
+        corpo += parte
+    return codigo, linha_status, linhas, corpo[:tamanho], reutilizavel and len(corpo) == tamanho
+
+class FalhaConexao(Exception):
+    #Não foi possível conectar ao upstream ou entregar a requisição (inclui timeouts): ele não a executou
+    pass
+
+class FalhaAposEnvio(Exception):
+    #O upstream falhou depois de receber uma requisição não idempotente: reenviá-la poderia executá-la duas vezes
+    pass
+
+class ServidorProxy:
+    def __init__(self, host = HOST_SERVIDOR, porta = PORTA_SERVIDOR, upstreams = None, estrategia = PROXY_ESTRATEGIA,
+                 opcoes_socket = None, prazos = None):
+        self.tipo_servidor = "proxy"
+        self.host = host
+        self.porta = porta
+        self.socket_servidor = None
+        self.contador_requisicoes = 0
+        self.lock = threading.Lock()
+        self.conexoes_ativas = 0
+        self.opcoes_socket = opcoes_socket or OpcoesSocket(BACKLOG_CONCORRENTE)
+        self.prazos = prazos or PrazosConexao()
+        self.balanceador = BalanceadorCarga(upstreams if upstreams is not None else interpretar_upstreams(PROXY_UPSTREAMS),
+                                            estrategia, PROXY_POOL, PROXY_FALHAS_EJECAO, PROXY_TEMPO_EJECAO,
+                                            tempo_ocioso_pool=PROXY_OCIOSO_POOL)
+        self.timeout_upstream = PROXY_TIMEOUT_UPSTREAM
+        self.respostas_502 = 0
+        self.respostas_504 = 0
+
+    def iniciar(self):
+        #Inicia o proxy (uma thread por conexão de cliente)
+        try:
+            self.socket_servidor = criar_socket_escuta(self.host, self.porta)
+            self.porta = self.socket_servidor.getsockname()[1]  #Porta real quando 0 (efêmera)
+            self.opcoes_socket.aplicar_escuta(self.socket_servidor)
+            self.socket_servidor.listen(self.opcoes_socket.backlog)
+            print(f"Servidor Proxy iniciado em {descrever_endereco(self.socket_servidor)}")
+            print(f"Balanceamento: {self.balanceador.descricao()}")
+            print(f"Prazos por conexão: {self.prazos.descricao()}")
+
+            while True:
+                for socket_cliente, endereco_cliente in self.opcoes_socket.aceitar_lote(self.socket_servidor):
+                    thread_cliente = threading.Thread(target=self.gerenciar_cliente, args=(socket_cliente, endereco_cliente))
+                    thread_cliente.daemon = True
+                    thread_cliente.start()
+
+        except KeyboardInterrupt:
+            print("\nProxy interrompido pelo usuário")
+        except Exception as e:
+            print(f"Erro no proxy: {e}")
+        finally:
+            self.parar()
+
+    def gerenciar_cliente(self, socket_cliente, endereco_cliente):
+        with self.lock:
+            self.conexoes_ativas += 1
+            id_conexao = self.conexoes_ativas
+        try:
+            self.processar_requisicao(socket_cliente, endereco_cliente, id_conexao)
+        finally:
+            with self.lock:
+                self.conexoes_ativas -= 1
+
+    def processar_requisicao(self, socket_cliente, endereco_cliente, id_conexao):
+        #Lê a requisição do cliente, encaminha a um upstream e devolve a resposta (Connection: close com o cliente)
+        try:
+            tempo_inicio = time.time()
+            try:
+                texto_cabecalhos, corpo = self.prazos.ler_requisicao(socket_cliente)
+                if texto_cabecalhos is None:
+                    return
+                try:
+                    metodo, caminho, versao, _ = interpretar_requisicao(texto_cabecalhos)
+                except ValueError:
+                    raise ErroHTTP(400, "Bad Request", "linha de requisição inválida")
+                _, *linhas = texto_cabecalhos.split('\r\n')
+                linha_requisicao = f"{metodo} {caminho} {versao}"
+
+                with self.lock:
+                    self.contador_requisicoes += 1
+                    requisicao_atual = self.contador_requisicoes
+
+                if caminho == CAMINHO_STATUS_PROXY:
+                    resposta = self.gerar_resposta_json(200, "OK", self.gerar_status(), id_conexao)
+                    upstream = None
+                else:
+                    linhas = filtrar_cabecalhos(linhas)
+                    linhas += ['Connection: keep-alive', f'X-Forwarded-For: {endereco_cliente[0]}']
+                    dados_upstream = ('\r\n'.join([linha_requisicao] + linhas) + '\r\n\r\n').encode('utf-8') + corpo
+                    resposta, upstream = self.encaminhar(dados_upstream, metodo in METODOS_IDEMPOTENTES)
+            except ErroHTTP as erro:
+                self.prazos.enviar(socket_cliente, self.gerar_resposta_json(
+                    erro.codigo_status, erro.texto_status, {"erro": erro.codigo_status, "mensagem": erro.mensagem},
+                    id_conexao))
+                return
+
+            self.prazos.enviar(socket_cliente, resposta)
+            print(f"Requisição {requisicao_atual} (conexão {id_conexao}) {metodo} {caminho} -> "
+                  f"{upstream.endereco() if upstream else 'proxy'} em {time.time() - tempo_inicio:.4f}s")
+
+        except (PrazoEscritaExpirado, OSError) as e:
+            print(f"Conexão {id_conexao} encerrada durante o envio: {e}")
+        except Exception as e:
+            print(f"Erro ao processar requisição na conexão {id_conexao}: {e}")
+            try:
+                self.prazos.enviar(socket_cliente, self.gerar_resposta_json(
+                    500, "Erro Interno do Servidor", {"erro": 500, "mensagem": "Erro Interno do Servidor"}, id_conexao))
+            except (PrazoEscritaExpirado, OSError):
+                pass
+        finally:
+            socket_cliente.close()
+
+    def encaminhar(self, dados_upstream, idempotente=True):
+        #Tenta cada upstream no máximo uma vez: falhas de conexão (connect recusado ou expirado) passam para o próximo,
+        #timeout da resposta vira 504 sem nova tentativa (o upstream pode ter executado a requisição)
+        #Requisições não idempotentes só passam para o próximo se não chegaram a ser enviadas; senão viram 502
+        tentados = []
+        while True:
+            upstream = self.balanceador.escolher(tentados)
+            if upstream is None:
+                with self.lock:
+                    self.respostas_502 += 1
+                raise ErroHTTP(502, "Bad Gateway", "nenhum upstream respondeu")
+            tentados.append(upstream)
+            try:
+                codigo, linha_status, linhas, corpo = self.trocar(upstream, dados_upstream, idempotente)
+            except FalhaConexao as e:
+                print(f"Upstream {upstream.endereco()} inacessível: {e}")
+                self.balanceador.liberar(upstream, False)
+                continue
+            except socket.timeout:
+                self.balanceador.liberar(upstream, False)
+                with self.lock:
+                    self.respostas_504 += 1
+                raise ErroHTTP(504, "Gateway Timeout")
+            except FalhaAposEnvio as e:
+                print(f"Upstream {upstream.endereco()} falhou após receber a requisição: {e}")
+                self.balanceador.liberar(upstream, False)
+                with self.lock:
+                    self.respostas_502 += 1
+                raise ErroHTTP(502, "Bad Gateway", "upstream falhou após receber a requisição")
+            except (OSError, ValueError) as e:
+                print(f"Upstream {upstream.endereco()} falhou: {e}")
+                self.balanceador.liberar(upstream, False)
+                continue
+            self.balanceador.liberar(upstream, codigo < 500)
+
+            linhas = filtrar_cabecalhos(linhas)
+            linhas += ['Connection: close', f'X-Upstream: {upstream.endereco()}']
+            #Cabeçalhos reescritos e corpo do upstream seguem como segmentos separados (o corpo não é copiado)
+            return (('\r\n'.join([linha_status] + linhas) + '\r\n\r\n').encode('latin-1'), corpo), upstream
+
+    def trocar(self, upstream, dados_upstream, idempotente=True):
+        #Envia a requisição por uma conexão do pool e lê a resposta
+        #Uma conexão reaproveitada pode ter sido fechada pelo upstream por ociosidade: nesse caso tenta outra, sem contar
+        #falha. Isso vale para qualquer método quando a resposta vem vazia (EOF ou reset sem nenhum byte): o upstream
+        #fecha a conexão ociosa sem ler a requisição. Nos demais erros depois do sendall concluído o upstream pode já
+        #ter executado a requisição, então só as idempotentes são reenviadas; as outras levantam FalhaAposEnvio
+        #Erros e timeouts antes da requisição ser entregue (connect, sendall) levantam FalhaConexao
+        while True:
+            try:
+                conexao, reaproveitada = self.balanceador.obter_conexao(upstream)
+            except OSError as e:
+                raise FalhaConexao(e) from e
+            enviada = False
+            try:
+                conexao.settimeout(self.timeout_upstream)
+                conexao.sendall(dados_upstream)
+                enviada = True
+                codigo, linha_status, linhas, corpo, reutilizavel = ler_resposta_upstream(conexao)
+            except socket.timeout as e:
+                conexao.close()
+                if not enviada:
+                    raise FalhaConexao(e) from e
+                raise
+            except (OSError, ValueError) as e:
+                conexao.close()
+                if reaproveitada and (not enviada or idempotente or isinstance(e, RespostaVazia)):
+                    continue  #Conexão obsoleta do pool
+                if enviada and not idempotente:
+                    raise FalhaAposEnvio(e) from e
+                raise
+            self.balanceador.devolver_conexao(upstream, conexao, reutilizavel)
+            return codigo, linha_status, linhas, corpo
+
+    def gerar_status(self):
+        #Conteúdo de /proxy/status: contadores do proxy e de cada upstream
+        with self.lock:
+            status = {
+                "tipo_servidor": "proxy",
+                "requisicoes": self.contador_requisicoes,
+                "conexoes_ativas": self.conexoes_ativas,
+                "respostas_502": self.respostas_502,
+                "respostas_504": self.respostas_504
+            }
+        status.update(self.balanceador.estatisticas())
+        return status
+
+    def gerar_resposta_json(self, codigo_status, texto_status, dados, id_conexao):
+        dados = dict(dados, timestamp=datetime.now().isoformat())
+        corpo_resposta = json.dumps(dados, indent=2).encode('utf-8')
+        cabecalhos_resposta = f"""HTTP/1.1 {codigo_status} {texto_status}\r
+Content-Type: application/json\r
+Content-Length: {len(corpo_resposta)}\r
+Server: ServidorProxy/1.0\r
+X-Connection-ID: {id_conexao}\r
+Connection: close\r
+\r
+""".encode('utf-8')
+        
+        return cabecalhos_resposta, corpo_resposta
+
+    def parar(self):
+        if self.socket_servidor:
+            self.socket_servidor.close()
+            print("Proxy parado")
+
+if __name__ == "__main__":
+    servidor = ServidorProxy()
+    servidor.iniciar()
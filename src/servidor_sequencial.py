@@ -5,30 +5,63 @@ import socket
 import json
 import time
 from datetime import datetime
-from configuracao import PORTA_SERVIDOR, ID_CUSTOMIZADO
+from configuracao import HOST_SERVIDOR, PORTA_SERVIDOR, ID_CUSTOMIZADO, BACKLOG_SEQUENCIAL, SOCKET_UNIX
+from configuracao import PERFILADOR_ATIVO, PERFILADOR_ARQUIVO, CACHE_BYTES, CACHE_TTL, CACHE_SWR
+from opcoes_socket import OpcoesSocket, criar_socket_escuta, descrever_endereco, remover_socket_unix
+from prazos import PrazosConexao, PrazoEscritaExpirado
+from coalescencia import chave_requisicao
+from cache_respostas import CacheRespostas
+from protocolo import interpretar_requisicao, formatar_server_timing
+from perfilador import PerfiladorAmostragem
+from roteador import ErroHTTP, interpretar_alvo
+from rotas import roteador_padrao
 import os
 
 class ServidorWebSequencial:
-    def __init__(self, host = '0.0.0.0', porta = PORTA_SERVIDOR):
+    def __init__(self, host = HOST_SERVIDOR, porta = PORTA_SERVIDOR, opcoes_socket = None, roteador = None, prazos = None,
+                 cache = None, caminho_unix = SOCKET_UNIX):
+        self.tipo_servidor = "sequencial"
         self.host = host
         self.porta = porta
+        self.caminho_unix = caminho_unix  #Se informado, escuta em AF_UNIX (mesma máquina, sem a pilha TCP/IP)
         self.socket_servidor = None
         self.contador_requisicoes = 0
+        self.opcoes_socket = opcoes_socket or OpcoesSocket(BACKLOG_SEQUENCIAL)
+        self.roteador = roteador or roteador_padrao
+        self.prazos = prazos or PrazosConexao()  #Sem prazos, um único cliente parado bloquearia o servidor inteiro
+        self.conexoes_encerradas_por_prazo = 0
+        if cache is None and CACHE_BYTES > 0:
+            cache = CacheRespostas(CACHE_BYTES, CACHE_TTL, CACHE_SWR)
+        self.cache = cache  #Com stale-while-revalidate o manipulador lento roda fora do laço principal
+        self.perfilador = None
         
     def iniciar(self):
         #Inicia o servidor sequencial
-        self.socket_servidor = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
-        self.socket_servidor.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
-        
         try:
-            self.socket_servidor.bind((self.host, self.porta))
-            self.socket_servidor.listen(1)  #Fila de apenas 1 conexão
-            print(f"Servidor Sequencial iniciado em {self.host}:{self.porta}")
+            self.socket_servidor = criar_socket_escuta(self.host, self.porta, self.caminho_unix)
+            if not self.caminho_unix:
+                self.porta = self.socket_servidor.getsockname()[1]  #Porta real quando 0 (efêmera)
+            self.opcoes_socket.aplicar_escuta(self.socket_servidor)
+            self.socket_servidor.listen(self.opcoes_socket.backlog)  #Padrão: fila de apenas 1 conexão
+            print(f"Servidor Sequencial iniciado em {descrever_endereco(self.socket_servidor)}")
+            print(f"Opções de socket: {self.opcoes_socket.descricao()}")
+            print(f"Prazos por conexão: {self.prazos.descricao()}")
+            print(f"Cache de respostas: {self.descricao_cache()}")
+            
+            #Perfilador contínuo opcional (PERFILAR=1)
+            if PERFILADOR_ATIVO:
+                arquivo_perfil = PERFILADOR_ARQUIVO or os.path.join('resultados', 'perfil_sequencial.folded')
+                self.perfilador = PerfiladorAmostragem(arquivo=arquivo_perfil)
+                self.perfilador.iniciar()
+                print(f"Perfilador ativo ({self.perfilador.taxa_hz} Hz) gravando em {arquivo_perfil}")
             
             while True:
-                socket_cliente, endereco_cliente = self.socket_servidor.accept()
-                print(f"Conexão aceita de {endereco_cliente}")
-                self.processar_requisicao(socket_cliente, endereco_cliente)
+                #Conexões aceitas em lote são atendidas uma de cada vez, na ordem de chegada
+                conexoes = self.opcoes_socket.aceitar_lote(self.socket_servidor)
+                instante_aceite = time.perf_counter()  #As conexões seguintes do lote esperam as anteriores
+                for socket_cliente, endereco_cliente in conexoes:
+                    print(f"Conexão aceita de {endereco_cliente}")
+                    self.processar_requisicao(socket_cliente, endereco_cliente, instante_aceite)
                 
         except KeyboardInterrupt:
             print("\nServidor interrompido pelo usuário")
@@ -37,25 +70,29 @@ class ServidorWebSequencial:
         finally:
             self.parar()
 
-    def processar_requisicao(self, socket_cliente, endereco_cliente):
+    def processar_requisicao(self, socket_cliente, endereco_cliente, instante_aceite=None):
         #Processa uma requisição HTTP
+        #Cada etapa é cronometrada com perf_counter e enviada ao cliente no cabeçalho Server-Timing
         try:
             tempo_inicio = time.time()
-            #Recebe a requisição
-            dados_requisicao = socket_cliente.recv(4096).decode('utf-8')
-            if not dados_requisicao:
+            inicio_atendimento = time.perf_counter()
+            tempos = {'fila': inicio_atendimento - instante_aceite if instante_aceite else 0.0}
+            #Recebe cabeçalhos e corpo dentro dos prazos da conexão
+            try:
+                dados_requisicao, corpo = self.prazos.ler_requisicao(socket_cliente)
+            except ErroHTTP as erro:
+                if erro.codigo_status == 408:
+                    self.conexoes_encerradas_por_prazo += 1
+                resposta = self.gerar_resposta_erro(erro.codigo_status, erro.texto_status, mensagem=erro.mensagem)
+                self.prazos.enviar(socket_cliente, resposta)
                 return
+            if dados_requisicao is None:
+                return
+            fim_leitura = time.perf_counter()
+            tempos['leitura'] = fim_leitura - inicio_atendimento
             #Parse da requisição HTTP
-            linhas_requisicao = dados_requisicao.split('\n')
-            linha_requisicao = linhas_requisicao[0].strip()
-            metodo, caminho, versao = linha_requisicao.split(' ')
-            
-            #Extrai headers
-            cabecalhos = {}
-            for linha in linhas_requisicao[1:]:
-                if ':' in linha:
-                    chave, valor = linha.split(':', 1)
-                    cabecalhos[chave.strip()] = valor.strip()
+            metodo, caminho, versao, cabecalhos = interpretar_requisicao(dados_requisicao)
+            tempos['parse'] = time.perf_counter() - fim_leitura
             
             #Verifica o cabeçalho customizado
             id_customizado = cabecalhos.get('X-Custom-ID', '')
@@ -63,36 +100,76 @@ class ServidorWebSequencial:
             #Validação obrigatória do X-Custom-ID
             if not id_customizado:
                 resposta = self.gerar_resposta_erro(400, "Bad Request - X-Custom-ID obrigatório", id_customizado)
-                socket_cliente.send(resposta.encode('utf-8'))
+                self.prazos.enviar(socket_cliente, resposta)
                 return
             
             self.contador_requisicoes += 1
             
             #Gera resposta baseada no método e path
-            resposta = self.gerar_resposta(metodo, caminho, id_customizado, tempo_inicio)
+            resposta = self.gerar_resposta(metodo, caminho, id_customizado, tempo_inicio, tempos, corpo, cabecalhos)
             
-            #Envia resposta
-            socket_cliente.send(resposta.encode('utf-8'))
+            #Envia resposta (a duração do envio só é conhecida depois, então vai apenas para o log)
+            inicio_envio = time.perf_counter()
+            self.prazos.enviar(socket_cliente, resposta)
+            tempos['envio'] = time.perf_counter() - inicio_envio
             
             tempo_processamento = time.time() - tempo_inicio
-            print(f"Requisição {self.contador_requisicoes} processada em {tempo_processamento:.4f}s")
+            print(f"Requisição {self.contador_requisicoes} processada em {tempo_processamento:.4f}s "
+                  f"[{formatar_server_timing(tempos)}]")
             
+        except (PrazoEscritaExpirado, OSError) as e:
+            #Cliente parou de ler ou a conexão caiu: não há como responder
+            if isinstance(e, PrazoEscritaExpirado):
+                self.conexoes_encerradas_por_prazo += 1
+            print(f"Conexão encerrada durante o envio: {e}")
         except Exception as e:
             print(f"Erro ao processar requisição: {e}")
             resposta_erro = self.gerar_resposta_erro(500, "Erro Interno do Servidor")
-            socket_cliente.send(resposta_erro.encode('utf-8'))
+            try:
+                self.prazos.enviar(socket_cliente, resposta_erro)
+            except (PrazoEscritaExpirado, OSError):
+                pass
         finally:
             socket_cliente.close()
     
-    def gerar_resposta(self, metodo, caminho, id_customizado, tempo_inicio):
+    def gerar_resposta(self, metodo, caminho, id_customizado, tempo_inicio, tempos=None, corpo=b'', cabecalhos=None):
         #Gera resposta HTTP baseada no método e path
-
-        #Simula diferentes tipos de processamento
-        if caminho == '/lento':
-            time.sleep(2)  #Simula processamento lento
-        elif caminho == '/medio':
-            time.sleep(0.5)  #Processamento médio
-        #Path '/' ou '/rapido' - processamento rápido (sem delay)
+        #tempos recebe as etapas já medidas (fila, leitura, parse) e ganha handler e serializacao
+        if tempos is None:
+            tempos = {}
+        
+        #Despacha pelo roteador compartilhado (dicionário por método e caminho)
+        #A query string é separada do caminho antes do despacho
+        caminho_rota, consulta = interpretar_alvo(caminho)
+        try:
+            rota, parametros = self.roteador.resolver(metodo, caminho_rota)
+        except ErroHTTP as erro:
+            return self.gerar_resposta_erro(erro.codigo_status, erro.texto_status, id_customizado, mensagem=erro.mensagem)
+        
+        requisicao = {
+            "metodo": metodo,
+            "caminho": caminho,
+            "caminho_rota": caminho_rota,
+            "parametros": parametros,
+            "consulta": consulta,
+            "corpo": corpo,
+            "num_requisicao": self.contador_requisicoes
+        }
+        inicio_handler = time.perf_counter()
+        cabecalhos_cache = ''
+        try:
+            if self.cache and rota.cacheavel and metodo == 'GET':
+                chave = chave_requisicao(metodo, caminho, cabecalhos or {})
+                conteudo, estado, idade = self.cache.obter(chave, lambda: rota.manipulador(self, requisicao),
+                                                           cabecalhos, rota.ttl_cache)
+                cabecalhos_cache = (f"X-Cache: {estado}\r\nAge: {int(idade)}\r\n"
+                                    f"Cache-Control: {self.cache.cabecalho_cache_control(rota.ttl_cache)}\r\n")
+            else:
+                conteudo = rota.manipulador(self, requisicao)
+        except ErroHTTP as erro:
+            return self.gerar_resposta_erro(erro.codigo_status, erro.texto_status, id_customizado, mensagem=erro.mensagem)
+        inicio_serializacao = time.perf_counter()
+        tempos['handler'] = inicio_serializacao - inicio_handler
         
         dados_resposta = {
             "tipo_servidor": "sequencial",
@@ -104,72 +181,82 @@ class ServidorWebSequencial:
             "id_customizado_esperado": ID_CUSTOMIZADO,
             "id_customizado_valido": id_customizado == ID_CUSTOMIZADO,
             "tempo_processamento": time.time() - tempo_inicio,
-            "mensagem": f"Resposta do servidor sequencial para {metodo} {caminho}"
+            "mensagem": f"Resposta do servidor sequencial para {metodo} {caminho}",
+            "conteudo": conteudo
         }
         
-        if metodo == 'GET':
-            if caminho == '/':
-                dados_resposta["conteudo"] = "Página inicial do servidor sequencial"
-            elif caminho == '/status':
-                dados_resposta["conteudo"] = {
-                    "status_servidor": "rodando",
-                    "total_requisicoes": self.contador_requisicoes,
-                    "tipo_servidor": "sequencial"
-                }
-            elif caminho in ['/rapido', '/medio', '/lento']:
-                dados_resposta["conteudo"] = f"Endpoint {caminho} processado"
-            else:
-                return self.gerar_resposta_erro(404, "Não Encontrado", id_customizado)
-                
-        elif metodo == 'POST':
-            if caminho == '/dados':
-                dados_resposta["conteudo"] = "Dados recebidos via POST"
-            else:
-                return self.gerar_resposta_erro(404, "Não Encontrado", id_customizado)
-                
-        else:
-            return self.gerar_resposta_erro(405, "Método Não Permitido", id_customizado)
-        
-        resposta_json = json.dumps(dados_resposta, indent=2)
+        corpo_resposta = json.dumps(dados_resposta, indent=2).encode('utf-8')
+        tempos['serializacao'] = time.perf_counter() - inicio_serializacao
         
-        resposta = f"""HTTP/1.1 200 OK\r
+        cabecalhos_resposta = f"""HTTP/1.1 200 OK\r
 Content-Type: application/json\r
-Content-Length: {len(resposta_json)}\r
+Content-Length: {len(corpo_resposta)}\r
 Server: ServidorSequencial/1.0\r
 X-Server-Type: sequencial\r
 X-Custom-ID: {id_customizado}\r
+{cabecalhos_cache}Server-Timing: {formatar_server_timing(tempos)}\r
 Connection: close\r
 \r
-{resposta_json}"""
+""".encode('utf-8')
         
-        return resposta
+        #Segmentos enviados sem concatenação (sendmsg); Content-Length é o tamanho do corpo em bytes
+        return cabecalhos_resposta, corpo_resposta
+    
+    def descricao_cache(self):
+        if not self.cache:
+            return "desativado"
+        return (f"{self.cache.capacidade_bytes} bytes, ttl={self.cache.ttl}s, "
+                f"stale-while-revalidate={self.cache.janela_obsoleta}s")
     
-    def gerar_resposta_erro(self, codigo_status, texto_status, id_customizado=""):
+    def gerar_status(self, requisicao):
+        #Conteúdo da rota /status
+        return {
+            "status_servidor": "rodando",
+            "total_requisicoes": self.contador_requisicoes,
+            "conexoes_encerradas_por_prazo": self.conexoes_encerradas_por_prazo,
+            "tipo_servidor": "sequencial"
+        }
+    
+    def gerar_metricas(self, requisicao):
+        #Conteúdo da rota /metrics (sem coalescência: o servidor sequencial nunca tem requisições simultâneas)
+        return {
+            "tipo_servidor": "sequencial",
+            "requisicoes": self.contador_requisicoes,
+            "conexoes_encerradas_por_prazo": self.conexoes_encerradas_por_prazo,
+            "coalescencia": None,
+            "cache": self.cache.estatisticas() if self.cache else None
+        }
+    
+    def gerar_resposta_erro(self, codigo_status, texto_status, id_customizado="", mensagem=None):
         #Gera resposta de erro HTTP
         dados_erro = {
             "erro": codigo_status,
-            "mensagem": texto_status,
+            "mensagem": mensagem or texto_status,
             "tipo_servidor": "sequencial",
             "timestamp": datetime.now().isoformat()
         }
         
-        resposta_json = json.dumps(dados_erro, indent=2)
-        
-        resposta = f"""HTTP/1.1 {codigo_status} {texto_status}\r
+        corpo_resposta = json.dumps(dados_erro, indent=2).encode('utf-8')
+        cabecalhos_resposta = f"""HTTP/1.1 {codigo_status} {texto_status}\r
 Content-Type: application/json\r
-Content-Length: {len(resposta_json)}\r
+Content-Length: {len(corpo_resposta)}\r
 Server: ServidorSequencial/1.0\r
 X-Custom-ID: {id_customizado}\r
 Connection: close\r
 \r
-{resposta_json}"""
+""".encode('utf-8')
         
-        return resposta
+        return cabecalhos_resposta, corpo_resposta
     
     def parar(self):
         #Para o servidor
+        if self.perfilador:
+            self.perfilador.parar()
+            self.perfilador = None
         if self.socket_servidor:
             self.socket_servidor.close()
+            if self.caminho_unix:
+                remover_socket_unix(self.caminho_unix)
             print("Servidor sequencial parado")
 
 if __name__ == "__main__":
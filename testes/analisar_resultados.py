@@ -1,12 +1,37 @@
 #Script para gerar gráficos e análises dos resultados dos testes a partir do CSV
 #Inclui estatisticas com media e desvio padrao de multiplas execucoes
+#Cada gráfico é uma tarefa independente (API orientada a objetos do matplotlib, sem o estado global do pyplot),
+#renderizada em um pool de processos; gráficos cujos dados de entrada não mudaram não são gerados de novo
 import matplotlib
 matplotlib.use('Agg')
-import matplotlib.pyplot as plt
+from matplotlib.figure import Figure
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from matplotlib.colors import LogNorm
+from concurrent.futures import ProcessPoolExecutor
 import numpy as np
 import pandas as pd
 from datetime import datetime
+import argparse
+import hashlib
+import inspect
+import json
 import os
+from rastros import carregar_rastros
+from metadados import carregar_metadados
+from relatorio_html import gerar_relatorio_html
+
+ARQUIVO_CSV_PADRAO = 'resultados/resultados_completos.csv'
+NOME_ARQUIVO_CACHE = '.cache_graficos.json'
+DPI = 300
+
+#(cor, estilo) atribuídos aos servidores na ordem dos metadados da rodada
+PALETA_SERVIDORES = [('red', 'o-'), ('blue', 's-'), ('green', '^-'), ('orange', 'D-'), ('purple', 'v-'),
+                     ('brown', 'P-'), ('gray', 'X-')]
+ESTILO_PADRAO = ('black', 'd-')
+
+def estilos_servidores(servidores):
+    #{servidor: (cor, estilo)} estável para todos os gráficos da rodada
+    return {servidor: PALETA_SERVIDORES[indice % len(PALETA_SERVIDORES)] for indice, servidor in enumerate(servidores)}
 
 #Classe para cores no terminal
 class Cores:
@@ -19,388 +44,402 @@ class Cores:
     @staticmethod
     def sucesso(texto):
         return f"{Cores.VERDE}[SUCESSO]{Cores.RESET} {texto}"
-    
+
     @staticmethod
     def erro(texto):
         return f"{Cores.VERMELHO}[ERRO]{Cores.RESET} {texto}"
-    
+
     @staticmethod
     def info(texto):
         return f"{Cores.AZUL}[INFO]{Cores.RESET} {texto}"
 
+#============================================================================
+#RENDERIZADORES (funções de módulo: executadas nos processos do pool)
+#============================================================================
+
+def nova_figura(largura=12, altura=8):
+    #Figura com canvas Agg próprio, independente do estado global do pyplot
+    figura = Figure(figsize=(largura, altura))
+    FigureCanvasAgg(figura)
+    return figura
+
+def renderizar_metrica_cenario(caminho, dados_cenario, estilos, coluna, titulo, rotulo_x, rotulo_y, formato, execucoes,
+                               coluna_desvio=None, limite_y=None):
+    #Uma métrica por número de requisições, uma linha por servidor (com barras de erro se coluna_desvio)
+    figura = nova_figura()
+    eixo = figura.subplots()
+
+    for servidor, (cor, estilo) in estilos.items():
+        dados = dados_cenario[dados_cenario['servidor'] == servidor].sort_values('num_requisicoes')
+        if dados.empty:
+            continue
+        rotulo = f'Servidor {servidor.capitalize()}'
+        if coluna_desvio:
+            eixo.errorbar(dados['num_requisicoes'], dados[coluna], yerr=dados[coluna_desvio],
+                          fmt=estilo, label=rotulo, color=cor, linewidth=3,
+                          markersize=10, capsize=5, capthick=2, alpha=0.8)
+        else:
+            eixo.plot(dados['num_requisicoes'], dados[coluna], estilo, label=rotulo,
+                      color=cor, linewidth=3, markersize=10, alpha=0.8)
+
+        #Adicionar valores nos pontos
+        for x, y in zip(dados['num_requisicoes'], dados[coluna]):
+            eixo.annotate(formato.format(y), (x, y), textcoords="offset points",
+                          xytext=(0, 10), ha='center', fontsize=10, color=cor)
+
+    subtitulo = f'Média +/- Desvio Padrão de {execucoes} execuções' if coluna_desvio else f'Média de {execucoes} execuções'
+    eixo.set_title(f'{titulo}\n({subtitulo})', fontsize=16, fontweight='bold', pad=20)
+    eixo.set_xlabel(rotulo_x, fontsize=14, fontweight='bold')
+    eixo.set_ylabel(rotulo_y, fontsize=14, fontweight='bold')
+    eixo.legend(fontsize=12, frameon=True, fancybox=True, shadow=True)
+    eixo.grid(True, alpha=0.3, linestyle='--')
+    eixo.set_xlim(left=0)
+    if limite_y:
+        eixo.set_ylim(*limite_y)
+    else:
+        eixo.set_ylim(bottom=0)
+
+    figura.tight_layout()
+    figura.savefig(caminho, dpi=DPI, bbox_inches='tight')
+
+def renderizar_comparacao_throughput(caminho, dados, cenarios, estilos, execucoes):
+    #Barras do throughput médio de cada servidor por cenário
+    figura = nova_figura(14, 10)
+    eixo = figura.subplots()
+    x = np.arange(len(cenarios))
+    largura = 0.8 / max(1, len(estilos))
+
+    for indice, (servidor, (cor, _)) in enumerate(estilos.items()):
+        medias = []
+        for cenario, _ in cenarios:
+            dados_servidor = dados[(dados['cenario'] == cenario) & (dados['servidor'] == servidor)]
+            medias.append(dados_servidor['throughput_media'].mean() if not dados_servidor.empty else 0)
+
+        barras = eixo.bar(x - 0.4 + largura * (indice + 0.5), medias, largura, label=f'Servidor {servidor.capitalize()}',
+                          color=cor, alpha=0.8, edgecolor='black', linewidth=1)
+
+        #Adicionar valores nas barras
+        for barra, valor in zip(barras, medias):
+            if valor > 0:
+                eixo.text(barra.get_x() + barra.get_width() / 2, barra.get_height() + 0.1,
+                          f'{valor:.1f}', ha='center', va='bottom', fontsize=10, color=cor)
+
+    eixo.set_title(f'Comparação de Escalabilidade entre Servidores\n(Throughput Médio de {execucoes} execuções)',
+                   fontsize=16, fontweight='bold', pad=20)
+    eixo.set_xlabel('Cenário de Processamento', fontsize=14, fontweight='bold')
+    eixo.set_ylabel('Throughput Médio (req/s)', fontsize=14, fontweight='bold')
+    eixo.set_xticks(x, [nome for _, nome in cenarios], fontsize=12)
+    eixo.legend(fontsize=12, frameon=True, fancybox=True, shadow=True)
+    eixo.grid(True, alpha=0.3, axis='y', linestyle='--')
+    eixo.set_ylim(bottom=0)
+
+    figura.tight_layout()
+    figura.savefig(caminho, dpi=DPI, bbox_inches='tight')
+
+def renderizar_recursos(caminho, dados_cenario, estilos, nome_cenario, rotulo_x):
+    #CPU, memória, threads e descritores dos servidores (2x2)
+    metricas = [
+        ('cpu_media', 'CPU Média (%)'),
+        ('rss_pico_mb', 'Memória RSS Pico (MB)'),
+        ('threads_pico', 'Threads (pico)'),
+        ('fds_pico', 'Descritores Abertos (pico)')
+    ]
+    figura = nova_figura(14, 10)
+    eixos = figura.subplots(2, 2)
+
+    for eixo, (coluna, rotulo) in zip(eixos.flat, metricas):
+        for servidor, (cor, estilo) in estilos.items():
+            dados = dados_cenario[dados_cenario['servidor'] == servidor].sort_values('num_requisicoes')
+            if not dados.empty:
+                eixo.plot(dados['num_requisicoes'], dados[coluna], estilo,
+                          label=f'Servidor {servidor.capitalize()}', color=cor,
+                          linewidth=2, markersize=7, alpha=0.8)
+        eixo.set_title(rotulo, fontsize=12, fontweight='bold')
+        eixo.set_xlabel(rotulo_x, fontsize=10)
+        eixo.grid(True, alpha=0.3, linestyle='--')
+        eixo.set_xlim(left=0)
+        eixo.set_ylim(bottom=0)
+        eixo.legend(fontsize=9)
+
+    figura.suptitle(f'Recursos dos Servidores - Cenário {nome_cenario}', fontsize=16, fontweight='bold')
+    figura.tight_layout()
+    figura.savefig(caminho, dpi=DPI, bbox_inches='tight')
+
+def renderizar_throughput_tempo(caminho, rastros_cenario, estilos, cenario):
+    #Throughput por intervalo de tempo, relativo à primeira requisição de cada servidor no cenário
+    figura = nova_figura(14, 6)
+    eixo = figura.subplots()
+    for servidor in rastros_cenario['servidor'].unique():
+        dados = rastros_cenario[rastros_cenario['servidor'] == servidor]
+        instantes = (dados['fim'] - dados['inicio'].min()).to_numpy()
+        largura = max(0.1, instantes.max() / 200)
+        contagens, bordas = np.histogram(instantes, bins=np.arange(0, instantes.max() + largura, largura))
+        eixo.plot(bordas[:-1], contagens / largura, label=f'Servidor {servidor.capitalize()}',
+                  color=estilos.get(servidor, ESTILO_PADRAO)[0], linewidth=1.5, alpha=0.8)
+    eixo.set_title(f'Throughput ao Longo do Tempo - Cenário {cenario}', fontsize=16, fontweight='bold')
+    eixo.set_xlabel('Tempo desde a primeira requisição (s)', fontsize=12, fontweight='bold')
+    eixo.set_ylabel('Throughput (requisições/segundo)', fontsize=12, fontweight='bold')
+    eixo.legend(fontsize=11)
+    eixo.grid(True, alpha=0.3, linestyle='--')
+    eixo.set_ylim(bottom=0)
+    figura.tight_layout()
+    figura.savefig(caminho, dpi=DPI, bbox_inches='tight')
+
+def renderizar_heatmap_latencia(caminho, rastros_cenario, cenario):
+    #Mapa de calor: tempo x latência (escala log), cor = quantidade de requisições
+    servidores = list(rastros_cenario['servidor'].unique())
+    figura = nova_figura(7 * len(servidores), 6)
+    eixos = figura.subplots(1, len(servidores), squeeze=False)
+    for eixo, servidor in zip(eixos[0], servidores):
+        dados = rastros_cenario[rastros_cenario['servidor'] == servidor]
+        instantes = (dados['fim'] - dados['inicio'].min()).to_numpy()
+        latencias = dados['tempo_resposta'].to_numpy() * 1000
+        bordas_latencia = np.logspace(np.log10(max(latencias.min(), 0.01)), np.log10(latencias.max() * 1.01), 40)
+        contagens, bordas_tempo, bordas_latencia = np.histogram2d(instantes, latencias, bins=[100, bordas_latencia])
+        malha = eixo.pcolormesh(bordas_tempo, bordas_latencia, contagens.T,
+                                norm=LogNorm(vmin=1, vmax=max(2, contagens.max())), cmap='viridis')
+        eixo.set_yscale('log')
+        eixo.set_title(f'Servidor {servidor.capitalize()}', fontsize=12, fontweight='bold')
+        eixo.set_xlabel('Tempo desde a primeira requisição (s)', fontsize=10)
+        eixo.set_ylabel('Tempo de resposta (ms)', fontsize=10)
+        figura.colorbar(malha, ax=eixo, label='Requisições')
+    figura.suptitle(f'Latência ao Longo do Tempo - Cenário {cenario}', fontsize=16, fontweight='bold')
+    figura.tight_layout()
+    figura.savefig(caminho, dpi=DPI, bbox_inches='tight')
+
+def renderizar_curva_capacidade(caminho, curva_cenario, estilos, cenario, slo_p99):
+    #Latência p99 x taxa oferecida dos pontos da busca de capacidade; o joelho de cada servidor é marcado com uma estrela
+    figura = nova_figura(12, 7)
+    eixo = figura.subplots()
+    for servidor in curva_cenario['servidor'].unique():
+        dados = curva_cenario[curva_cenario['servidor'] == servidor].sort_values('taxa_alvo')
+        cor, estilo = estilos.get(servidor, ESTILO_PADRAO)
+        eixo.plot(dados['taxa_alvo'], dados['tempo_resposta_p99'], estilo, color=cor, linewidth=1.5, markersize=6,
+                  label=f'Servidor {servidor.capitalize()}')
+        joelho = dados[dados['joelho']]
+        eixo.plot(joelho['taxa_alvo'], joelho['tempo_resposta_p99'], '*', color=cor, markersize=18,
+                  markeredgecolor='black')
+    if slo_p99:
+        eixo.axhline(slo_p99, color='gray', linestyle='--', linewidth=1.2, label=f'SLO p99 ({slo_p99:.0f} ms)')
+    eixo.set_xscale('log')
+    eixo.set_yscale('log')
+    eixo.set_title(f'Latência x Carga Oferecida - Cenário {cenario}', fontsize=16, fontweight='bold')
+    eixo.set_xlabel('Taxa oferecida (requisições/segundo, escala log)', fontsize=12, fontweight='bold')
+    eixo.set_ylabel('Tempo de resposta p99 (ms, escala log)', fontsize=12, fontweight='bold')
+    eixo.legend(fontsize=11)
+    eixo.grid(True, alpha=0.3, linestyle='--')
+    figura.tight_layout()
+    figura.savefig(caminho, dpi=DPI, bbox_inches='tight')
+
+def executar_tarefa(tarefa):
+    #Ponto de entrada dos processos do pool: (caminho, renderizador, argumentos)
+    caminho, renderizador, argumentos = tarefa
+    renderizador(caminho, *argumentos)
+    return caminho
+
+def hash_tarefa(renderizador, argumentos):
+    #Hash do conteúdo de entrada: código do renderizador, DPI e argumentos (DataFrames pelo conteúdo das linhas)
+    resumo = hashlib.sha256()
+    resumo.update(inspect.getsource(renderizador).encode('utf-8'))
+    resumo.update(str(DPI).encode('utf-8'))
+    for argumento in argumentos:
+        if isinstance(argumento, pd.DataFrame):
+            resumo.update(','.join(map(str, argumento.columns)).encode('utf-8'))
+            resumo.update(pd.util.hash_pandas_object(argumento, index=False).to_numpy().tobytes())
+        else:
+            resumo.update(repr(argumento).encode('utf-8'))
+    return resumo.hexdigest()
+
 class AnalisadorResultados:
-    def __init__(self, arquivo_csv='resultados/resultados_completos.csv'):
+    def __init__(self, arquivo_csv=ARQUIVO_CSV_PADRAO):
         self.arquivo_csv = arquivo_csv
+        self.diretorio_graficos = os.path.join(os.path.dirname(arquivo_csv), 'graficos')
         self.df = None
+        self.metadados = None
+        self.servidores = []
+        self.cenarios = []  #[(nome, rótulo)]
+        self.rotulo_x = 'Número de Requisições'
         self.carregar_resultados_csv()
-        
+
     def carregar_resultados_csv(self):
-        #Carrega os resultados dos testes do arquivo CSV
+        #Carrega os resultados dos testes do arquivo CSV e descobre servidores e cenários pelos metadados da rodada
         try:
             self.df = pd.read_csv(self.arquivo_csv)
-            
-            #Assumir 2 requisições por cliente (conforme configuração do teste)
-            requisicoes_por_cliente = 2
-            self.df['num_requisicoes'] = self.df['num_clientes'] * requisicoes_por_cliente
-            
-            print(Cores.info(f"Dados carregados: {len(self.df)} registros encontrados"))
         except FileNotFoundError:
             print(Cores.erro(f"Arquivo CSV não encontrado: {self.arquivo_csv}"))
             print("Execute primeiro os testes completos para gerar o arquivo CSV")
             self.df = None
+            return
         except Exception as e:
             print(Cores.erro(f"Erro ao carregar CSV: {e}"))
             self.df = None
-    
-    def gerar_todos_graficos(self):
-        #Gera todos os gráficos de análise a partir do CSV com barras de erro
+            return
+
+        self.metadados = carregar_metadados(self.arquivo_csv) or {}
+        if 'throughput_media' not in self.df.columns:
+            esquema = self.metadados.get('esquema', 'desconhecido')
+            print(Cores.erro(f"CSV sem estatísticas por célula (esquema '{esquema}'); execute os testes completos"))
+            self.df = None
+            return
+
+        self.definir_requisicoes()
+        self.servidores = self.descobrir(self.df['servidor'], list(self.metadados.get('servidores', [])))
+        descricoes = {cenario['nome']: cenario.get('descricao') for cenario in self.metadados.get('cenarios', [])}
+        self.cenarios = [(nome, f"{nome} ({descricoes[nome]})" if descricoes.get(nome) else nome)
+                         for nome in self.descobrir(self.df['cenario'], list(descricoes))]
+
+        print(Cores.info(f"Dados carregados: {len(self.df)} registros encontrados"))
+        print(Cores.info(f"Servidores: {', '.join(self.servidores)} | Cenários: {', '.join(n for n, _ in self.cenarios)}"
+                         + (f" | Configuração {self.metadados['hash_configuracao']}" if self.metadados else "")))
+
+    def descobrir(self, coluna, ordem_metadados):
+        #Valores presentes no CSV, na ordem dos metadados e depois na ordem em que aparecem
+        presentes = list(dict.fromkeys(coluna.astype(str)))
+        return [valor for valor in ordem_metadados if valor in presentes] + \
+               [valor for valor in presentes if valor not in ordem_metadados]
+
+    def definir_requisicoes(self):
+        #num_requisicoes = clientes x requisições por cliente (coluna do CSV ou configuração dos metadados)
+        #Sem nenhum dos dois (CSV antigo), o eixo x passa a ser o número de clientes
+        if 'requisicoes_por_cliente' in self.df.columns:
+            self.df['num_requisicoes'] = self.df['num_clientes'] * self.df['requisicoes_por_cliente']
+        elif 'requisicoes_por_cliente' in self.metadados.get('configuracao', {}):
+            self.df['num_requisicoes'] = self.df['num_clientes'] * self.metadados['configuracao']['requisicoes_por_cliente']
+        else:
+            print(Cores.info("Requisições por cliente desconhecidas (CSV sem metadados); eixo x = número de clientes"))
+            self.df['num_requisicoes'] = self.df['num_clientes']
+            self.rotulo_x = 'Número de Clientes'
+
+    def listar_tarefas(self):
+        #Monta a lista de gráficos: (caminho, renderizador, argumentos)
+        tarefas = []
+        execucoes = self.df['execucoes'].iloc[0] if not self.df.empty else 10
+        estilos = estilos_servidores(self.servidores)
+        metricas = [
+            ('throughput', 'throughput_media', 'Throughput', 'Throughput (requisições/segundo)', '{:.1f}', None, None),
+            ('tempo_resposta', 'tempo_resposta_media', 'Tempo de Resposta', 'Tempo Médio de Resposta (ms)', '{:.1f}ms', None, None),
+            ('taxa_sucesso', 'taxa_sucesso_media', 'Taxa de Sucesso', 'Taxa de Sucesso (%)', '{:.1f}%', None, (0, 105)),
+            ('tempo_total', 'tempo_total_media', 'Tempo Total de Execução', 'Tempo Total de Execução (s)', '{:.2f}s',
+             'tempo_total_desvio', None),
+        ]
+
+        for cenario, rotulo_cenario in self.cenarios:
+            dados_cenario = self.df[self.df['cenario'] == cenario]
+            for prefixo, coluna, titulo, rotulo_y, formato, coluna_desvio, limite_y in metricas:
+                colunas = ['servidor', 'num_requisicoes', coluna] + ([coluna_desvio] if coluna_desvio else [])
+                tarefas.append((os.path.join(self.diretorio_graficos, f'{prefixo}_{cenario}.png'), renderizar_metrica_cenario,
+                                (dados_cenario[colunas], estilos, coluna, f'{titulo} - Cenário {rotulo_cenario}',
+                                 self.rotulo_x, rotulo_y, formato, execucoes, coluna_desvio, limite_y)))
+
+        tarefas.append((os.path.join(self.diretorio_graficos, 'comparacao_throughput.png'), renderizar_comparacao_throughput,
+                        (self.df[['cenario', 'servidor', 'throughput_media']], [(nome, nome) for nome, _ in self.cenarios],
+                         estilos, execucoes)))
+
+        #Recursos: as colunas só existem em rodadas com amostragem (harness local ou rota /recursos)
+        if 'rss_pico_mb' in self.df.columns:
+            for cenario, rotulo_cenario in self.cenarios:
+                dados_cenario = self.df[(self.df['cenario'] == cenario) & (self.df['rss_pico_mb'] > 0)]
+                if not dados_cenario.empty:
+                    colunas = ['servidor', 'num_requisicoes', 'cpu_media', 'rss_pico_mb', 'threads_pico', 'fds_pico']
+                    tarefas.append((os.path.join(self.diretorio_graficos, f'recursos_{cenario}.png'), renderizar_recursos,
+                                    (dados_cenario[colunas], estilos, rotulo_cenario, self.rotulo_x)))
+
+        #Séries temporais a partir dos rastros por requisição
+        rastros = carregar_rastros(os.path.dirname(os.path.abspath(self.arquivo_csv)))
+        if rastros is not None and not rastros.empty:
+            rastros = rastros[rastros['sucesso'] & rastros['fim'].notna()]
+            for cenario in rastros['cenario'].unique():
+                rastros_cenario = rastros.loc[rastros['cenario'] == cenario, ['servidor', 'inicio', 'fim', 'tempo_resposta']]
+                rastros_cenario = rastros_cenario.assign(servidor=rastros_cenario['servidor'].astype(str))
+                tarefas.append((os.path.join(self.diretorio_graficos, f'throughput_tempo_{cenario}.png'),
+                                renderizar_throughput_tempo, (rastros_cenario, estilos, cenario)))
+                tarefas.append((os.path.join(self.diretorio_graficos, f'heatmap_latencia_{cenario}.png'),
+                                renderizar_heatmap_latencia, (rastros_cenario, cenario)))
+
+        #Curvas da busca de capacidade (harness_local.py --capacidade), quando existirem ao lado do CSV
+        diretorio = os.path.dirname(os.path.abspath(self.arquivo_csv))
+        caminho_curva = os.path.join(diretorio, 'resultados_capacidade_curva.csv')
+        if os.path.exists(caminho_curva):
+            curva = pd.read_csv(caminho_curva)
+            caminho_resumo = os.path.join(diretorio, 'resultados_capacidade.csv')
+            resumo = pd.read_csv(caminho_resumo) if os.path.exists(caminho_resumo) else None
+            for cenario in curva['cenario'].unique():
+                slo_p99 = float(resumo.loc[resumo['cenario'] == cenario, 'slo_p99'].iloc[0]) \
+                    if resumo is not None and (resumo['cenario'] == cenario).any() else None
+                tarefas.append((os.path.join(self.diretorio_graficos, f'capacidade_{cenario}.png'),
+                                renderizar_curva_capacidade,
+                                (curva[curva['cenario'] == cenario], estilos_servidores(list(curva['servidor'].unique())),
+                                 cenario, slo_p99)))
+        return tarefas
+
+    def carregar_cache(self):
+        try:
+            with open(os.path.join(self.diretorio_graficos, NOME_ARQUIVO_CACHE), 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def gerar_todos_graficos(self, processos=None, usar_cache=True):
+        #Gera todos os gráficos em paralelo, pulando os que já existem com as mesmas entradas
         if self.df is None or self.df.empty:
             print(Cores.erro("Nenhum resultado disponível para análise"))
             return
-        
-        print(Cores.info("Configurando estilo dos gráficos..."))
-        #Configura o estilo dos gráficos
-        plt.style.use('default')
-        plt.rcParams['figure.figsize'] = (12, 8)
-        plt.rcParams['font.size'] = 10
-        
+
         #Cria diretório para gráficos
-        os.makedirs('resultados/graficos', exist_ok=True)
-        
-        print(Cores.info("Gerando gráficos..."))
-        
-        #Gráficos individuais
-        print(Cores.info("  • Plotando throughput..."))
-        self.plotar_throughput_estatistico()
-        
-        print(Cores.info("  • Plotando tempo de resposta..."))
-        self.plotar_tempo_resposta_estatistico()
-        
-        print(Cores.info("  • Plotando taxa de sucesso..."))
-        self.plotar_taxa_sucesso_estatistico()
-        
-        print(Cores.info("  • Plotando tempo total (com desvio padrão)..."))
-        self.plotar_tempo_total_estatistico()
-        
-        print(Cores.info("  • Plotando comparação de escalabilidade..."))
-        self.plotar_comparacao_escalabilidade_estatistico()
-        
-        print(Cores.sucesso("Gráficos com estatísticas salvos em resultados/graficos/"))
-
-    def plotar_throughput_estatistico(self):
-        #Plota gráfico de throughput com barras de erro - um gráfico por cenário
-        cenarios = ['rapido', 'medio', 'lento']
-        cenarios_nomes = ['Rápido', 'Médio', 'Lento']
-        
-        try:
-            for i, cenario in enumerate(cenarios):
-                plt.figure(figsize=(12, 8))
-                dados_cenario = self.df[self.df['cenario'] == cenario]
-                
-                print(Cores.info(f"    - Processando cenário {cenarios_nomes[i]}: {len(dados_cenario)} registros"))
-                
-                if dados_cenario.empty:
-                    plt.text(0.5, 0.5, f'Sem dados para cenário {cenarios_nomes[i]}', 
-                            ha='center', va='center', transform=plt.gca().transAxes, fontsize=14)
-                    plt.title(f'Throughput - Cenário {cenarios_nomes[i]}', fontsize=16, fontweight='bold')
-                    plt.savefig(f'resultados/graficos/throughput_{cenario}.png', dpi=300, bbox_inches='tight')
-                    plt.close()
-                    continue
-                
-                dados_seq = dados_cenario[dados_cenario['servidor'] == 'sequencial'].sort_values('num_requisicoes')
-                dados_conc = dados_cenario[dados_cenario['servidor'] == 'concorrente'].sort_values('num_requisicoes')
-                
-                print(Cores.info(f"      Sequencial: {len(dados_seq)} registros, Concorrente: {len(dados_conc)} registros"))
-                
-                if not dados_seq.empty:
-                    plt.plot(dados_seq['num_requisicoes'], dados_seq['throughput_media'], 
-                            'o-', label='Servidor Sequencial', color='red', linewidth=3, 
-                            markersize=10, alpha=0.8)
-                
-                if not dados_conc.empty:
-                    plt.plot(dados_conc['num_requisicoes'], dados_conc['throughput_media'],
-                            's-', label='Servidor Concorrente', color='blue', linewidth=3, 
-                            markersize=10, alpha=0.8)
-                
-                execucoes = self.df['execucoes'].iloc[0] if not self.df.empty else 10
-                plt.title(f'Throughput - Cenário {cenarios_nomes[i]}\n(Média de {execucoes} execuções)', 
-                         fontsize=16, fontweight='bold', pad=20)
-                plt.xlabel('Número de Requisições', fontsize=14, fontweight='bold')
-                plt.ylabel('Throughput (requisições/segundo)', fontsize=14, fontweight='bold')
-                plt.legend(fontsize=12, frameon=True, fancybox=True, shadow=True)
-                plt.grid(True, alpha=0.3, linestyle='--')
-                plt.xlim(left=0)
-                plt.ylim(bottom=0)
-                
-                #Adicionar valores nos pontos
-                if not dados_seq.empty:
-                    for x, y in zip(dados_seq['num_requisicoes'], dados_seq['throughput_media']):
-                        plt.annotate(f'{y:.1f}', (x, y), textcoords="offset points", 
-                                   xytext=(0,10), ha='center', fontsize=10, color='red')
-                
-                if not dados_conc.empty:
-                    for x, y in zip(dados_conc['num_requisicoes'], dados_conc['throughput_media']):
-                        plt.annotate(f'{y:.1f}', (x, y), textcoords="offset points", 
-                                   xytext=(0,10), ha='center', fontsize=10, color='blue')
-                
-                plt.tight_layout()
-                plt.savefig(f'resultados/graficos/throughput_{cenario}.png', dpi=300, bbox_inches='tight')
-                plt.close()
-                
-        except Exception as e:
-            print(Cores.erro(f"Erro ao plotar throughput: {e}"))
-
-    def plotar_tempo_resposta_estatistico(self):
-        #Plota gráfico de tempo de resposta com barras de erro - um gráfico por cenário
-        cenarios = ['rapido', 'medio', 'lento']
-        cenarios_nomes = ['Rápido', 'Médio', 'Lento']
-        
-        for i, cenario in enumerate(cenarios):
-            plt.figure(figsize=(12, 8))
-            dados_cenario = self.df[self.df['cenario'] == cenario]
-            
-            if dados_cenario.empty:
-                plt.text(0.5, 0.5, f'Sem dados para cenário {cenarios_nomes[i]}', 
-                        ha='center', va='center', transform=plt.gca().transAxes, fontsize=14)
-                plt.title(f'Tempo de Resposta - Cenário {cenarios_nomes[i]}', fontsize=16, fontweight='bold')
-                plt.savefig(f'resultados/graficos/tempo_resposta_{cenario}.png', dpi=300, bbox_inches='tight')
-                plt.close()
-                continue
-            
-            dados_seq = dados_cenario[dados_cenario['servidor'] == 'sequencial'].sort_values('num_requisicoes')
-            dados_conc = dados_cenario[dados_cenario['servidor'] == 'concorrente'].sort_values('num_requisicoes')
-            
-            if not dados_seq.empty:
-                plt.plot(dados_seq['num_requisicoes'], dados_seq['tempo_resposta_media'],
-                        'o-', label='Servidor Sequencial', color='red', linewidth=3, 
-                        markersize=10, alpha=0.8)
-            
-            if not dados_conc.empty:
-                plt.plot(dados_conc['num_requisicoes'], dados_conc['tempo_resposta_media'],
-                        's-', label='Servidor Concorrente', color='blue', linewidth=3, 
-                        markersize=10, alpha=0.8)
-            
-            execucoes = self.df['execucoes'].iloc[0] if not self.df.empty else 10
-            plt.title(f'Tempo de Resposta - Cenário {cenarios_nomes[i]}\n(Média de {execucoes} execuções)', 
-                     fontsize=16, fontweight='bold', pad=20)
-            plt.xlabel('Número de Requisições', fontsize=14, fontweight='bold')
-            plt.ylabel('Tempo Médio de Resposta (ms)', fontsize=14, fontweight='bold')
-            plt.legend(fontsize=12, frameon=True, fancybox=True, shadow=True)
-            plt.grid(True, alpha=0.3, linestyle='--')
-            plt.xlim(left=0)
-            plt.ylim(bottom=0)
-            
-            #Adicionar valores nos pontos
-            if not dados_seq.empty:
-                for x, y in zip(dados_seq['num_requisicoes'], dados_seq['tempo_resposta_media']):
-                    plt.annotate(f'{y:.1f}ms', (x, y), textcoords="offset points", 
-                               xytext=(0,10), ha='center', fontsize=10, color='red')
-            
-            if not dados_conc.empty:
-                for x, y in zip(dados_conc['num_requisicoes'], dados_conc['tempo_resposta_media']):
-                    plt.annotate(f'{y:.1f}ms', (x, y), textcoords="offset points", 
-                               xytext=(0,10), ha='center', fontsize=10, color='blue')
-            
-            plt.tight_layout()
-            plt.savefig(f'resultados/graficos/tempo_resposta_{cenario}.png', dpi=300, bbox_inches='tight')
-            plt.close()
-
-    def plotar_taxa_sucesso_estatistico(self):
-        #Plota gráfico de taxa de sucesso com barras de erro - um gráfico por cenário
-        cenarios = ['rapido', 'medio', 'lento']
-        cenarios_nomes = ['Rápido', 'Médio', 'Lento']
-        
-        for i, cenario in enumerate(cenarios):
-            plt.figure(figsize=(12, 8))
-            dados_cenario = self.df[self.df['cenario'] == cenario]
-            
-            if dados_cenario.empty:
-                plt.text(0.5, 0.5, f'Sem dados para cenário {cenarios_nomes[i]}', 
-                        ha='center', va='center', transform=plt.gca().transAxes, fontsize=14)
-                plt.title(f'Taxa de Sucesso - Cenário {cenarios_nomes[i]}', fontsize=16, fontweight='bold')
-                plt.savefig(f'resultados/graficos/taxa_sucesso_{cenario}.png', dpi=300, bbox_inches='tight')
-                plt.close()
-                continue
-            
-            dados_seq = dados_cenario[dados_cenario['servidor'] == 'sequencial'].sort_values('num_requisicoes')
-            dados_conc = dados_cenario[dados_cenario['servidor'] == 'concorrente'].sort_values('num_requisicoes')
-            
-            if not dados_seq.empty:
-                plt.plot(dados_seq['num_requisicoes'], dados_seq['taxa_sucesso_media'],
-                        'o-', label='Servidor Sequencial', color='red', linewidth=3, 
-                        markersize=10, alpha=0.8)
-            
-            if not dados_conc.empty:
-                plt.plot(dados_conc['num_requisicoes'], dados_conc['taxa_sucesso_media'],
-                        's-', label='Servidor Concorrente', color='blue', linewidth=3, 
-                        markersize=10, alpha=0.8)
-            
-            execucoes = self.df['execucoes'].iloc[0] if not self.df.empty else 10
-            plt.title(f'Taxa de Sucesso - Cenário {cenarios_nomes[i]}\n(Média de {execucoes} execuções)', 
-                     fontsize=16, fontweight='bold', pad=20)
-            plt.xlabel('Número de Requisições', fontsize=14, fontweight='bold')
-            plt.ylabel('Taxa de Sucesso (%)', fontsize=14, fontweight='bold')
-            plt.legend(fontsize=12, frameon=True, fancybox=True, shadow=True)
-            plt.grid(True, alpha=0.3, linestyle='--')
-            plt.xlim(left=0)
-            plt.ylim(0, 105)  #Foco em 0-105% para melhor visualização
-
-            #Adicionar valores nos pontos
-            if not dados_seq.empty:
-                for x, y in zip(dados_seq['num_requisicoes'], dados_seq['taxa_sucesso_media']):
-                    plt.annotate(f'{y:.1f}%', (x, y), textcoords="offset points", 
-                               xytext=(0,10), ha='center', fontsize=10, color='red')
-            
-            if not dados_conc.empty:
-                for x, y in zip(dados_conc['num_requisicoes'], dados_conc['taxa_sucesso_media']):
-                    plt.annotate(f'{y:.1f}%', (x, y), textcoords="offset points", 
-                               xytext=(0,10), ha='center', fontsize=10, color='blue')
-            
-            plt.tight_layout()
-            plt.savefig(f'resultados/graficos/taxa_sucesso_{cenario}.png', dpi=300, bbox_inches='tight')
-            plt.close()
-
-    def plotar_tempo_total_estatistico(self):
-        #Plota gráfico de tempo total com barras de erro - um gráfico por cenário
-        cenarios = ['rapido', 'medio', 'lento']
-        cenarios_nomes = ['Rápido', 'Médio', 'Lento']
-        
-        for i, cenario in enumerate(cenarios):
-            plt.figure(figsize=(12, 8))
-            dados_cenario = self.df[self.df['cenario'] == cenario]
-            
-            if dados_cenario.empty:
-                plt.text(0.5, 0.5, f'Sem dados para cenário {cenarios_nomes[i]}', 
-                        ha='center', va='center', transform=plt.gca().transAxes, fontsize=14)
-                plt.title(f'Tempo Total de Execução - Cenário {cenarios_nomes[i]}', fontsize=16, fontweight='bold')
-                plt.savefig(f'resultados/graficos/tempo_total_{cenario}.png', dpi=300, bbox_inches='tight')
-                plt.close()
-                continue
-            
-            dados_seq = dados_cenario[dados_cenario['servidor'] == 'sequencial'].sort_values('num_requisicoes')
-            dados_conc = dados_cenario[dados_cenario['servidor'] == 'concorrente'].sort_values('num_requisicoes')
-            
-            if not dados_seq.empty:
-                plt.errorbar(dados_seq['num_requisicoes'], dados_seq['tempo_total_media'], 
-                           yerr=dados_seq['tempo_total_desvio'],
-                           fmt='o-', label='Servidor Sequencial', color='red', linewidth=3, 
-                           markersize=10, capsize=5, capthick=2, alpha=0.8)
-            
-            if not dados_conc.empty:
-                plt.errorbar(dados_conc['num_requisicoes'], dados_conc['tempo_total_media'], 
-                           yerr=dados_conc['tempo_total_desvio'],
-                           fmt='s-', label='Servidor Concorrente', color='blue', linewidth=3, 
-                           markersize=10, capsize=5, capthick=2, alpha=0.8)
-            
-            execucoes = self.df['execucoes'].iloc[0] if not self.df.empty else 10
-            plt.title(f'Tempo Total de Execução - Cenário {cenarios_nomes[i]}\n(Média +/- Desvio Padrão de {execucoes} execuções)', 
-                     fontsize=16, fontweight='bold', pad=20)
-            plt.xlabel('Número de Requisições', fontsize=14, fontweight='bold')
-            plt.ylabel('Tempo Total de Execução (s)', fontsize=14, fontweight='bold')
-            plt.legend(fontsize=12, frameon=True, fancybox=True, shadow=True)
-            plt.grid(True, alpha=0.3, linestyle='--')
-            plt.xlim(left=0)
-            plt.ylim(bottom=0)
-            
-            #Adicionar valores nos pontos
-            if not dados_seq.empty:
-                for x, y in zip(dados_seq['num_requisicoes'], dados_seq['tempo_total_media']):
-                    plt.annotate(f'{y:.2f}s', (x, y), textcoords="offset points", 
-                               xytext=(0,10), ha='center', fontsize=10, color='red')
-            
-            if not dados_conc.empty:
-                for x, y in zip(dados_conc['num_requisicoes'], dados_conc['tempo_total_media']):
-                    plt.annotate(f'{y:.2f}s', (x, y), textcoords="offset points", 
-                               xytext=(0,10), ha='center', fontsize=10, color='blue')
-            
-            plt.tight_layout()
-            plt.savefig(f'resultados/graficos/tempo_total_{cenario}.png', dpi=300, bbox_inches='tight')
-            plt.close()
-
-    def plotar_comparacao_escalabilidade_estatistico(self):
-        #Plota gráfico de comparação de escalabilidade com barras de erro
-        plt.figure(figsize=(14, 10))
-        
-#Calcular throughput médio por cenário para comparação
-        throughput_seq = []
-        throughput_conc = []
-        throughput_seq_err = []
-        throughput_conc_err = []
-        labels = []
-        
-        cenarios = ['rapido', 'medio', 'lento']
-        cenarios_nomes = ['Rápido', 'Médio', 'Lento']
-        
-        for i, cenario in enumerate(cenarios):
-            dados_cenario = self.df[self.df['cenario'] == cenario]
-            
-            if not dados_cenario.empty:
-#Calcular throughput médio geral para cada servidor neste cenário
-                dados_seq = dados_cenario[dados_cenario['servidor'] == 'sequencial']
-                dados_conc = dados_cenario[dados_cenario['servidor'] == 'concorrente']
-                
-                if not dados_seq.empty:
-                    seq_media = dados_seq['throughput_media'].mean()
-                    seq_desvio = np.sqrt((dados_seq['throughput_desvio']**2).mean())  # Desvio médio quadrático
-                else:
-                    seq_media = seq_desvio = 0
-                    
-                if not dados_conc.empty:
-                    conc_media = dados_conc['throughput_media'].mean()
-                    conc_desvio = np.sqrt((dados_conc['throughput_desvio']**2).mean())  # Desvio médio quadrático
-                else:
-                    conc_media = conc_desvio = 0
-                
-                throughput_seq.append(seq_media)
-                throughput_conc.append(conc_media)
-                throughput_seq_err.append(seq_desvio)
-                throughput_conc_err.append(conc_desvio)
-                labels.append(cenarios_nomes[i])
-        
-        if throughput_seq or throughput_conc:
-            x = np.arange(len(labels))
-            width = 0.35
-            
-            bars1 = plt.bar(x - width/2, throughput_seq, width,
-                           label='Servidor Sequencial', color='red', alpha=0.8, 
-                           edgecolor='darkred', linewidth=1)
-            bars2 = plt.bar(x + width/2, throughput_conc, width,
-                           label='Servidor Concorrente', color='blue', alpha=0.8,
-                           edgecolor='darkblue', linewidth=1)
-            
-            execucoes = self.df['execucoes'].iloc[0] if not self.df.empty else 10
-            plt.title(f'Comparação de Escalabilidade entre Servidores\n(Throughput Médio de {execucoes} execuções)', 
-                     fontsize=16, fontweight='bold', pad=20)
-            plt.xlabel('Cenário de Processamento', fontsize=14, fontweight='bold')
-            plt.ylabel('Throughput Médio (req/s)', fontsize=14, fontweight='bold')
-            plt.xticks(x, labels, fontsize=12)
-            plt.legend(fontsize=12, frameon=True, fancybox=True, shadow=True)
-            plt.grid(True, alpha=0.3, axis='y', linestyle='--')
-            plt.ylim(bottom=0)
-            
-            #Adicionar valores nas barras
-            for bar, value in zip(bars1, throughput_seq):
-                if value > 0:
-                    plt.text(bar.get_x() + bar.get_width()/2, bar.get_height() + 0.1, 
-                           f'{value:.1f}', ha='center', va='bottom', fontsize=10, color='red')
-            
-            for bar, value in zip(bars2, throughput_conc):
-                if value > 0:
-                    plt.text(bar.get_x() + bar.get_width()/2, bar.get_height() + 0.1, 
-                           f'{value:.1f}', ha='center', va='bottom', fontsize=10, color='blue')
+        os.makedirs(self.diretorio_graficos, exist_ok=True)
+
+        tarefas = self.listar_tarefas()
+        cache = self.carregar_cache() if usar_cache else {}
+        hashes = {caminho: hash_tarefa(renderizador, argumentos) for caminho, renderizador, argumentos in tarefas}
+        pendentes = [tarefa for tarefa in tarefas
+                     if cache.get(tarefa[0]) != hashes[tarefa[0]] or not os.path.exists(tarefa[0])]
+
+        print(Cores.info(f"Gerando {len(pendentes)} de {len(tarefas)} gráficos "
+                         f"({len(tarefas) - len(pendentes)} inalterados no cache)..."))
+
+        inicio = datetime.now()
+        processos = processos or os.cpu_count() or 1
+        if len(pendentes) > 1 and processos > 1:
+            with ProcessPoolExecutor(max_workers=processos) as executor:
+                concluidos = list(executor.map(executar_tarefa, pendentes))
         else:
-            plt.text(0.5, 0.5, 'Sem dados para comparação', 
-                    ha='center', va='center', transform=plt.gca().transAxes, fontsize=14)
-            plt.title('Comparação de Escalabilidade entre Servidores', fontsize=16, fontweight='bold')
-        
-        plt.tight_layout()
-        plt.savefig('resultados/graficos/comparacao_throughput.png', dpi=300, bbox_inches='tight')
-        plt.close()
+            concluidos = [executar_tarefa(tarefa) for tarefa in pendentes]
+
+        for caminho in concluidos:
+            cache[caminho] = hashes[caminho]
+        with open(os.path.join(self.diretorio_graficos, NOME_ARQUIVO_CACHE), 'w', encoding='utf-8') as f:
+            json.dump(cache, f, indent=2)
+
+        duracao = (datetime.now() - inicio).total_seconds()
+        print(Cores.sucesso(f"Gráficos com estatísticas salvos em {self.diretorio_graficos}/ ({duracao:.1f}s)"))
+
+    def gerar_relatorio_html(self):
+        #Relatório HTML único e interativo (dados embutidos, sem dependências externas)
+        if self.df is None or self.df.empty:
+            print(Cores.erro("Nenhum resultado disponível para análise"))
+            return
+        caminho = os.path.join(os.path.dirname(self.arquivo_csv), 'relatorio.html')
+        gerar_relatorio_html(self.df, caminho, self.rotulo_x, self.metadados)
+        print(Cores.sucesso(f"Relatório interativo salvo em {caminho}"))
 
 def main():
     #Função principal para executar a análise
-    analisador = AnalisadorResultados()
-    analisador.gerar_todos_graficos()
+    parser = argparse.ArgumentParser(description='Gera os gráficos dos resultados dos testes')
+    parser.add_argument('--csv', default=ARQUIVO_CSV_PADRAO,
+                        help='CSV de resultados (gráficos vão para graficos/ no mesmo diretório)')
+    parser.add_argument('--html', action='store_true',
+                        help='Gerar um único relatório HTML interativo em vez dos PNGs')
+    parser.add_argument('--processos', type=int, default=None,
+                        help='Processos de renderização (padrão: número de CPUs; 1 = sem pool)')
+    parser.add_argument('--sem-cache', action='store_true',
+                        help='Gerar novamente todos os gráficos, mesmo os inalterados')
+    args = parser.parse_args()
+
+    analisador = AnalisadorResultados(args.csv)
+    if args.html:
+        analisador.gerar_relatorio_html()
+    else:
+        analisador.gerar_todos_graficos(args.processos, not args.sem_cache)
 
 if __name__ == "__main__":
     main()
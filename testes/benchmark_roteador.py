@@ -0,0 +1,77 @@
+#!/usr/bin/env python3
+#Benchmark do custo de despacho de rotas
+#Compara a antiga cadeia de if/elif com o roteador por dicionário, inclusive com muitas rotas registradas
+
+import os
+import sys
+import timeit
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src'))
+
+from roteador import Roteador, ErroRoteamento
+from rotas import roteador_padrao
+
+#Número de chamadas por medição e de repetições (o menor tempo é reportado)
+NUMERO_CHAMADAS = 200000
+REPETICOES = 5
+
+def despacho_cadeia_if(metodo, caminho, rotas_extras=()):
+    #Reprodução da cadeia de comparações usada antes do roteador
+    if metodo == 'GET':
+        if caminho == '/':
+            return 'pagina_inicial'
+        elif caminho == '/status':
+            return 'status'
+        elif caminho in rotas_extras:
+            return 'extra'
+        elif caminho in ['/rapido', '/medio', '/lento']:
+            return 'endpoint'
+        else:
+            return 404
+    elif metodo == 'POST':
+        if caminho == '/dados':
+            return 'dados'
+        else:
+            return 404
+    else:
+        return 405
+
+def despacho_roteador(roteador, metodo, caminho):
+    try:
+        return roteador.resolver(metodo, caminho)
+    except ErroRoteamento as erro:
+        return erro.codigo_status
+
+def criar_roteador_extenso(quantidade):
+    #Roteador padrão acrescido de muitas rotas exatas e parametrizadas
+    roteador = Roteador()
+    for metodo, padrao in roteador_padrao.listar_rotas():
+        roteador.registrar(metodo, padrao, lambda servidor, requisicao: None)
+    for indice in range(quantidade):
+        roteador.registrar('GET', f'/extra{indice}', lambda servidor, requisicao: None)
+        roteador.registrar('GET', f'/recurso{indice}/{{id}}', lambda servidor, requisicao: None)
+    return roteador
+
+def medir(funcao):
+    #Menor tempo por chamada (em nanossegundos) entre as repetições
+    tempos = timeit.repeat(funcao, number=NUMERO_CHAMADAS, repeat=REPETICOES)
+    return min(tempos) / NUMERO_CHAMADAS * 1e9
+
+def main():
+    casos = [('GET', '/rapido'), ('GET', '/lento'), ('POST', '/dados'), ('GET', '/inexistente')]
+    rotas_extras = [f'/extra{indice}' for indice in range(100)]
+    roteador_extenso = criar_roteador_extenso(100)
+
+    print(f"{'Caso':22} {'if/elif':>10} {'if/elif+100':>12} {'roteador':>10} {'roteador+200':>13}  (ns/chamada)")
+    for metodo, caminho in casos:
+        tempo_if = medir(lambda: despacho_cadeia_if(metodo, caminho))
+        tempo_if_extenso = medir(lambda: despacho_cadeia_if(metodo, caminho, rotas_extras))
+        tempo_roteador = medir(lambda: despacho_roteador(roteador_padrao, metodo, caminho))
+        tempo_roteador_extenso = medir(lambda: despacho_roteador(roteador_extenso, metodo, caminho))
+        print(f"{metodo + ' ' + caminho:22} {tempo_if:10.1f} {tempo_if_extenso:12.1f} {tempo_roteador:10.1f} {tempo_roteador_extenso:13.1f}")
+
+    tempo_parametro = medir(lambda: despacho_roteador(roteador_extenso, 'GET', '/recurso99/42'))
+    print(f"{'GET /recurso99/42':22} {'-':>10} {'-':>12} {'-':>10} {tempo_parametro:13.1f}")
+
+if __name__ == "__main__":
+    main()
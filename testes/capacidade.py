@@ -0,0 +1,77 @@
+#Busca automática da capacidade: maior taxa de requisições que o servidor sustenta dentro de um SLO
+#Cada ponto é uma carga em malha aberta a taxa fixa (TestadorCarga.teste_taxa); a taxa dobra até violar o SLO
+#e depois a busca binária estreita o intervalo entre a última taxa aprovada e a primeira reprovada
+
+import numpy as np
+from estatisticas import percentis
+
+def avaliar_ponto(taxa, resultado, slo):
+    #Resume um ponto da busca: throughput obtido, percentis da latência desde o agendamento e taxa de erro
+    #slo: {'p99': segundos, 'taxa_erro': porcentagem}
+    requisicoes = resultado['resultados']
+    validas = [r for r in requisicoes if r['sucesso'] and r['codigo_status'] == 200]
+    tempos = np.array([r['tempo_resposta_agendado'] for r in validas])
+    taxa_erro = (len(requisicoes) - len(validas)) * 100 / len(requisicoes) if requisicoes else 100.0
+    ponto = {
+        'taxa_alvo': taxa,
+        'throughput': len(validas) / resultado['tempo_total'] if resultado['tempo_total'] > 0 else 0.0,
+        'requisicoes': len(requisicoes),
+        'taxa_erro': taxa_erro,
+        'atraso_envio_maximo': max((r['atraso_envio'] for r in requisicoes), default=0.0),
+        **percentis(tempos)
+    }
+    ponto['dentro_slo'] = bool(validas) and ponto['p99'] <= slo['p99'] and taxa_erro <= slo['taxa_erro']
+    return ponto
+
+def buscar_capacidade(medir, taxa_inicial, taxa_maxima, precisao_relativa=0.1, taxa_minima=1.0):
+    #medir(taxa) -> ponto de avaliar_ponto. Retorna (capacidade, limitada, pontos):
+    #capacidade = maior taxa aprovada (0 se nem taxa_minima passou) e limitada = True se taxa_maxima passou
+    #(a capacidade real é maior que a testada)
+    pontos = []
+    def aprovada(taxa):
+        ponto = medir(taxa)
+        pontos.append(ponto)
+        return ponto['dentro_slo']
+
+    #Fase exponencial: dobra a taxa até a primeira reprovação
+    baixo = 0.0
+    taxa = min(taxa_inicial, taxa_maxima)
+    while aprovada(taxa):
+        baixo = taxa
+        if taxa >= taxa_maxima:
+            return baixo, True, pontos
+        taxa = min(taxa * 2, taxa_maxima)
+    alto = taxa
+
+    #Fase binária entre a última aprovada e a primeira reprovada
+    while True:
+        if baixo == 0.0:
+            meio = alto / 2
+            if meio < taxa_minima:
+                break
+        else:
+            if (alto - baixo) / baixo <= precisao_relativa:
+                break
+            meio = (baixo + alto) / 2
+        if aprovada(meio):
+            baixo = meio
+        else:
+            alto = meio
+    return baixo, False, pontos
+
+def detectar_joelho(pontos):
+    #Joelho da curva latência (p99) x taxa oferecida: com os dois eixos normalizados para [0, 1], é o ponto mais
+    #abaixo da diagonal (maior taxa - latência), a partir do qual a latência cresce mais rápido que a carga
+    #O eixo x é a taxa oferecida e não o throughput obtido: acima da capacidade o throughput cai e a curva se dobraria
+    pontos = sorted(pontos, key=lambda p: p['taxa_alvo'])
+    if len(pontos) < 3:
+        return None
+    taxas = np.array([p['taxa_alvo'] for p in pontos])
+    latencias = np.array([p['p99'] for p in pontos])
+    amplitude_x = taxas.max() - taxas.min()
+    amplitude_y = latencias.max() - latencias.min()
+    if amplitude_x == 0 or amplitude_y == 0:
+        return None
+    x = (taxas - taxas.min()) / amplitude_x
+    y = (latencias - latencias.min()) / amplitude_y
+    return pontos[int(np.argmax(x - y))]
@@ -0,0 +1,218 @@
+#Estatísticas vetorizadas dos testes de carga
+#As requisições de todas as execuções de uma célula são achatadas numa única passada em colunas NumPy;
+#somas por execução saem de np.add.reduceat, médias filtradas de np.bincount e os percentis de uma única ordenação
+
+import math
+import itertools
+import numpy as np
+
+#Percentis de latência reportados (sobre todas as requisições bem-sucedidas da célula)
+PERCENTIS = (50, 90, 95, 99)
+
+#Quantil 0.975 da distribuição t de Student por graus de liberdade (acima de 30 usa-se a normal)
+QUANTIS_T_975 = {
+    1: 12.706, 2: 4.303, 3: 3.182, 4: 2.776, 5: 2.571, 6: 2.447, 7: 2.365, 8: 2.306, 9: 2.262, 10: 2.228,
+    11: 2.201, 12: 2.179, 13: 2.160, 14: 2.145, 15: 2.131, 16: 2.120, 17: 2.110, 18: 2.101, 19: 2.093,
+    20: 2.086, 21: 2.080, 22: 2.074, 23: 2.069, 24: 2.064, 25: 2.060, 26: 2.056, 27: 2.052, 28: 2.048,
+    29: 2.045, 30: 2.042
+}
+
+def quantil_t_975(graus_liberdade):
+    return QUANTIS_T_975.get(graus_liberdade, 1.960)
+
+def resumir(valores):
+    #Média, desvio padrão amostral e intervalo de confiança de 95% (t de Student) de uma métrica por execução
+    valores = np.asarray(valores, dtype=float)
+    if valores.size == 0:
+        return {'media': 0, 'desvio_padrao': 0, 'ic95': [0, 0], 'valores': []}
+
+    media = float(valores.mean())
+    desvio = float(valores.std(ddof=1)) if valores.size > 1 else 0.0
+    margem = quantil_t_975(valores.size - 1) * desvio / math.sqrt(valores.size) if valores.size > 1 else 0.0
+    return {
+        'media': media,
+        'desvio_padrao': desvio,
+        'ic95': [max(0.0, media - margem), media + margem],  #Todas as métricas dos testes são não negativas
+        'valores': valores.tolist()
+    }
+
+def colunas_execucoes(execucoes_resultados):
+    #Achata as requisições de todas as execuções em colunas NumPy numa única passada: os 4 campos de cada requisição
+    #seguem num só np.fromiter (sem listas intermediárias) e a matriz resultante é fatiada em colunas
+    #As requisições de cada execução ficam contíguas, na ordem das execuções
+    #fila e total_servidor ficam NaN nas respostas sem cabeçalho Server-Timing
+    quantidades = np.fromiter((len(resultado['resultados']) for resultado in execucoes_resultados), dtype=np.int64,
+                              count=len(execucoes_resultados))
+    total = int(quantidades.sum())
+    campos = itertools.chain.from_iterable(
+        (r['sucesso'], r['tempo_resposta'], tempos.get('fila', 0), sum(tempos.values())) if tempos else
+        (r['sucesso'], r['tempo_resposta'], math.nan, math.nan)
+        for resultado in execucoes_resultados for r in resultado['resultados']
+        for tempos in (r.get('tempos_servidor'),))
+    matriz = np.fromiter(campos, dtype=float, count=4 * total).reshape(total, 4)
+
+    return {
+        'execucao': np.repeat(np.arange(len(execucoes_resultados)), quantidades),
+        'quantidades': quantidades,
+        'sucesso': matriz[:, 0].astype(bool),
+        'tempo_resposta': matriz[:, 1],
+        'fila': matriz[:, 2],
+        'total_servidor': matriz[:, 3],
+        'tempo_total': np.array([resultado['tempo_total'] for resultado in execucoes_resultados], dtype=float)
+    }
+
+def somar_por_execucao(valores, quantidades):
+    #Soma de valores em cada execução (trechos contíguos com quantidades[i] elementos) por np.add.reduceat
+    #Execuções sem requisições ficam fora dos índices (o reduceat devolveria o elemento seguinte) e somam zero
+    somas = np.zeros(quantidades.size)
+    com_requisicoes = quantidades > 0
+    if com_requisicoes.any():
+        inicios = np.cumsum(quantidades) - quantidades
+        somas[com_requisicoes] = np.add.reduceat(np.asarray(valores, dtype=float), inicios[com_requisicoes])
+    return somas
+
+def throughputs_execucoes(colunas):
+    #Throughput (respostas bem-sucedidas por segundo) de cada execução das colunas
+    sucessos = somar_por_execucao(colunas['sucesso'], colunas['quantidades'])
+    tempo_total = colunas['tempo_total']
+    return np.divide(sucessos, tempo_total, out=np.zeros(tempo_total.size), where=tempo_total > 0)
+
+def media_por_execucao(execucao, valores, selecao, num_execucoes):
+    #Média de valores[selecao] agrupada por execução; retorna (médias, quantidade por execução)
+    quantidades = np.bincount(execucao[selecao], minlength=num_execucoes)
+    somas = np.bincount(execucao[selecao], weights=valores[selecao], minlength=num_execucoes)
+    medias = np.divide(somas, quantidades, out=np.zeros(num_execucoes), where=quantidades > 0)
+    return medias, quantidades
+
+def percentis(valores):
+    #Percentis de PERCENTIS (em segundos) ou zeros sem amostras
+    if valores.size == 0:
+        return {f'p{p}': 0 for p in PERCENTIS}
+    return dict(zip((f'p{p}' for p in PERCENTIS), np.percentile(valores, PERCENTIS).tolist()))
+
+def largura_relativa_ic(valores):
+    #Largura do IC de 95% (t de Student) da média relativa à própria média; infinita com menos de 2 valores
+    valores = np.asarray(valores, dtype=float)
+    if valores.size < 2 or valores.mean() <= 0:
+        return math.inf
+    margem = quantil_t_975(valores.size - 1) * valores.std(ddof=1) / math.sqrt(valores.size)
+    return 2 * margem / valores.mean()
+
+def throughput_execucao(resultado):
+    #Throughput de uma única execução (só a coluna de sucesso; várias execuções: throughputs_execucoes)
+    requisicoes = resultado['resultados']
+    sucessos = np.count_nonzero(np.fromiter((r['sucesso'] for r in requisicoes), dtype=bool, count=len(requisicoes)))
+    return float(sucessos / resultado['tempo_total']) if resultado['tempo_total'] > 0 else 0
+
+def ic_bootstrap(valores, reamostragens=2000, semente=0):
+    #IC de 95% da média por bootstrap percentil (todas as reamostragens geradas numa única matriz)
+    valores = np.asarray(valores, dtype=float)
+    if valores.size < 2:
+        return [float(valores.mean()), float(valores.mean())] if valores.size else [0, 0]
+    gerador = np.random.default_rng(semente)
+    medias = valores[gerador.integers(0, valores.size, (reamostragens, valores.size))].mean(axis=1)
+    return np.percentile(medias, [2.5, 97.5]).tolist()
+
+def ic_bootstrap_diferenca(a, b, reamostragens=2000, semente=0):
+    #IC de 95% da diferença percentual entre as médias ((b - a) / a) por bootstrap independente das duas amostras
+    a = np.asarray(a, dtype=float)
+    b = np.asarray(b, dtype=float)
+    gerador = np.random.default_rng(semente)
+    medias_a = a[gerador.integers(0, a.size, (reamostragens, a.size))].mean(axis=1)
+    medias_b = b[gerador.integers(0, b.size, (reamostragens, b.size))].mean(axis=1)
+    validas = medias_a > 0
+    if not validas.any():
+        return [0, 0]
+    diferencas = (medias_b[validas] - medias_a[validas]) / medias_a[validas] * 100
+    return np.percentile(diferencas, [2.5, 97.5]).tolist()
+
+def beta_incompleta_regularizada(a, b, x):
+    #I_x(a, b) por fração contínua (método de Lentz), usada na distribuição t sem depender do SciPy
+    if x <= 0:
+        return 0.0
+    if x >= 1:
+        return 1.0
+    prefixo = math.exp(math.lgamma(a + b) - math.lgamma(a) - math.lgamma(b) + a * math.log(x) + b * math.log(1 - x))
+    if x > (a + 1) / (a + b + 2):
+        return 1.0 - beta_incompleta_regularizada(b, a, 1 - x)
+
+    minimo = 1e-300
+    c, d = 1.0, 1.0 - (a + b) * x / (a + 1)
+    d = 1.0 / (d if abs(d) > minimo else minimo)
+    fracao = d
+    for m in range(1, 300):
+        for numerador in (m * (b - m) * x / ((a + 2 * m - 1) * (a + 2 * m)),
+                          -(a + m) * (a + b + m) * x / ((a + 2 * m) * (a + 2 * m + 1))):
+            d = 1.0 + numerador * d
+            d = 1.0 / (d if abs(d) > minimo else minimo)
+            c = 1.0 + numerador / c
+            c = c if abs(c) > minimo else minimo
+            fracao *= c * d
+        if abs(c * d - 1.0) < 1e-12:
+            break
+    return prefixo * fracao / a
+
+def teste_welch(a, b):
+    #Teste t de Welch (variâncias diferentes); retorna (t, graus de liberdade, p-valor bilateral)
+    a = np.asarray(a, dtype=float)
+    b = np.asarray(b, dtype=float)
+    if a.size < 2 or b.size < 2:
+        return 0.0, 0.0, 1.0
+    variancia_a = a.var(ddof=1) / a.size
+    variancia_b = b.var(ddof=1) / b.size
+    if variancia_a + variancia_b == 0:
+        return 0.0, 0.0, 1.0 if a.mean() == b.mean() else 0.0
+
+    t = (b.mean() - a.mean()) / math.sqrt(variancia_a + variancia_b)
+    graus = (variancia_a + variancia_b) ** 2 / (variancia_a ** 2 / (a.size - 1) + variancia_b ** 2 / (b.size - 1))
+    p_valor = float(beta_incompleta_regularizada(graus / 2, 0.5, graus / (graus + t * t)))
+    return float(t), float(graus), p_valor
+
+def teste_mann_whitney(a, b):
+    #Teste U de Mann-Whitney (não paramétrico) com aproximação normal, correção de empates e de continuidade
+    #Retorna (U de b, p-valor bilateral); com poucas execuções (ex.: 2 x 2) o p-valor nunca fica abaixo de 0.05
+    a = np.asarray(a, dtype=float)
+    b = np.asarray(b, dtype=float)
+    if a.size == 0 or b.size == 0:
+        return 0.0, 1.0
+
+    valores = np.concatenate([a, b])
+    _, inversos, contagens = np.unique(valores, return_inverse=True, return_counts=True)
+    postos = (np.cumsum(contagens) - (contagens - 1) / 2)[inversos]  #Posto médio nos empates
+    u = postos[a.size:].sum() - b.size * (b.size + 1) / 2
+
+    total = valores.size
+    media = a.size * b.size / 2
+    variancia = a.size * b.size / 12 * ((total + 1) - (contagens ** 3 - contagens).sum() / (total * (total - 1)))
+    if variancia <= 0:
+        return float(u), 1.0
+    z = (abs(u - media) - 0.5) / math.sqrt(variancia)
+    return float(u), float(math.erfc(max(z, 0) / math.sqrt(2)))
+
+def comparar_amostras(a, b, nivel_significancia=0.05, reamostragens=2000):
+    #Compara os valores por execução de dois servidores (b contra a)
+    #A diferença é significativa quando o Mann-Whitney rejeita a igualdade e o IC bootstrap não contém zero;
+    #é inconclusiva quando há execuções de menos para o Mann-Whitney rejeitar a igualdade em qualquer caso
+    media_a = float(np.mean(a)) if len(a) else 0
+    media_b = float(np.mean(b)) if len(b) else 0
+    ic_diferenca = ic_bootstrap_diferenca(a, b, reamostragens) if len(a) and len(b) else [0, 0]
+    _, _, p_welch = teste_welch(a, b)
+    _, p_mann_whitney = teste_mann_whitney(a, b)
+    significativo = bool(p_mann_whitney < nivel_significancia and (ic_diferenca[0] > 0 or ic_diferenca[1] < 0))
+
+    #Menor p-valor exato possível do Mann-Whitney (separação total): acima do nível, nenhuma diferença seria detectável
+    if significativo:
+        conclusao = 'significativa'
+    elif len(a) == 0 or len(b) == 0 or 2 / math.comb(len(a) + len(b), len(a)) >= nivel_significancia:
+        conclusao = 'inconclusiva'
+    else:
+        conclusao = 'nao significativa'
+
+    return {
+        'diferenca_percentual': (media_b - media_a) / media_a * 100 if media_a > 0 else 0,
+        'ic95_diferenca': ic_diferenca,
+        'p_welch': p_welch,
+        'p_mann_whitney': p_mann_whitney,
+        'significativo': significativo,
+        'conclusao': conclusao
+    }
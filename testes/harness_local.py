@@ -0,0 +1,326 @@
+#!/usr/bin/env python3
+#Harness de benchmark local (sem Docker)
+#Inicia cada motor de servidor em um subprocesso numa porta efêmera do loopback, fixa servidores e
+#gerador de carga em conjuntos de CPUs configuráveis, executa a mesma matriz do --completo e encerra tudo
+#Como os servidores são processos locais, seus recursos são amostrados diretamente de /proc/<pid>
+#Os modos próprios (--backlog, --slowloris, --mistura, --perfis, --capacidade) rodam nos mesmos motores
+
+import os
+import re
+import sys
+import time
+import argparse
+import tempfile
+import subprocess
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from teste_completo import (TestadorAutomatizado, ArmazenamentoExecucoes, Cores, DIRETORIO_SRC,
+                            DIRETORIO_RESULTADOS, cenarios_padrao, arquivo_execucoes_em_andamento,
+                            largura_relativa_ic_alvo, executar_servidores_em_paralelo, TestadorBacklog, TestadorSlowloris, TestadorMistura,
+                            TestadorPerfis, TestadorCapacidade)
+
+#Motores disponíveis: script em src/ e variáveis de ambiente extras do servidor
+MOTORES = {
+    'sequencial': {'script': 'servidor_sequencial.py', 'ambiente': {}},
+    'concorrente': {'script': 'servidor_concorrente.py', 'ambiente': {}},
+    'concorrente_coalescido': {'script': 'servidor_concorrente.py', 'ambiente': {'COALESCER': '1'}},
+    'sequencial_cache': {'script': 'servidor_sequencial.py', 'ambiente': {'CACHE_BYTES': '1048576'}},
+    'concorrente_cache': {'script': 'servidor_concorrente.py', 'ambiente': {'CACHE_BYTES': '1048576'}},
+    #Rotas lentas limitadas a 2 manipuladores simultâneos; o excedente espera na fila da classe 'lenta'
+    'concorrente_classes': {'script': 'servidor_concorrente.py', 'ambiente': {'ESCALONADOR_CLASSES': 'rapida:64,lenta:2'}},
+    #Mesmos servidores escutando em AF_UNIX: a diferença para o TCP isola o custo da pilha de rede do kernel
+    'sequencial_uds': {'script': 'servidor_sequencial.py', 'ambiente': {}, 'unix': True},
+    'concorrente_uds': {'script': 'servidor_concorrente.py', 'ambiente': {}, 'unix': True},
+    #Proxy na frente de réplicas do concorrente: as réplicas são iniciadas antes e passadas em PROXY_UPSTREAMS
+    'proxy_round_robin': {'script': 'servidor_proxy.py', 'ambiente': {'PROXY_ESTRATEGIA': 'round_robin'},
+                          'replicas': {'motor': 'concorrente', 'quantidade': 3}},
+    'proxy_menos_conexoes': {'script': 'servidor_proxy.py', 'ambiente': {'PROXY_ESTRATEGIA': 'menos_conexoes'},
+                             'replicas': {'motor': 'concorrente', 'quantidade': 3}},
+    'proxy_duas_escolhas': {'script': 'servidor_proxy.py', 'ambiente': {'PROXY_ESTRATEGIA': 'duas_escolhas'},
+                            'replicas': {'motor': 'concorrente', 'quantidade': 3}},
+}
+
+#Motores testados quando --motores não é informado
+MOTORES_PADRAO = ['sequencial', 'concorrente']
+
+#Motores do cenário --tcp-vs-uds
+MOTORES_TCP_UDS = ['sequencial', 'sequencial_uds', 'concorrente', 'concorrente_uds']
+
+#Perfil rápido para CI: poucos clientes, duas execuções e cenários curtos
+PERFIL_RAPIDO = {
+    'clientes': [1, 4, 16],
+    'execucoes': 2,
+    'cenarios': [
+        {'nome': 'rapido', 'caminho': '/rapido', 'descricao': 'Processamento Instantaneo'},
+        {'nome': 'trabalho_50ms', 'caminho': '/trabalho?delay_ms=50', 'descricao': 'Espera de 50ms'},
+    ]
+}
+
+PADRAO_INICIO = re.compile(r'iniciado em (unix:\S+|\S+:\d+)')
+
+def interpretar_cpus(texto):
+    #Converte '0-2,5' em {0, 1, 2, 5}
+    if not texto:
+        return None
+    cpus = set()
+    for parte in texto.split(','):
+        if '-' in parte:
+            inicio, fim = parte.split('-')
+            cpus.update(range(int(inicio), int(fim) + 1))
+        else:
+            cpus.add(int(parte))
+    return cpus
+
+def repartir_cpus(cpus, partes):
+    #Divide a lista ordenada de CPUs em 'partes' conjuntos contíguos e disjuntos ([0, 1, 2, 3], 2 -> [{0, 1}, {2, 3}])
+    return [set(cpus[indice * len(cpus) // partes:(indice + 1) * len(cpus) // partes]) for indice in range(partes)]
+
+class HarnessLocal:
+    def __init__(self, motores=None, cpus_servidores=None, cpus_cliente=None, ambiente_extra=None,
+                 diretorio_resultados=DIRETORIO_RESULTADOS, largura_ic_alvo=None):
+        self.motores = motores or list(MOTORES_PADRAO)
+        self.cpus_servidores = cpus_servidores
+        self.cpus_cliente = cpus_cliente
+        self.ambiente_extra = ambiente_extra or {}
+        self.diretorio_resultados = diretorio_resultados
+        self.largura_ic_alvo = largura_ic_alvo
+        self.diretorio_logs = os.path.join(diretorio_resultados, 'logs')
+        self.processos = {}
+        self.enderecos = {}
+        self.pids = {}
+        self.sockets_unix = []  #Arquivos removidos ao encerrar (o SIGTERM não passa pelo parar() do servidor)
+        self.cpus_por_motor = {}  #Execução em paralelo: CPUs exclusivas de cada motor (e de suas réplicas)
+
+    def validar_cpus(self, cpus):
+        #Mantém apenas CPUs disponíveis para o processo (fixação só existe no Linux)
+        if cpus is None:
+            return None
+        if not hasattr(os, 'sched_setaffinity'):
+            print(Cores.aviso("Fixação de CPU não suportada nesta plataforma; ignorando"))
+            return None
+        disponiveis = os.sched_getaffinity(0)
+        validas = cpus & disponiveis
+        if validas != cpus:
+            print(Cores.aviso(f"CPUs indisponíveis ignoradas: {sorted(cpus - disponiveis)}"))
+        return validas or None
+
+    def dividir_cpus(self):
+        #Execução em paralelo isolada: cada motor (com suas réplicas) e o gerador de carga que o testa ficam em CPUs
+        #exclusivas. Com --cpus-servidor/--cpus-cliente cada conjunto é repartido entre os motores; sem eles, as CPUs
+        #disponíveis são divididas ao meio entre servidores e clientes
+        #Retorna ({motor: CPUs do servidor}, {motor: CPUs do cliente}) ou None se não houver uma CPU de cada por motor
+        if not hasattr(os, 'sched_setaffinity'):
+            return None
+        disponiveis = sorted(os.sched_getaffinity(0))
+        servidores = sorted(self.validar_cpus(self.cpus_servidores) or [])
+        clientes = sorted(self.validar_cpus(self.cpus_cliente) or [])
+        if not servidores and not clientes:
+            metade = len(disponiveis) // 2
+            servidores, clientes = disponiveis[:metade], disponiveis[metade:]
+        elif not servidores:
+            servidores = [cpu for cpu in disponiveis if cpu not in clientes]
+        elif not clientes:
+            clientes = [cpu for cpu in disponiveis if cpu not in servidores]
+
+        quantidade = len(self.motores)
+        if len(servidores) < quantidade or len(clientes) < quantidade:
+            return None
+        return (dict(zip(self.motores, repartir_cpus(servidores, quantidade))),
+                dict(zip(self.motores, repartir_cpus(clientes, quantidade))))
+
+    def iniciar_motor(self, nome, tempo_limite=10, ambiente_configuracao=None):
+        #Inicia o motor (e antes suas réplicas, se for um proxy) e registra o endereço testado
+        #ambiente_configuracao: variáveis da configuração em teste, aplicadas por último (ex.: backlog de uma varredura)
+        definicao = MOTORES[nome]
+        ambiente = dict(definicao['ambiente'])
+        cpus = self.cpus_por_motor.get(nome, self.cpus_servidores)
+        if definicao.get('unix'):
+            ambiente['SOCKET_UNIX'] = os.path.join(tempfile.gettempdir(), f'harness_{os.getpid()}_{nome}.sock')
+            self.sockets_unix.append(ambiente['SOCKET_UNIX'])
+        replicas = definicao.get('replicas')
+        if replicas:
+            enderecos_replicas = []
+            for indice in range(replicas['quantidade']):
+                definicao_replica = MOTORES[replicas['motor']]
+                _, endereco = self.iniciar_processo(f"{nome}_replica{indice + 1}", definicao_replica['script'],
+                                                    definicao_replica['ambiente'], tempo_limite,
+                                                    ambiente_configuracao, cpus)
+                enderecos_replicas.append(endereco)
+            ambiente['PROXY_UPSTREAMS'] = ','.join(enderecos_replicas)
+
+        processo, endereco = self.iniciar_processo(nome, definicao['script'], ambiente, tempo_limite,
+                                                   ambiente_configuracao, cpus)
+        self.enderecos[nome] = endereco
+        self.pids[nome] = processo.pid  #Recursos amostrados só do processo testado (nas réplicas ficam fora)
+        return endereco
+
+    def iniciar_processo(self, nome, script, ambiente_motor, tempo_limite=10, ambiente_configuracao=None, cpus=None):
+        #Inicia o script em 127.0.0.1:0 (ou no SOCKET_UNIX do ambiente) e descobre o endereço pela linha de início do log
+        #cpus: afinidade do processo (None = CPUs dos servidores)
+        ambiente = dict(os.environ)
+        ambiente.update(ambiente_motor)
+        ambiente.update(self.ambiente_extra)
+        ambiente.update(ambiente_configuracao or {})
+        ambiente.update({'PORTA_SERVIDOR': '0', 'HOST_SERVIDOR': '127.0.0.1', 'PYTHONUNBUFFERED': '1'})
+
+        os.makedirs(self.diretorio_logs, exist_ok=True)
+        caminho_log = os.path.join(self.diretorio_logs, f'{nome}.log')
+        arquivo_log = open(caminho_log, 'w')
+
+        cpus = self.validar_cpus(self.cpus_servidores if cpus is None else cpus)
+        preexec = (lambda: os.sched_setaffinity(0, cpus)) if cpus else None
+
+        processo = subprocess.Popen([sys.executable, os.path.join(DIRETORIO_SRC, script)],
+                                    env=ambiente, stdout=arquivo_log, stderr=subprocess.STDOUT,
+                                    preexec_fn=preexec)
+        arquivo_log.close()
+        self.processos[nome] = processo
+
+        limite = time.time() + tempo_limite
+        while time.time() < limite:
+            if processo.poll() is not None:
+                raise RuntimeError(f"Motor {nome} terminou ao iniciar (veja {caminho_log})")
+            with open(caminho_log, 'r', errors='ignore') as f:
+                correspondencia = PADRAO_INICIO.search(f.read())
+            if correspondencia:
+                endereco = correspondencia.group(1)
+                print(Cores.info(f"Motor {nome} em {endereco} (pid {processo.pid}, CPUs {sorted(cpus) if cpus else 'todas'})"))
+                return processo, endereco
+            time.sleep(0.05)
+        raise RuntimeError(f"Motor {nome} não informou a porta em {tempo_limite}s (veja {caminho_log})")
+
+    def encerrar(self):
+        #Encerra todos os motores iniciados
+        for nome, processo in self.processos.items():
+            if processo.poll() is None:
+                processo.terminate()
+                try:
+                    processo.wait(timeout=5)
+                except subprocess.TimeoutExpired:
+                    processo.kill()
+                    processo.wait()
+        self.processos = {}
+        self.enderecos = {}
+        self.pids = {}
+        for caminho in self.sockets_unix:
+            if os.path.exists(caminho):
+                os.unlink(caminho)
+        self.sockets_unix = []
+
+    def iniciar_motores(self, ambiente_configuracao=None):
+        for nome in self.motores:
+            self.iniciar_motor(nome, ambiente_configuracao=ambiente_configuracao)
+
+    def fixar_cpus_cliente(self):
+        #O gerador de carga (e os processos do agendador, que herdam a afinidade) fica nas CPUs do cliente
+        cpus = self.validar_cpus(self.cpus_cliente)
+        if cpus:
+            os.sched_setaffinity(0, cpus)
+            print(Cores.info(f"Gerador de carga fixado nas CPUs {sorted(cpus)}"))
+        return cpus
+
+    def executar(self, cenarios=None, lista_clientes=None, execucoes=None, armazenamento=None, paralelo=None):
+        #Inicia os motores, executa a matriz e encerra os motores
+        #Em paralelo cada motor e seu gerador de carga recebem CPUs próprias; sem CPUs suficientes a matriz roda em série
+        paralelo = (executar_servidores_em_paralelo if paralelo is None else paralelo) and len(self.motores) > 1
+        cpus_clientes = None
+        if paralelo:
+            divisao = self.dividir_cpus()
+            if divisao is None:
+                print(Cores.aviso(f"CPUs insuficientes para isolar {len(self.motores)} motores em paralelo (uma CPU de "
+                                  f"servidor e uma de cliente por motor): executando um motor de cada vez"))
+                paralelo = False
+            else:
+                self.cpus_por_motor, cpus_clientes = divisao
+        try:
+            self.iniciar_motores()
+            cpus = self.fixar_cpus_cliente()
+            testador = TestadorAutomatizado(cenarios, lista_clientes, execucoes, self.diretorio_resultados,
+                                            self.largura_ic_alvo)
+            contexto = {
+                'origem': 'harness_local',
+                'ambiente': self.ambiente_extra,
+                'cpus_servidores': sorted(self.cpus_servidores) if self.cpus_servidores else None,
+                'cpus_cliente': sorted(cpus) if cpus else None,
+                'paralelo': paralelo
+            }
+            if cpus_clientes:
+                contexto['cpus_por_motor'] = {nome: {'servidor': sorted(self.cpus_por_motor[nome]),
+                                                     'cliente': sorted(cpus_clientes[nome])} for nome in self.motores}
+            testador.executar_todos_testes(self.enderecos, armazenamento, self.pids, contexto, paralelo, cpus_clientes)
+            return testador
+        finally:
+            self.encerrar()
+            self.cpus_por_motor = {}
+
+    def executar_testador(self, testador):
+        #Modos próprios (TestadorLocal de teste_completo): para cada configuração do testador os motores são
+        #reiniciados com o ambiente dela, o testador roda sobre os endereços e, ao final, grava seu CSV
+        self.fixar_cpus_cliente()
+        for parametros, ambiente in testador.configuracoes():
+            try:
+                self.iniciar_motores(ambiente)
+                testador.executar(self.enderecos, self.pids, parametros)
+            finally:
+                self.encerrar()
+        testador.gerar_csv()
+        return testador
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark local dos servidores no loopback (sem Docker)')
+    parser.add_argument('--motores', nargs='+', choices=list(MOTORES), default=list(MOTORES_PADRAO),
+                        help='Motores de servidor a testar')
+    parser.add_argument('--tcp-vs-uds', action='store_true',
+                        help='Compara cada servidor em TCP (loopback) e em socket Unix (AF_UNIX)')
+    parser.add_argument('--rapido', action='store_true',
+                        help='Perfil curto para CI (poucos clientes e execuções)')
+    parser.add_argument('--cpus-servidor', help='CPUs dos servidores, ex.: 0 ou 0-1')
+    parser.add_argument('--cpus-cliente', help='CPUs do gerador de carga, ex.: 2-3')
+    parser.add_argument('--ambiente', action='append', default=[], metavar='CHAVE=VALOR',
+                        help='Variável de ambiente extra para os servidores (ex.: BACKLOG_SEQUENCIAL=64)')
+    parser.add_argument('--resultados', default=DIRETORIO_RESULTADOS,
+                        help='Diretório de saída dos resultados')
+    parser.add_argument('--reiniciar', action='store_true',
+                        help='Descartar execuções salvas de uma rodada interrompida')
+    parser.add_argument('--paralelo', action='store_true', default=None,
+                        help='Testar os motores ao mesmo tempo, cada um (com seu gerador de carga) em CPUs próprias')
+    parser.add_argument('--adaptativo', action='store_true',
+                        help='Repetir cada célula até o IC95 do throughput atingir a largura alvo')
+    parser.add_argument('--backlog', action='store_true',
+                        help='Varrer o backlog do listen() e o accept em lote, reiniciando os motores a cada configuração')
+    parser.add_argument('--slowloris', action='store_true',
+                        help='Medir a carga normal com conexões lentas (slowloris), com e sem prazo de cabeçalhos')
+    parser.add_argument('--mistura', action='store_true',
+                        help='Executar misturas ponderadas de rotas e medir a latência de cada rota (bloqueio de cabeça de fila)')
+    parser.add_argument('--perfis', action='store_true',
+                        help='Executar perfis de carga variáveis (rampa, degraus, pico, senoide) e detectar a saturação')
+    parser.add_argument('--capacidade', action='store_true',
+                        help='Buscar a maior taxa (req/s) de cada motor dentro do SLO de p99 e taxa de erro')
+    args = parser.parse_args()
+
+    ambiente_extra = dict(item.split('=', 1) for item in args.ambiente)
+    motores = MOTORES_TCP_UDS if args.tcp_vs_uds else args.motores
+    harness = HarnessLocal(motores, interpretar_cpus(args.cpus_servidor), interpretar_cpus(args.cpus_cliente),
+                           ambiente_extra, args.resultados, largura_relativa_ic_alvo if args.adaptativo else None)
+
+    #Modos próprios: cada um é um TestadorLocal executado nos motores escolhidos
+    modos = {'backlog': TestadorBacklog, 'slowloris': TestadorSlowloris, 'mistura': TestadorMistura,
+             'perfis': TestadorPerfis, 'capacidade': TestadorCapacidade}
+    for modo, classe in modos.items():
+        if getattr(args, modo):
+            harness.executar_testador(classe(diretorio_resultados=args.resultados))
+            return
+
+    armazenamento = ArmazenamentoExecucoes(os.path.join(args.resultados, arquivo_execucoes_em_andamento))
+    if args.reiniciar:
+        armazenamento.limpar()
+
+    if args.rapido:
+        harness.executar(PERFIL_RAPIDO['cenarios'], PERFIL_RAPIDO['clientes'], PERFIL_RAPIDO['execucoes'], armazenamento,
+                         args.paralelo)
+    else:
+        harness.executar(cenarios_padrao, armazenamento=armazenamento, paralelo=args.paralelo)
+
+if __name__ == "__main__":
+    main()
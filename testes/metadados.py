@@ -0,0 +1,44 @@
+#Metadados da rodada gravados ao lado de cada CSV de resultados (<arquivo>.meta.json)
+#Registram as dimensões da matriz (motores, cenários, clientes, requisições por cliente) e o hash da
+#configuração, para que a análise descubra servidores e cenários sem listas fixas no código
+
+import os
+import json
+import hashlib
+from datetime import datetime
+
+VERSAO_ESQUEMA = 1
+
+def caminho_metadados(arquivo_csv):
+    return os.path.splitext(arquivo_csv)[0] + '.meta.json'
+
+def hash_configuracao(configuracao):
+    #Hash estável da configuração (JSON com chaves ordenadas): rodadas com o mesmo hash são comparáveis
+    texto = json.dumps(configuracao, sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.sha256(texto.encode('utf-8')).hexdigest()[:16]
+
+def salvar_metadados(arquivo_csv, esquema, servidores, cenarios, configuracao, contexto=None):
+    #servidores: {nome: endereço}; cenarios: [{'nome', 'caminho', 'descricao'}]
+    #configuracao: parâmetros que definem a matriz (entram no hash); contexto: informações livres da rodada
+    metadados = {
+        'versao_esquema': VERSAO_ESQUEMA,
+        'esquema': esquema,
+        'gerado_em': datetime.now().isoformat(timespec='seconds'),
+        'servidores': servidores,
+        'cenarios': cenarios,
+        'configuracao': configuracao,
+        'hash_configuracao': hash_configuracao({'servidores': list(servidores), 'cenarios': cenarios, **configuracao}),
+        'contexto': contexto or {}
+    }
+    caminho = caminho_metadados(arquivo_csv)
+    with open(caminho, 'w', encoding='utf-8') as f:
+        json.dump(metadados, f, indent=2, ensure_ascii=False)
+    return metadados
+
+def carregar_metadados(arquivo_csv):
+    #Metadados do CSV ou None (resultados gerados antes dos metadados existirem)
+    try:
+        with open(caminho_metadados(arquivo_csv), 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
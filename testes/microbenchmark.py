@@ -0,0 +1,288 @@
+#!/usr/bin/env python3
+#Micro-benchmarks das funções do caminho crítico dos servidores e do cliente, sem rede
+#Estilo pyperf/timeit: calibração, aquecimento, várias execuções, comparação estatística e saída JSON
+
+import os
+import sys
+import json
+import math
+import time
+import timeit
+import argparse
+import tracemalloc
+import platform
+import statistics
+from datetime import datetime
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src'))
+DIRETORIO_RESULTADOS = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'resultados')
+
+from configuracao import ID_CUSTOMIZADO
+from protocolo import interpretar_requisicao, interpretar_resposta
+from roteador import interpretar_alvo
+from rotas import roteador_padrao
+from servidor_sequencial import ServidorWebSequencial
+from servidor_concorrente import ServidorWebConcorrente
+
+#Limite de |t| de Welch para considerar a diferença significativa (~95% com 20 execuções)
+LIMITE_T_SIGNIFICANCIA = 2.0
+
+REQUISICAO_EXEMPLO = (
+    "GET /rapido HTTP/1.1\r\n"
+    f"X-Custom-ID: {ID_CUSTOMIZADO}\r\n"
+    "Host: 76.1.0.10:8080\r\n"
+    "Connection: close\r\n"
+    "\r\n"
+)
+
+#Registro dos benchmarks: nome -> fábrica que prepara os dados e retorna a função medida
+BENCHMARKS = {}
+
+def benchmark(nome):
+    def decorador(fabrica):
+        BENCHMARKS[nome] = fabrica
+        return fabrica
+    return decorador
+
+@benchmark('parse_requisicao')
+def bench_parse_requisicao():
+    return lambda: interpretar_requisicao(REQUISICAO_EXEMPLO)
+
+@benchmark('roteamento_exato')
+def bench_roteamento_exato():
+    return lambda: roteador_padrao.resolver('GET', '/rapido')
+
+@benchmark('roteamento_query_string')
+def bench_roteamento_query_string():
+    def funcao():
+        caminho, consulta = interpretar_alvo('/trabalho?delay_ms=0&cpu_ms=0&bytes=0')
+        return roteador_padrao.resolver('GET', caminho)
+    return funcao
+
+@benchmark('resposta_sequencial')
+def bench_resposta_sequencial():
+    servidor = ServidorWebSequencial()
+    return lambda: servidor.gerar_resposta('GET', '/rapido', ID_CUSTOMIZADO, time.time())
+
+@benchmark('resposta_concorrente')
+def bench_resposta_concorrente():
+    servidor = ServidorWebConcorrente()
+    return lambda: servidor.gerar_resposta('GET', '/rapido', ID_CUSTOMIZADO, time.time(), 1, 1)
+
+@benchmark('resposta_erro_sequencial')
+def bench_resposta_erro_sequencial():
+    servidor = ServidorWebSequencial()
+    return lambda: servidor.gerar_resposta_erro(404, "Não Encontrado", ID_CUSTOMIZADO)
+
+@benchmark('resposta_erro_concorrente')
+def bench_resposta_erro_concorrente():
+    servidor = ServidorWebConcorrente()
+    return lambda: servidor.gerar_resposta_erro(404, "Não Encontrado", 1, ID_CUSTOMIZADO)
+
+@benchmark('parse_resposta_cliente')
+def bench_parse_resposta_cliente():
+    segmentos = ServidorWebConcorrente().gerar_resposta('GET', '/rapido', ID_CUSTOMIZADO, time.time(), 1, 1)
+    dados = b''.join(segmentos)
+    return lambda: interpretar_resposta(dados)
+
+#Montagem da resposta: str único codificado inteiro (forma anterior) x segmentos em bytes (cabeçalhos, corpo)
+#O JSON é gerado antes, então só a montagem é medida; o corpo tem o payload de /trabalho?bytes=N
+TAMANHOS_PAYLOAD = {'1k': 1024, '64k': 64 * 1024, '1m': 1024 * 1024}
+
+def json_exemplo(tamanho):
+    return json.dumps({"tipo_servidor": "concorrente", "conteudo": {"payload": "x" * tamanho}}, indent=2)
+
+def resposta_str_unico(resposta_json):
+    #Copia o corpo para o str da resposta e de novo no encode
+    resposta = f"""HTTP/1.1 200 OK\r
+Content-Type: application/json\r
+Content-Length: {len(resposta_json)}\r
+Connection: close\r
+\r
+{resposta_json}"""
+    return resposta.encode('utf-8')
+
+def resposta_segmentos(resposta_json):
+    #Uma única cópia do corpo (o encode); os cabeçalhos são um segmento pequeno à parte
+    corpo = resposta_json.encode('utf-8')
+    cabecalhos = f"""HTTP/1.1 200 OK\r
+Content-Type: application/json\r
+Content-Length: {len(corpo)}\r
+Connection: close\r
+\r
+""".encode('utf-8')
+    return cabecalhos, corpo
+
+MONTAGENS_RESPOSTA = {'str_unico': resposta_str_unico, 'segmentos': resposta_segmentos}
+
+def registrar_benchmarks_montagem():
+    for rotulo, tamanho in TAMANHOS_PAYLOAD.items():
+        for nome_montagem, montar in MONTAGENS_RESPOSTA.items():
+            def fabrica(montar=montar, tamanho=tamanho):
+                resposta_json = json_exemplo(tamanho)
+                return lambda: montar(resposta_json)
+            benchmark(f'montagem_{nome_montagem}_{rotulo}')(fabrica)
+
+registrar_benchmarks_montagem()
+
+def medir_alocacoes(funcao, repeticoes=5):
+    #Pico de memória alocada por chamada (tracemalloc), menor valor entre as repetições
+    picos = []
+    tracemalloc.start()
+    try:
+        for _ in range(repeticoes):
+            tracemalloc.reset_peak()
+            antes = tracemalloc.get_traced_memory()[0]
+            resultado = funcao()
+            picos.append(tracemalloc.get_traced_memory()[1] - antes)
+            del resultado
+    finally:
+        tracemalloc.stop()
+    return min(picos)
+
+def comparar_alocacoes():
+    #Pico alocado pelas duas montagens e quantas vezes isso equivale ao tamanho do corpo
+    resultados = {}
+    print(f"  {'payload':8} {'str_unico':>14} {'segmentos':>14} {'copias (str/seg)':>18}")
+    for rotulo, tamanho in TAMANHOS_PAYLOAD.items():
+        resposta_json = json_exemplo(tamanho)
+        picos = {nome: medir_alocacoes(lambda: montar(resposta_json)) for nome, montar in MONTAGENS_RESPOSTA.items()}
+        copias = {nome: pico / len(resposta_json) for nome, pico in picos.items()}
+        resultados[rotulo] = {'tamanho_corpo': len(resposta_json), 'pico_bytes': picos, 'copias_do_corpo': copias}
+        print(f"  {rotulo:8} {picos['str_unico']:14,d} {picos['segmentos']:14,d} "
+              f"{copias['str_unico']:8.2f} / {copias['segmentos']:.2f}")
+    return resultados
+
+class ExecutorMicrobenchmark:
+    def __init__(self, execucoes=20, aquecimento=3, tempo_alvo=0.05):
+        self.execucoes = execucoes
+        self.aquecimento = aquecimento
+        self.tempo_alvo = tempo_alvo  #Duração mínima de cada execução (segundos)
+
+    def calibrar(self, temporizador):
+        #Dobra o número de chamadas até uma execução durar pelo menos tempo_alvo
+        loops = 1
+        while True:
+            if temporizador.timeit(loops) >= self.tempo_alvo or loops >= 10 ** 8:
+                return loops
+            loops *= 2
+
+    def medir(self, nome, funcao):
+        #Retorna as estatísticas do tempo por chamada (em nanossegundos)
+        temporizador = timeit.Timer(funcao)
+        loops = self.calibrar(temporizador)
+
+        for _ in range(self.aquecimento):
+            temporizador.timeit(loops)
+
+        valores = [temporizador.timeit(loops) / loops * 1e9 for _ in range(self.execucoes)]
+        return {
+            'loops': loops,
+            'execucoes': len(valores),
+            'media_ns': statistics.mean(valores),
+            'desvio_ns': statistics.stdev(valores) if len(valores) > 1 else 0,
+            'mediana_ns': statistics.median(valores),
+            'minimo_ns': min(valores),
+            'valores_ns': valores
+        }
+
+    def executar(self, filtro=None):
+        resultados = {}
+        for nome, fabrica in BENCHMARKS.items():
+            if filtro and not any(parte in nome for parte in filtro):
+                continue
+            resultados[nome] = self.medir(nome, fabrica())
+            estatisticas = resultados[nome]
+            print(f"  {nome:28} {estatisticas['mediana_ns']:10.1f} ns +/- {estatisticas['desvio_ns']:8.1f} "
+                  f"({estatisticas['execucoes']} x {estatisticas['loops']} chamadas)")
+
+        return {
+            'metadados': {
+                'data': datetime.now().isoformat(),
+                'python': platform.python_version(),
+                'implementacao': platform.python_implementation(),
+                'plataforma': platform.platform(),
+                'execucoes': self.execucoes,
+                'aquecimento': self.aquecimento
+            },
+            'benchmarks': resultados
+        }
+
+def teste_t_welch(a, b):
+    #Estatística t de Welch entre duas amostras (positiva quando b é mais lenta que a)
+    variancia = statistics.variance(a) / len(a) + statistics.variance(b) / len(b)
+    if variancia == 0:
+        return 0.0 if statistics.mean(a) == statistics.mean(b) else math.inf
+    return (statistics.mean(b) - statistics.mean(a)) / math.sqrt(variancia)
+
+def comparar(atual, referencia, limiar=0.10):
+    #Compara com a baseline; retorna (linhas do relatório, houve regressão)
+    linhas = []
+    regressao = False
+    for nome, estatisticas in atual['benchmarks'].items():
+        base = referencia['benchmarks'].get(nome)
+        if base is None:
+            linhas.append(f"  {nome:28} (sem baseline)")
+            continue
+
+        razao = estatisticas['mediana_ns'] / base['mediana_ns']
+        t = teste_t_welch(base['valores_ns'], estatisticas['valores_ns'])
+        significativo = abs(t) > LIMITE_T_SIGNIFICANCIA
+
+        if significativo and razao > 1 + limiar:
+            situacao = 'REGRESSAO'
+            regressao = True
+        elif significativo and razao < 1 - limiar:
+            situacao = 'MELHORIA'
+        else:
+            situacao = 'sem mudanca significativa'
+
+        linhas.append(f"  {nome:28} {base['mediana_ns']:10.1f} -> {estatisticas['mediana_ns']:10.1f} ns "
+                      f"({razao:5.2f}x, t={t:+6.2f}) {situacao}")
+    return linhas, regressao
+
+def main():
+    parser = argparse.ArgumentParser(description='Micro-benchmarks do caminho crítico dos servidores')
+    parser.add_argument('--execucoes', type=int, default=20, help='Execuções medidas por benchmark')
+    parser.add_argument('--aquecimento', type=int, default=3, help='Execuções de aquecimento descartadas')
+    parser.add_argument('--filtro', nargs='+', help='Executar apenas benchmarks cujo nome contenha estes textos')
+    parser.add_argument('--saida', default=os.path.join(DIRETORIO_RESULTADOS, 'microbenchmark.json'),
+                        help='Arquivo JSON de saída')
+    parser.add_argument('--baseline', default=os.path.join(DIRETORIO_RESULTADOS, 'microbenchmark_baseline.json'),
+                        help='Baseline para a verificação de regressão')
+    parser.add_argument('--salvar-baseline', action='store_true', help='Gravar o resultado como nova baseline')
+    parser.add_argument('--limiar', type=float, default=0.10, help='Variação relativa tolerada (0.10 = 10%%)')
+    parser.add_argument('--alocacoes', action='store_true',
+                        help='Medir também o pico de memória da montagem da resposta (str único x segmentos)')
+    args = parser.parse_args()
+
+    print("=== Micro-benchmarks (tempo por chamada) ===")
+    resultado = ExecutorMicrobenchmark(args.execucoes, args.aquecimento).executar(args.filtro)
+    if args.alocacoes:
+        print("\n=== Pico de memória da montagem da resposta (bytes por chamada) ===")
+        resultado['alocacoes'] = comparar_alocacoes()
+
+    os.makedirs(os.path.dirname(os.path.abspath(args.saida)), exist_ok=True)
+    with open(args.saida, 'w', encoding='utf-8') as f:
+        json.dump(resultado, f, indent=2)
+    print(f"\nResultados salvos em {args.saida}")
+
+    if args.salvar_baseline:
+        with open(args.baseline, 'w', encoding='utf-8') as f:
+            json.dump(resultado, f, indent=2)
+        print(f"Baseline salva em {args.baseline}")
+        return 0
+
+    if os.path.exists(args.baseline):
+        with open(args.baseline, 'r', encoding='utf-8') as f:
+            referencia = json.load(f)
+        print(f"\n=== Comparação com a baseline ({referencia['metadados']['data']}) ===")
+        linhas, regressao = comparar(resultado, referencia, args.limiar)
+        print("\n".join(linhas))
+        if regressao:
+            print("\n[ERRO] Regressão de desempenho detectada")
+            return 1
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,92 @@
+#Perfis de carga variáveis no tempo (rampa, degraus, pico e senoide)
+#Um perfil é um dicionário declarativo que define quantos clientes ficam ativos em cada instante do teste;
+#as requisições concluídas são agrupadas por segundo para mostrar throughput e latência enquanto a carga muda
+
+import math
+import numpy as np
+from estatisticas import percentis
+
+TIPOS_PERFIL = ('rampa', 'degraus', 'pico', 'senoide')
+
+#Fração do maior throughput a partir da qual o servidor é considerado saturado
+FRACAO_SATURACAO = 0.9
+
+def duracao_perfil(perfil):
+    #Duração total em segundos (nos degraus é a soma dos degraus)
+    if perfil['tipo'] == 'degraus':
+        return perfil['duracao_degrau'] * len(perfil['niveis'])
+    return perfil['duracao']
+
+def clientes_no_instante(perfil, instante):
+    #Clientes ativos no instante (segundos desde o início do perfil)
+    tipo = perfil['tipo']
+    if tipo == 'rampa':
+        #Rampa linear de 'inicio' até 'fim' clientes ao longo da duração
+        fracao = min(max(instante / perfil['duracao'], 0.0), 1.0)
+        return round(perfil['inicio'] + (perfil['fim'] - perfil['inicio']) * fracao)
+    if tipo == 'degraus':
+        indice = min(int(instante // perfil['duracao_degrau']), len(perfil['niveis']) - 1)
+        return perfil['niveis'][indice]
+    if tipo == 'pico':
+        #'base' clientes com uma rajada de 'pico' clientes entre inicio_pico e inicio_pico + duracao_pico
+        no_pico = perfil['inicio_pico'] <= instante < perfil['inicio_pico'] + perfil['duracao_pico']
+        return perfil['pico'] if no_pico else perfil['base']
+    if tipo == 'senoide':
+        #Oscila entre 'minimo' e 'maximo' com o período informado, começando no mínimo
+        fase = (1 - math.cos(2 * math.pi * instante / perfil['periodo'])) / 2
+        return round(perfil['minimo'] + (perfil['maximo'] - perfil['minimo']) * fase)
+    raise ValueError(f"Tipo de perfil desconhecido: {tipo} (use {', '.join(TIPOS_PERFIL)})")
+
+def clientes_maximos(perfil):
+    #Maior número de clientes simultâneos do perfil (threads criadas no início do teste)
+    if perfil['tipo'] == 'rampa':
+        return max(perfil['inicio'], perfil['fim'])
+    if perfil['tipo'] == 'degraus':
+        return max(perfil['niveis'])
+    if perfil['tipo'] == 'pico':
+        return max(perfil['base'], perfil['pico'])
+    return perfil['maximo']
+
+def series_por_segundo(resultados, inicio, perfil):
+    #Agrupa as requisições pelo segundo em que terminaram; os clientes de cada segundo são os do meio do intervalo
+    segundos = int(math.ceil(duracao_perfil(perfil)))
+    por_segundo = [[] for _ in range(segundos)]
+    for resultado in resultados:
+        segundo = int(resultado['timestamp'] - inicio)
+        if 0 <= segundo < segundos:
+            por_segundo[segundo].append(resultado)
+
+    series = []
+    for segundo, requisicoes in enumerate(por_segundo):
+        validas = [r for r in requisicoes if r['sucesso'] and r['codigo_status'] == 200]
+        tempos = np.array([r['tempo_resposta'] for r in validas])
+        series.append({
+            'segundo': segundo,
+            'clientes': clientes_no_instante(perfil, segundo + 0.5),
+            'requisicoes': len(requisicoes),
+            'throughput': len(validas),  #Requisições bem-sucedidas concluídas no segundo
+            'taxa_sucesso': len(validas) * 100 / len(requisicoes) if requisicoes else 0.0,
+            'media': float(tempos.mean()) if tempos.size else 0.0,
+            **percentis(tempos)
+        })
+    return series
+
+def detectar_saturacao(series):
+    #Agrupa os segundos pelo número de clientes e retorna o menor nível cujo throughput médio já alcança
+    #FRACAO_SATURACAO do maior: acima dele, mais clientes só aumentam a latência
+    #Se esse nível for o maior do perfil, o servidor não saturou (saturado=False): a carga não foi suficiente
+    niveis = {}
+    for ponto in series:
+        niveis.setdefault(ponto['clientes'], []).append(ponto)
+    if not niveis:
+        return None
+
+    resumo = {clientes: {
+        'throughput': float(np.mean([p['throughput'] for p in pontos])),
+        'p99': float(np.max([p['p99'] for p in pontos]))
+    } for clientes, pontos in niveis.items()}
+    maximo = max(valores['throughput'] for valores in resumo.values())
+    for clientes in sorted(resumo):
+        if resumo[clientes]['throughput'] >= FRACAO_SATURACAO * maximo:
+            return {'clientes': clientes, 'throughput_maximo': maximo, 'saturado': clientes < max(resumo),
+                    **resumo[clientes]}
@@ -0,0 +1,79 @@
+#Exportação dos registros brutos por requisição (rastros) dos testes de carga
+#Uma linha por requisição com instante, cliente, tempos de cada fase, status e thread do servidor,
+#gravada em Parquet (colunar, requer pyarrow) ou, sem pyarrow, em CSV comprimido
+
+import os
+import pandas as pd
+
+try:
+    import pyarrow  #noqa: F401 - apenas detecta o suporte a Parquet do pandas
+    PARQUET_DISPONIVEL = True
+except ImportError:
+    PARQUET_DISPONIVEL = False
+
+NOME_BASE_RASTROS = 'rastros_requisicoes'
+
+#Etapas do cabeçalho Server-Timing exportadas como colunas servidor_<etapa> (em segundos)
+ETAPAS_SERVIDOR = ('fila', 'leitura', 'parse', 'handler', 'serializacao')
+
+def tabela_rastros(execucoes_por_celula):
+    #Converte {servidor: {cenario: {num_clientes: [execucoes]}}} em um DataFrame com uma linha por requisição
+    colunas = {nome: [] for nome in (
+        'servidor', 'cenario', 'num_clientes', 'execucao', 'id_cliente', 'inicio', 'fim', 'codigo_status',
+        'sucesso', 'tempo_resposta', 'tempo_conexao', 'tempo_envio', 'tempo_recepcao', 'id_thread_servidor', 'erro'
+    )}
+    for etapa in ETAPAS_SERVIDOR:
+        colunas[f'servidor_{etapa}'] = []
+
+    for servidor, por_cenario in execucoes_por_celula.items():
+        for cenario, por_clientes in por_cenario.items():
+            for num_clientes, execucoes in por_clientes.items():
+                for execucao, resultado in enumerate(execucoes):
+                    for r in resultado['resultados']:
+                        tempos = r.get('tempos_servidor') or {}
+                        colunas['servidor'].append(servidor)
+                        colunas['cenario'].append(cenario)
+                        colunas['num_clientes'].append(num_clientes)
+                        colunas['execucao'].append(execucao)
+                        colunas['id_cliente'].append(r.get('id_cliente'))
+                        colunas['inicio'].append(r['timestamp'] - r['tempo_resposta'] if 'timestamp' in r else None)
+                        colunas['fim'].append(r.get('timestamp'))
+                        colunas['codigo_status'].append(r['codigo_status'])
+                        colunas['sucesso'].append(r['sucesso'])
+                        colunas['tempo_resposta'].append(r['tempo_resposta'])
+                        colunas['tempo_conexao'].append(r['tempo_conexao'])
+                        colunas['tempo_envio'].append(r['tempo_envio'])
+                        colunas['tempo_recepcao'].append(r['tempo_recepcao'])
+                        colunas['id_thread_servidor'].append((r.get('cabecalhos') or {}).get('X-Thread-ID'))
+                        colunas['erro'].append(r.get('erro'))
+                        for etapa in ETAPAS_SERVIDOR:
+                            colunas[f'servidor_{etapa}'].append(tempos.get(etapa))
+
+    tabela = pd.DataFrame(colunas)
+    tabela['num_clientes'] = tabela['num_clientes'].astype('int32')
+    tabela['execucao'] = tabela['execucao'].astype('int32')
+    tabela['codigo_status'] = tabela['codigo_status'].astype('int16')
+    for coluna in ('servidor', 'cenario'):
+        tabela[coluna] = tabela[coluna].astype('category')
+    return tabela
+
+def salvar_rastros(tabela, diretorio):
+    #Grava os rastros e retorna o caminho do arquivo gerado
+    os.makedirs(diretorio, exist_ok=True)
+    if PARQUET_DISPONIVEL:
+        caminho = os.path.join(diretorio, f'{NOME_BASE_RASTROS}.parquet')
+        tabela.to_parquet(caminho, index=False, compression='zstd')
+    else:
+        caminho = os.path.join(diretorio, f'{NOME_BASE_RASTROS}.csv.gz')
+        tabela.to_csv(caminho, index=False, compression='gzip')
+    return caminho
+
+def carregar_rastros(diretorio):
+    #Lê os rastros do diretório (Parquet se existir, senão CSV comprimido); None se não houver rastros
+    caminho_parquet = os.path.join(diretorio, f'{NOME_BASE_RASTROS}.parquet')
+    caminho_csv = os.path.join(diretorio, f'{NOME_BASE_RASTROS}.csv.gz')
+    if os.path.exists(caminho_parquet) and PARQUET_DISPONIVEL:
+        return pd.read_parquet(caminho_parquet)
+    if os.path.exists(caminho_csv):
+        return pd.read_csv(caminho_csv, dtype={'id_thread_servidor': 'string'})
+    return None
@@ -0,0 +1,141 @@
+#Relatório HTML único e interativo dos resultados dos testes
+#Os registros do CSV são embutidos como JSON e desenhados em SVG por um script próprio (sem bibliotecas externas),
+#com seleção de métrica e cenário, uma série por servidor, barras de erro e valores ao passar o mouse
+
+import json
+import os
+from datetime import datetime
+
+MODELO_HTML = """<!DOCTYPE html>
+<html lang="pt-BR">
+<head>
+<meta charset="utf-8">
+<title>Resultados dos Testes de Carga</title>
+<style>
+  body { font-family: sans-serif; margin: 24px; color: #222; }
+  h1 { font-size: 20px; }
+  .controles { margin: 12px 0; }
+  .controles label { margin-right: 16px; }
+  svg { border: 1px solid #ddd; background: #fff; }
+  .eixo text { font-size: 12px; }
+  .grade { stroke: #eee; }
+  #dica { position: absolute; pointer-events: none; background: rgba(0,0,0,0.8); color: #fff;
+          padding: 6px 8px; border-radius: 4px; font-size: 12px; display: none; white-space: pre; }
+  table { border-collapse: collapse; margin-top: 16px; font-size: 13px; }
+  td, th { border: 1px solid #ddd; padding: 4px 8px; text-align: right; }
+</style>
+</head>
+<body>
+<h1>Resultados dos Testes de Carga</h1>
+<div>Gerado em __GERADO_EM__ a partir de __REGISTROS__ registros__CONFIGURACAO__</div>
+<div class="controles">
+  <label>Métrica <select id="metrica"></select></label>
+  <label>Cenário <select id="cenario"></select></label>
+</div>
+<svg id="grafico" width="960" height="520"></svg>
+<div id="dica"></div>
+<table id="tabela"></table>
+<script>
+const DADOS = __DADOS__;
+const ROTULO_X = __ROTULO_X__;
+const CORES = ['#d62728', '#1f77b4', '#2ca02c', '#ff7f0e', '#9467bd', '#8c564b'];
+const SVG = 'http://www.w3.org/2000/svg';
+const margem = {esquerda: 80, direita: 180, topo: 30, base: 50};
+
+function unicos(campo) { return [...new Set(DADOS.map(r => r[campo]))]; }
+
+const metricas = Object.keys(DADOS[0] || {}).filter(c => c.endsWith('_media'));
+const cenarios = unicos('cenario');
+const servidores = unicos('servidor');
+const seletorMetrica = document.getElementById('metrica');
+const seletorCenario = document.getElementById('cenario');
+metricas.forEach(m => seletorMetrica.add(new Option(m.replace(/_media$/, ''), m)));
+cenarios.forEach(c => seletorCenario.add(new Option(c, c)));
+
+function elemento(nome, atributos, pai) {
+  const e = document.createElementNS(SVG, nome);
+  for (const [k, v] of Object.entries(atributos)) e.setAttribute(k, v);
+  pai.appendChild(e);
+  return e;
+}
+
+function desenhar() {
+  const metrica = seletorMetrica.value;
+  const desvio = metrica.replace(/_media$/, '_desvio');
+  const linhas = DADOS.filter(r => r.cenario === seletorCenario.value);
+  const svg = document.getElementById('grafico');
+  svg.innerHTML = '';
+  const largura = svg.clientWidth - margem.esquerda - margem.direita;
+  const altura = svg.clientHeight - margem.topo - margem.base;
+  if (!linhas.length) return;
+
+  const xMax = Math.max(...linhas.map(r => r.num_requisicoes));
+  const yMax = Math.max(...linhas.map(r => (r[metrica] || 0) + (r[desvio] || 0))) * 1.1 || 1;
+  const x = v => margem.esquerda + v / xMax * largura;
+  const y = v => margem.topo + altura - v / yMax * altura;
+
+  const eixo = elemento('g', {class: 'eixo'}, svg);
+  for (let i = 0; i <= 5; i++) {
+    const vy = yMax * i / 5, vx = xMax * i / 5;
+    elemento('line', {x1: margem.esquerda, x2: margem.esquerda + largura, y1: y(vy), y2: y(vy), class: 'grade'}, eixo);
+    elemento('text', {x: margem.esquerda - 8, y: y(vy) + 4, 'text-anchor': 'end'}, eixo).textContent = vy.toPrecision(3);
+    elemento('text', {x: x(vx), y: margem.topo + altura + 18, 'text-anchor': 'middle'}, eixo).textContent = Math.round(vx);
+  }
+  elemento('text', {x: margem.esquerda + largura / 2, y: margem.topo + altura + 40, 'text-anchor': 'middle'}, eixo)
+    .textContent = ROTULO_X;
+  elemento('text', {x: 16, y: margem.topo + altura / 2, 'text-anchor': 'middle',
+                    transform: `rotate(-90 16 ${margem.topo + altura / 2})`}, eixo).textContent = seletorMetrica.selectedOptions[0].text;
+
+  const dica = document.getElementById('dica');
+  servidores.forEach((servidor, i) => {
+    const cor = CORES[i % CORES.length];
+    const pontos = linhas.filter(r => r.servidor === servidor).sort((a, b) => a.num_requisicoes - b.num_requisicoes);
+    if (!pontos.length) return;
+    elemento('polyline', {points: pontos.map(r => `${x(r.num_requisicoes)},${y(r[metrica] || 0)}`).join(' '),
+                          fill: 'none', stroke: cor, 'stroke-width': 2.5}, svg);
+    pontos.forEach(r => {
+      const valor = r[metrica] || 0, erro = r[desvio] || 0;
+      if (erro) elemento('line', {x1: x(r.num_requisicoes), x2: x(r.num_requisicoes), y1: y(Math.max(0, valor - erro)),
+                                  y2: y(valor + erro), stroke: cor, 'stroke-width': 1.5}, svg);
+      const ponto = elemento('circle', {cx: x(r.num_requisicoes), cy: y(valor), r: 5, fill: cor}, svg);
+      ponto.addEventListener('mousemove', ev => {
+        dica.style.display = 'block';
+        dica.style.left = (ev.pageX + 12) + 'px';
+        dica.style.top = (ev.pageY + 12) + 'px';
+        dica.textContent = `${servidor} - ${ROTULO_X}: ${r.num_requisicoes}\\n${metrica}: ${valor.toFixed(3)}` +
+                           (erro ? ` ± ${erro.toFixed(3)}` : '');
+      });
+      ponto.addEventListener('mouseleave', () => { dica.style.display = 'none'; });
+    });
+    elemento('rect', {x: margem.esquerda + largura + 20, y: margem.topo + i * 22, width: 14, height: 14, fill: cor}, svg);
+    elemento('text', {x: margem.esquerda + largura + 40, y: margem.topo + i * 22 + 12}, svg).textContent = servidor;
+  });
+
+  const tabela = document.getElementById('tabela');
+  tabela.innerHTML = '<tr><th>servidor</th><th>' + ROTULO_X + '</th><th>' + metrica + '</th><th>desvio</th></tr>' +
+    linhas.map(r => `<tr><td>${r.servidor}</td><td>${r.num_requisicoes}</td><td>${(r[metrica] || 0).toFixed(3)}</td>` +
+                    `<td>${(r[desvio] || 0).toFixed(3)}</td></tr>`).join('');
+}
+
+seletorMetrica.addEventListener('change', desenhar);
+seletorCenario.addEventListener('change', desenhar);
+desenhar();
+</script>
+</body>
+</html>
+"""
+
+def gerar_relatorio_html(df, caminho, rotulo_x='Número de Requisições', metadados=None):
+    #Grava o relatório com as linhas do DataFrame (uma por servidor, cenário e número de clientes)
+    registros = json.loads(df.to_json(orient='records'))
+    configuracao = f" | configuração {metadados['hash_configuracao']}" if metadados else ''
+    conteudo = (MODELO_HTML
+                .replace('__DADOS__', json.dumps(registros, ensure_ascii=False).replace('</', '<\\/'))
+                .replace('__ROTULO_X__', json.dumps(rotulo_x, ensure_ascii=False))
+                .replace('__REGISTROS__', str(len(registros)))
+                .replace('__CONFIGURACAO__', configuracao)
+                .replace('__GERADO_EM__', datetime.now().strftime('%d/%m/%Y %H:%M:%S')))
+    os.makedirs(os.path.dirname(caminho) or '.', exist_ok=True)
+    with open(caminho, 'w', encoding='utf-8') as f:
+        f.write(conteudo)
+    return caminho
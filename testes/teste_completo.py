@@ -16,13 +16,110 @@ execucoes_por_teste = 10
 concorrencia_clientes = 5
 concorrencia_requisicoes = 2
 
+#Agendamento da matriz (--completo): um processo por servidor, com aquecimento e deteccao de resfriamento
+#Em paralelo os servidores e seus geradores de carga so ficam isolados se cada um tiver suas proprias CPUs: o harness
+#local divide as CPUs entre os motores (ou volta a executar em serie se nao houver CPUs suficientes); sem essa divisao
+#(ex.: containers) as execucoes simultaneas disputam as mesmas CPUs e os resultados nao sao comparaveis
+executar_servidores_em_paralelo = False
+requisicoes_aquecimento = 5
+tempo_limite_resfriamento = 10  #segundos maximos aguardando o servidor voltar ao repouso
+fator_resfriamento = 3  #repouso: sonda responde em ate N x a latencia medida no aquecimento
+
+#Amostragem de recursos do servidor (CPU, RSS, threads, fds, trocas de contexto) durante cada execucao
+#Localmente (harness) le /proc/<pid>; entre containers so e feita via rota /recursos se habilitada abaixo,
+#pois as consultas disputam o servidor com a carga medida
+intervalo_amostragem_recursos = 0.1  #segundos
+amostrar_recursos_via_http = False
+
+#Comparacao estatistica entre servidores (bootstrap, Mann-Whitney e Welch)
+nivel_significancia = 0.05
+reamostragens_bootstrap = 2000
+
+#Repeticao adaptativa (--adaptativo): apos execucoes_por_teste, cada celula continua sendo repetida ate a
+#largura do IC de 95% do throughput ficar abaixo da fracao abaixo da media ou atingir execucoes_maximas
+largura_relativa_ic_alvo = 0.10
+execucoes_maximas = 30
+
+#Execucoes concluidas sao gravadas neste arquivo (append-only) para permitir retomar uma rodada interrompida
+arquivo_execucoes_em_andamento = 'execucoes_em_andamento.jsonl'
+
+#Cenarios fixos de teste (nome, caminho e descricao usada nos relatorios)
+cenarios_padrao = [
+    {'nome': 'rapido', 'caminho': '/rapido', 'descricao': 'Processamento Instantaneo'},
+    {'nome': 'medio', 'caminho': '/medio', 'descricao': 'Processamento 0.5 segundos'},
+    {'nome': 'lento', 'caminho': '/lento', 'descricao': 'Processamento 2.0 segundos'},
+]
+
+#Varredura continua do tempo de servico via /trabalho (--varredura): cada atraso vira um cenario
+varredura_delay_ms = [0, 50, 100, 250, 500, 1000, 2000]
+varredura_cpu_ms = 0
+varredura_bytes = 0
+
+#Varredura do backlog do listen() (harness_local.py --backlog): motores reiniciados a cada configuracao
+backlogs_teste = [1, 4, 16, 64, 256]
+lotes_accept_teste = [1, 64]
+execucoes_por_backlog = 3
+caminho_teste_backlog = '/rapido'
+
+#Clientes lentos (harness_local.py --slowloris): conexoes que enviam cabecalhos um pedaco por vez, misturadas a carga normal
+#Cada prazo de cabecalhos (0 = sem prazo) e testado com e sem as conexoes lentas
+prazos_cabecalhos_slowloris = [0, 2]  #segundos
+conexoes_lentas_teste = [0, 32]
+intervalo_envio_lento = 1.0  #segundos entre pedacos enviados por cada conexao lenta
+clientes_slowloris = 8
+execucoes_por_slowloris = 3
+duracao_minima_slowloris = 5  #segundos: as conexoes lentas duram mais que o maior prazo, para o prazo ser observado
+caminho_teste_slowloris = '/rapido'
+
+#Misturas ponderadas de rotas (harness_local.py --mistura): cada requisicao sorteia a rota pelo peso, na mesma sequencia para todos os
+#servidores (semente fixa). Uma mistura com uma so rota serve de referencia para a inflacao da latencia na mistura
+misturas_rotas = [
+    {'nome': 'rapido_100', 'rotas': {'/rapido': 100}},
+    {'nome': 'mistura_80_15_5', 'rotas': {'/rapido': 80, '/medio': 15, '/lento': 5}},
+]
+clientes_mistura = 8
+requisicoes_mistura_por_cliente = 15
+execucoes_por_mistura = 2
+backlog_mistura = 64  #Backlog folgado: a espera medida e a do servidor, nao retransmissoes de SYN
+semente_mistura = 42
+
+#Perfis de carga variáveis no tempo (harness_local.py --perfis): clientes ativos em cada instante (ver testes/perfis_carga.py)
+perfis_carga = [
+    {'nome': 'rampa', 'tipo': 'rampa', 'duracao': 20, 'inicio': 1, 'fim': 32},
+    {'nome': 'degraus', 'tipo': 'degraus', 'duracao_degrau': 4, 'niveis': [1, 2, 4, 8, 16, 32]},
+    {'nome': 'pico', 'tipo': 'pico', 'duracao': 15, 'base': 2, 'pico': 32, 'inicio_pico': 5, 'duracao_pico': 3},
+    {'nome': 'senoide', 'tipo': 'senoide', 'duracao': 20, 'minimo': 1, 'maximo': 16, 'periodo': 10},
+]
+caminho_perfis = '/trabalho?delay_ms=20'  #Com espera de E/S o concorrente escala e o sequencial satura com 1 cliente
+backlog_perfis = 64
+
+#Busca da capacidade (harness_local.py --capacidade): maior taxa (req/s, malha aberta) dentro do SLO por servidor e cenario
+slo_capacidade = {'p99': 0.2, 'taxa_erro': 1.0}  #p99 em segundos (desde o instante agendado) e erros em %
+cenarios_capacidade = [
+    {'nome': 'rapido', 'caminho': '/rapido'},
+    {'nome': 'trabalho_50ms', 'caminho': '/trabalho?delay_ms=50'},
+]
+taxa_inicial_capacidade = 10  #req/s do primeiro ponto; dobra ate violar o SLO
+taxa_maxima_capacidade = 2000
+precisao_capacidade = 0.1  #Busca binaria para quando (reprovada - aprovada) / aprovada fica abaixo disso
+duracao_ponto_capacidade = 5  #Segundos de carga em cada taxa testada
+clientes_maximos_capacidade = 256  #Requisicoes simultaneas do gerador (acima disso as seguintes atrasam o envio)
+backlog_capacidade = 128
+
 import sys
 import os
 import csv
 import time
+import json
+import queue
+import socket
+import multiprocessing
 import argparse
 import threading
+import random
+from concurrent.futures import ThreadPoolExecutor
 import statistics
+import numpy as np
 from datetime import datetime
 
 #Classe para cores no terminal
@@ -53,11 +150,21 @@ class Cores:
         return f"{Cores.AZUL}[INFO]{Cores.RESET} {texto}"
 
 #Adicionar diretório src ao path (um nível acima da pasta testes)
-sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'src'))
+DIRETORIO_SRC = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src')
+DIRETORIO_RESULTADOS = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'resultados')
+sys.path.append(DIRETORIO_SRC)
 
 try:
     from cliente import ClienteHTTP
-    from configuracao import ID_CUSTOMIZADO, PORTA_SERVIDOR
+    from recursos import AmostradorRecursos
+    from estatisticas import (colunas_execucoes, media_por_execucao, somar_por_execucao, throughputs_execucoes,
+                              percentis, resumir, largura_relativa_ic, throughput_execucao, ic_bootstrap,
+                              comparar_amostras)
+    from rastros import tabela_rastros, salvar_rastros
+    from perfis_carga import duracao_perfil, clientes_no_instante, clientes_maximos, series_por_segundo, detectar_saturacao
+    from capacidade import avaliar_ponto, buscar_capacidade, detectar_joelho
+    from metadados import salvar_metadados
+    from configuracao import ID_CUSTOMIZADO, PORTA_SERVIDOR, PREFIXO_UNIX
 except ImportError as e:
     print(Cores.erro(f"Erro ao importar módulos: {e}"))
     print("Certifique-se de estar no diretório correto do projeto")
@@ -81,8 +188,9 @@ class TestadorCarga:
         
         return resultado
     
-    def teste_concorrente(self, num_clientes, requisicoes_por_cliente, metodo='GET', caminho='/'):
+    def teste_concorrente(self, num_clientes, requisicoes_por_cliente, metodo='GET', caminho='/', sequencias=None):
         #Executa teste com múltiplos clientes simultâneos
+        #sequencias: caminhos de cada cliente (um por requisição) no lugar de caminho; cada resultado ganha a 'rota'
         threads = []
         self.resultados = []
         
@@ -90,7 +198,11 @@ class TestadorCarga:
         
         def executar_cliente(id_cliente):
             for i in range(requisicoes_por_cliente):
-                self.teste_requisicao_unica(metodo, caminho, f"{id_cliente}-{i}")
+                if sequencias:
+                    rota = sequencias[id_cliente][i]
+                    self.teste_requisicao_unica(metodo, rota, f"{id_cliente}-{i}")['rota'] = rota
+                else:
+                    self.teste_requisicao_unica(metodo, caminho, f"{id_cliente}-{i}")
                 time.sleep(0.01)  #Pequeno delay entre requisições
         
         #Criar e iniciar threads
@@ -113,135 +225,605 @@ class TestadorCarga:
             'resultados': self.resultados
         }
     
+    def teste_mistura(self, num_clientes, requisicoes_por_cliente, rotas, semente=0):
+        #Clientes simultâneos em que cada requisição sorteia a rota pelos pesos ({caminho: peso})
+        #A sequência de cada cliente depende só da semente: todos os servidores recebem a mesma carga
+        caminhos = list(rotas)
+        pesos = [rotas[caminho] for caminho in caminhos]
+        sequencias = [random.Random(semente * 1000 + id_cliente).choices(caminhos, pesos, k=requisicoes_por_cliente)
+                      for id_cliente in range(num_clientes)]
+        return self.teste_concorrente(num_clientes, requisicoes_por_cliente, 'GET', sequencias=sequencias)
+    
+    def teste_perfil(self, perfil, metodo='GET', caminho='/'):
+        #Executa um perfil de carga: as threads são criadas no início e o cliente i só envia requisições
+        #enquanto i for menor que o número de clientes do perfil naquele instante
+        self.resultados = []
+        duracao = duracao_perfil(perfil)
+        tempo_inicio = time.time()
+        
+        def executar_cliente(id_cliente):
+            contador = 0
+            while True:
+                instante = time.time() - tempo_inicio
+                if instante >= duracao:
+                    return
+                if id_cliente < clientes_no_instante(perfil, instante):
+                    self.teste_requisicao_unica(metodo, caminho, f"{id_cliente}-{contador}")
+                    contador += 1
+                    time.sleep(0.01)  #Pequeno delay entre requisições
+                else:
+                    time.sleep(0.02)  #Cliente inativo aguarda o perfil chegar até ele
+        
+        threads = [threading.Thread(target=executar_cliente, args=(i,)) for i in range(clientes_maximos(perfil))]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        
+        return {
+            'tempo_total': time.time() - tempo_inicio,
+            'perfil': perfil['nome'],
+            'total_requisicoes': len(self.resultados),
+            'series': series_por_segundo(self.resultados, tempo_inicio, perfil),
+            'resultados': self.resultados
+        }
+    
+    def teste_taxa(self, taxa, duracao, metodo='GET', caminho='/', max_clientes=256):
+        #Carga em malha aberta: requisições disparadas a taxa fixa, sem esperar as respostas anteriores
+        #A latência também é medida desde o instante agendado (tempo_resposta_agendado): quando o servidor
+        #atrasa, o gerador não reduz o ritmo e o atraso não some da medida (omissão coordenada)
+        self.resultados = []
+        total = max(1, int(taxa * duracao))
+        tempo_inicio = time.time()
+        
+        def executar(indice, agendado):
+            atraso = time.time() - agendado
+            resultado = self.teste_requisicao_unica(metodo, caminho, f"taxa-{indice}")
+            resultado['atraso_envio'] = atraso
+            resultado['tempo_resposta_agendado'] = resultado['tempo_resposta'] + atraso
+        
+        with ThreadPoolExecutor(max_workers=max_clientes) as executor:
+            for indice in range(total):
+                agendado = tempo_inicio + indice / taxa
+                espera = agendado - time.time()
+                if espera > 0:
+                    time.sleep(espera)
+                executor.submit(executar, indice, agendado)
+        
+        return {
+            'tempo_total': time.time() - tempo_inicio,
+            'taxa_alvo': taxa,
+            'total_requisicoes': len(self.resultados),
+            'resultados': self.resultados
+        }
+    
     def gerar_relatorio(self, resultado_teste):
         #Gera relatório detalhado do teste (silencioso durante execução automática)
         pass
 
+def gerar_cenarios_varredura(delays_ms=None, cpu_ms=None, tamanho_bytes=None):
+    #Gera um cenario /trabalho para cada tempo de servico da varredura
+    delays_ms = varredura_delay_ms if delays_ms is None else delays_ms
+    cpu_ms = varredura_cpu_ms if cpu_ms is None else cpu_ms
+    tamanho_bytes = varredura_bytes if tamanho_bytes is None else tamanho_bytes
+    
+    cenarios = []
+    for delay_ms in delays_ms:
+        cenarios.append({
+            'nome': f'trabalho_{delay_ms}ms',
+            'caminho': f'/trabalho?delay_ms={delay_ms}&cpu_ms={cpu_ms}&bytes={tamanho_bytes}',
+            'descricao': f'Espera {delay_ms}ms, CPU {cpu_ms}ms, payload {tamanho_bytes} bytes'
+        })
+    return cenarios
+
+def separar_endereco(endereco):
+    #Converte 'host' ou 'host:porta' em (host, porta); 'unix:/caminho' é repassado inteiro ao ClienteHTTP
+    if endereco.startswith(PREFIXO_UNIX):
+        return endereco, None
+    if ':' in endereco:
+        host, porta = endereco.rsplit(':', 1)
+        return host, int(porta)
+    return endereco, PORTA_SERVIDOR
+
+class MonitorResfriamento:
+    #Aquece o servidor e detecta quando ele voltou ao repouso entre execucoes (substitui pausas fixas)
+    def __init__(self, host, porta):
+        self.cliente = ClienteHTTP(host, porta)
+        self.latencia_base = None
+    
+    def sondar(self):
+        #Consulta /status e retorna (sucesso, tempo de resposta, conexoes ativas ou None)
+        #no-cache: com o cache de respostas ativo a sonda ainda precisa das conexões ativas do momento
+        resultado = self.cliente.enviar_requisicao('GET', '/status', {'Cache-Control': 'no-cache'})
+        if not resultado['sucesso'] or resultado['codigo_status'] != 200:
+            return False, resultado['tempo_resposta'], None
+        try:
+            conteudo = json.loads(resultado['corpo']).get('conteudo', {})
+            ativas = conteudo.get('conexoes_ativas')
+        except ValueError:
+            ativas = None
+        return True, resultado['tempo_resposta'], ativas
+    
+    def aquecer(self, quantidade=None):
+        #Envia requisicoes descartadas e mede a latencia base da sonda
+        quantidade = requisicoes_aquecimento if quantidade is None else quantidade
+        tempos = []
+        for _ in range(max(1, quantidade)):
+            sucesso, tempo, _ = self.sondar()
+            if sucesso:
+                tempos.append(tempo)
+        self.latencia_base = statistics.median(tempos) if tempos else 0.005
+        return self.latencia_base
+    
+    def aguardar_resfriamento(self):
+        #Aguarda ate a sonda responder rapido e nao haver outras conexoes ativas no servidor
+        if self.latencia_base is None:
+            self.aquecer()
+        limiar = max(self.latencia_base * fator_resfriamento, 0.005)
+        limite = time.time() + tempo_limite_resfriamento
+        
+        while time.time() < limite:
+            sucesso, tempo, ativas = self.sondar()
+            if sucesso and tempo <= limiar and (ativas is None or ativas <= 1):
+                return True
+            time.sleep(0.05)
+        return False
+
+class ArmazenamentoExecucoes:
+    #Armazenamento append-only das execucoes concluidas (uma linha JSON por execucao)
+    #Cada linha e gravada com fsync assim que a execucao termina; uma linha truncada por queda e ignorada
+    def __init__(self, arquivo=None):
+        if arquivo is None:
+            arquivo = os.path.join(DIRETORIO_RESULTADOS, arquivo_execucoes_em_andamento)
+        self.arquivo = arquivo
+        self.fim_de_linha_verificado = False
+    
+    def garantir_fim_de_linha(self):
+        #Se a ultima linha ficou incompleta em uma queda, termina-a para nao corromper o proximo registro
+        if os.path.exists(self.arquivo) and os.path.getsize(self.arquivo) > 0:
+            with open(self.arquivo, 'rb+') as f:
+                f.seek(-1, os.SEEK_END)
+                if f.read(1) != b'\n':
+                    f.write(b'\n')
+        self.fim_de_linha_verificado = True
+    
+    def chave(self, tipo_servidor, cenario, num_clientes, execucao):
+        #Uma execucao so e reaproveitada se o caminho e as requisicoes por cliente forem os mesmos
+        return (tipo_servidor, cenario['nome'], cenario['caminho'], requisicoes_por_cliente, num_clientes, execucao)
+    
+    def carregar(self):
+        #Retorna {chave: resultado} com as execucoes ja concluidas
+        concluidas = {}
+        if not os.path.exists(self.arquivo):
+            return concluidas
+        
+        with open(self.arquivo, 'r', encoding='utf-8') as f:
+            for linha in f:
+                try:
+                    registro = json.loads(linha)
+                except ValueError:
+                    continue  #Linha incompleta gravada durante uma queda
+                chave = (registro['servidor'], registro['cenario'], registro['caminho'],
+                         registro['requisicoes_por_cliente'], registro['num_clientes'], registro['execucao'])
+                concluidas[chave] = registro['resultado']
+        return concluidas
+    
+    def registrar(self, tipo_servidor, cenario, num_clientes, execucao, resultado):
+        #Acrescenta uma execucao concluida ao arquivo (o corpo das respostas nao e persistido)
+        os.makedirs(os.path.dirname(os.path.abspath(self.arquivo)), exist_ok=True)
+        if not self.fim_de_linha_verificado:
+            self.garantir_fim_de_linha()
+        resultado_persistido = dict(resultado)
+        resultado_persistido['resultados'] = [
+            {chave: valor for chave, valor in r.items() if chave != 'corpo'} for r in resultado['resultados']
+        ]
+        registro = {
+            'servidor': tipo_servidor,
+            'cenario': cenario['nome'],
+            'caminho': cenario['caminho'],
+            'requisicoes_por_cliente': requisicoes_por_cliente,
+            'num_clientes': num_clientes,
+            'execucao': execucao,
+            'resultado': resultado_persistido
+        }
+        with open(self.arquivo, 'a', encoding='utf-8') as f:
+            f.write(json.dumps(registro) + '\n')
+            f.flush()
+            os.fsync(f.fileno())
+    
+    def arquivar(self):
+        #Ao fim de uma rodada completa o arquivo e renomeado, para a proxima rodada comecar do zero
+        if os.path.exists(self.arquivo):
+            destino = self.arquivo.replace('_em_andamento', '_' + datetime.now().strftime('%Y%m%d_%H%M%S'))
+            os.replace(self.arquivo, destino)
+            return destino
+        return None
+    
+    def limpar(self):
+        if os.path.exists(self.arquivo):
+            os.remove(self.arquivo)
+
+def executar_celulas_servidor(tipo_servidor, endereco, cenarios, lista_clientes, execucoes, requisicoes, fila, ja_concluidas=None,
+                              pid=None, largura_alvo=None, maximo_execucoes=None, cpus_cliente=None):
+    #Executa, em um processo isolado, todas as celulas de um servidor e publica cada execucao na fila
+    #ja_concluidas: {(cenario, num_clientes, execucao): throughput} recuperado do armazenamento, que e pulado
+    #pid: processo do servidor na mesma maquina, cujos recursos sao amostrados via /proc
+    #largura_alvo: com repeticao adaptativa, largura relativa do IC95 do throughput que encerra a celula
+    #cpus_cliente: CPUs exclusivas do gerador de carga deste servidor (execucao em paralelo isolada)
+    ja_concluidas = ja_concluidas or {}
+    try:
+        if cpus_cliente:
+            os.sched_setaffinity(0, cpus_cliente)
+        host, porta = separar_endereco(endereco)
+        monitor = MonitorResfriamento(host, porta)
+        monitor.aquecer()
+        if pid is not None:
+            amostrador = AmostradorRecursos(pid, intervalo=intervalo_amostragem_recursos)
+        elif amostrar_recursos_via_http:
+            amostrador = AmostradorRecursos(host=host, porta=porta, intervalo=intervalo_amostragem_recursos)
+        else:
+            amostrador = AmostradorRecursos()  #Sem fonte: nenhuma amostra e coletada
+        
+        for cenario in cenarios:
+            for num_clientes in lista_clientes:
+                throughputs = [valor for (nome, clientes, _), valor in ja_concluidas.items()
+                               if nome == cenario['nome'] and clientes == num_clientes]
+                execucao = -1
+                while True:
+                    execucao += 1
+                    if execucao >= execucoes and (largura_alvo is None or execucao >= maximo_execucoes or
+                                                  largura_relativa_ic(throughputs) <= largura_alvo):
+                        fila.put(('celula', tipo_servidor, cenario['nome'], num_clientes, execucao))  #Total de execucoes da celula
+                        break
+                    if (cenario['nome'], num_clientes, execucao) in ja_concluidas:
+                        continue
+                    inicio = time.time()
+                    testador = TestadorCarga(host, porta)
+                    amostrador.iniciar()
+                    resultado = testador.teste_concorrente(num_clientes, requisicoes, 'GET', cenario['caminho'])
+                    resultado['recursos'] = amostrador.parar()
+                    throughputs.append(throughput_execucao(resultado))
+                    monitor.aguardar_resfriamento()
+                    fila.put(('execucao', tipo_servidor, cenario['nome'], num_clientes, execucao,
+                              resultado, time.time() - inicio))
+    except Exception as e:
+        fila.put(('erro', tipo_servidor, str(e)))
+    finally:
+        fila.put(('fim', tipo_servidor))
+
+class AgendadorMatriz:
+    #Agenda a matriz servidores x cenarios x clientes x execucoes
+    #Servidores diferentes nao compartilham estado e rodam em processos separados (simultaneos se paralelo)
+    def __init__(self, servidores, cenarios, lista_clientes=None, execucoes=None, requisicoes=None, paralelo=None,
+                 armazenamento=None, pids=None, largura_alvo=None, maximo_execucoes=None, cpus_clientes=None):
+        self.servidores = servidores
+        self.pids = pids or {}  #servidor -> pid local, para a amostragem de recursos via /proc
+        self.cenarios = cenarios
+        self.lista_clientes = clientes_teste if lista_clientes is None else lista_clientes
+        self.execucoes = execucoes_por_teste if execucoes is None else execucoes
+        self.requisicoes = requisicoes_por_cliente if requisicoes is None else requisicoes
+        self.paralelo = executar_servidores_em_paralelo if paralelo is None else paralelo
+        self.cpus_clientes = cpus_clientes or {}  #servidor -> CPUs do seu gerador de carga (divididas pelo harness)
+        if self.paralelo and len(servidores) > 1 and not self.cpus_clientes:
+            print(Cores.aviso("Servidores em paralelo sem CPUs separadas: as execucoes disputam as mesmas CPUs "
+                              "e os resultados nao ficam isolados"))
+        self.armazenamento = armazenamento
+        self.largura_alvo = largura_alvo  #None = numero fixo de execucoes
+        self.maximo_execucoes = execucoes_maximas if maximo_execucoes is None else maximo_execucoes
+        self.resultados = {}
+        self.duracoes = {}  #(servidor, cenario) -> duracoes das execucoes concluidas
+        self.concluidas = {tipo_servidor: 0 for tipo_servidor in servidores}
+        #(servidor, cenario, num_clientes) -> execucoes agendadas na celula: com repeticao adaptativa comeca no minimo,
+        #cresce a cada execucao extra e fica exata quando o processo informa que a celula terminou
+        self.agendadas = {(tipo_servidor, cenario['nome'], num_clientes): self.execucoes
+                          for tipo_servidor in servidores for cenario in cenarios for num_clientes in self.lista_clientes}
+        self.inicio = None
+    
+    def execucoes_por_servidor(self, tipo_servidor, cenario=None):
+        #Execucoes agendadas do servidor (ou de um cenario dele)
+        return sum(total for (tipo, nome, _), total in self.agendadas.items()
+                   if tipo == tipo_servidor and (cenario is None or nome == cenario))
+    
+    def executar(self):
+        #Executa a matriz e retorna resultados[servidor][cenario][num_clientes] = lista de execucoes
+        self.inicio = time.time()
+        fila = multiprocessing.Queue()
+        processos = {}
+        ja_concluidas = self.recuperar_concluidas()
+        
+        for tipo_servidor, endereco in self.servidores.items():
+            processos[tipo_servidor] = multiprocessing.Process(
+                target=executar_celulas_servidor,
+                args=(tipo_servidor, endereco, self.cenarios, self.lista_clientes,
+                      self.execucoes, self.requisicoes, fila, ja_concluidas[tipo_servidor],
+                      self.pids.get(tipo_servidor), self.largura_alvo, self.maximo_execucoes,
+                      self.cpus_clientes.get(tipo_servidor))
+            )
+        
+        if self.paralelo:
+            for processo in processos.values():
+                processo.start()
+            self.consumir(fila, processos)
+        else:
+            for tipo_servidor, processo in processos.items():
+                processo.start()
+                self.consumir(fila, {tipo_servidor: processo})
+        
+        for processo in processos.values():
+            processo.join()
+        print()
+        
+        #Ordena as execucoes de cada celula pelo indice
+        return {
+            tipo_servidor: {
+                cenario: {num_clientes: [execucoes[i] for i in sorted(execucoes)] for num_clientes, execucoes in por_clientes.items()}
+                for cenario, por_clientes in por_cenario.items()
+            }
+            for tipo_servidor, por_cenario in self.resultados.items()
+        }
+    
+    def recuperar_concluidas(self):
+        #Carrega do armazenamento as execucoes da matriz atual que ja foram concluidas
+        ja_concluidas = {tipo_servidor: {} for tipo_servidor in self.servidores}
+        for tipo_servidor in self.servidores:
+            self.resultados[tipo_servidor] = {}
+        if self.armazenamento is None:
+            return ja_concluidas
+        
+        registros = self.armazenamento.carregar()
+        for tipo_servidor in self.servidores:
+            for cenario in self.cenarios:
+                for num_clientes in self.lista_clientes:
+                    for execucao in range(max(self.execucoes, self.maximo_execucoes) if self.largura_alvo else self.execucoes):
+                        chave = self.armazenamento.chave(tipo_servidor, cenario, num_clientes, execucao)
+                        if chave in registros:
+                            self.resultados[tipo_servidor].setdefault(cenario['nome'], {}).setdefault(num_clientes, {})[execucao] = registros[chave]
+                            ja_concluidas[tipo_servidor][(cenario['nome'], num_clientes, execucao)] = throughput_execucao(registros[chave])
+                            self.agendar(tipo_servidor, cenario['nome'], num_clientes, execucao + 1)
+            self.concluidas[tipo_servidor] = len(ja_concluidas[tipo_servidor])
+        
+        total = sum(self.concluidas.values())
+        if total:
+            print(Cores.info(f"Retomando rodada: {total} execucoes ja concluidas em {self.armazenamento.arquivo}"))
+        return ja_concluidas
+    
+    def consumir(self, fila, processos):
+        #Le as mensagens dos processos ate todos terminarem
+        pendentes = set(processos)
+        while pendentes:
+            try:
+                mensagem = fila.get(timeout=1)
+            except queue.Empty:
+                #Processo que morreu sem avisar (ex.: falta de memoria) nao deve travar o agendador
+                pendentes = {tipo for tipo in pendentes if processos[tipo].is_alive()}
+                continue
+            
+            tipo_mensagem, tipo_servidor = mensagem[0], mensagem[1]
+            if tipo_mensagem == 'execucao':
+                _, _, cenario, num_clientes, execucao, resultado, duracao = mensagem
+                self.registrar_execucao(tipo_servidor, cenario, num_clientes, execucao, resultado, duracao)
+            elif tipo_mensagem == 'celula':
+                _, _, cenario, num_clientes, total = mensagem
+                self.agendadas[(tipo_servidor, cenario, num_clientes)] = total
+            elif tipo_mensagem == 'erro':
+                print()
+                print(Cores.erro(f"Servidor {tipo_servidor}: {mensagem[2]}"))
+            elif tipo_mensagem == 'fim':
+                pendentes.discard(tipo_servidor)
+    
+    def registrar_execucao(self, tipo_servidor, cenario, num_clientes, execucao, resultado, duracao):
+        if self.armazenamento is not None:
+            definicao = next(c for c in self.cenarios if c['nome'] == cenario)
+            self.armazenamento.registrar(tipo_servidor, definicao, num_clientes, execucao, resultado)
+        self.resultados[tipo_servidor].setdefault(cenario, {}).setdefault(num_clientes, {})[execucao] = resultado
+        self.duracoes.setdefault((tipo_servidor, cenario), []).append(duracao)
+        self.concluidas[tipo_servidor] += 1
+        self.agendar(tipo_servidor, cenario, num_clientes, execucao + 1)
+        self.exibir_progresso()
+    
+    def agendar(self, tipo_servidor, cenario, num_clientes, minimo):
+        #Execucao extra da repeticao adaptativa: a celula tem ao menos 'minimo' execucoes
+        chave = (tipo_servidor, cenario, num_clientes)
+        self.agendadas[chave] = max(self.agendadas[chave], minimo)
+    
+    def estimar_restante(self):
+        #Estimativa em segundos: cada servidor usa a duracao media observada por cenario
+        #Com repeticao adaptativa as celulas ainda nao iniciadas contam com o minimo de execucoes
+        restantes = []
+        for tipo_servidor in self.servidores:
+            faltam = self.execucoes_por_servidor(tipo_servidor) - self.concluidas[tipo_servidor]
+            if faltam <= 0:
+                restantes.append(0)
+                continue
+            
+            observadas = [d for (tipo, _), duracoes in self.duracoes.items() if tipo == tipo_servidor for d in duracoes]
+            media_servidor = statistics.mean(observadas) if observadas else 0
+            estimativa = 0
+            
+            #Execucoes agendadas e ainda nao concluidas de cada cenario
+            for cenario in self.cenarios:
+                concluidas_cenario = sum(len(execucoes) for execucoes in
+                                         self.resultados[tipo_servidor].get(cenario['nome'], {}).values())
+                faltam_cenario = max(0, self.execucoes_por_servidor(tipo_servidor, cenario['nome']) - concluidas_cenario)
+                duracoes = self.duracoes.get((tipo_servidor, cenario['nome']))
+                estimativa += faltam_cenario * (statistics.mean(duracoes) if duracoes else media_servidor)
+            
+            restantes.append(estimativa)
+        
+        #Em paralelo o tempo restante e o do servidor mais atrasado; em serie, a soma
+        return max(restantes) if self.paralelo else sum(restantes)
+    
+    def exibir_progresso(self):
+        total = sum(self.agendadas.values())
+        concluidas = sum(self.concluidas.values())
+        decorrido = time.time() - self.inicio
+        restante = self.estimar_restante()
+        print(f"\r{Cores.info('')}[{concluidas}/{total}] decorrido {decorrido/60:5.1f} min | "
+              f"restante estimado {restante/60:5.1f} min   ", end='', flush=True)
+
 class TestadorAutomatizado:
     #Classe para executar testes automatizados
-    def __init__(self):
+    def __init__(self, cenarios=None, lista_clientes=None, execucoes=None, diretorio_resultados=None, largura_ic_alvo=None):
         self.resultados = {}
+        self.largura_ic_alvo = largura_ic_alvo  #Repeticao adaptativa (None = execucoes fixas)
+        self.cenarios = cenarios if cenarios is not None else cenarios_padrao
+        self.lista_clientes = clientes_teste if lista_clientes is None else lista_clientes
+        self.execucoes = execucoes_por_teste if execucoes is None else execucoes
+        self.requisicoes = requisicoes_por_cliente
+        self.diretorio_resultados = DIRETORIO_RESULTADOS if diretorio_resultados is None else diretorio_resultados
+        self.servidores = {}
+        self.contexto = {}  #Informações da rodada gravadas nos metadados (ex.: ambiente do harness)
+        self.metadados = None
+        self.comparacoes = {}  #(cenario, num_clientes) -> comparacao estatistica, reutilizada por relatorio, CSV e console
+    
+    def nomes_cenarios(self):
+        #Nomes dos cenarios na ordem de execucao
+        return [cenario['nome'] for cenario in self.cenarios]
+    
+    def descricao_cenario(self, nome):
+        #Descricao do cenario para os relatorios
+        for cenario in self.cenarios:
+            if cenario['nome'] == nome:
+                return cenario['descricao']
+        return nome
         
-    def executar_todos_testes(self):
+    def executar_todos_testes(self, servidores=None, armazenamento=None, pids=None, contexto=None, paralelo=None,
+                              cpus_clientes=None):
         #Executa todos os testes automatizados com multiplas execucoes
+        #paralelo/cpus_clientes: definidos pelo harness local conforme as CPUs disponiveis (None = configuracao do topo)
         
         #Endereços dos servidores (baseado no docker-compose)
-        servidores = {
-            'sequencial': '76.1.0.10',
-            'concorrente': '76.1.0.11'
-        }
+        if servidores is None:
+            servidores = {
+                'sequencial': '76.1.0.10',
+                'concorrente': '76.1.0.11'
+            }
         
-        #Diferentes cenários de teste
-        cenarios_teste = [
-            {'nome': 'rapido', 'caminho': '/rapido', 'descricao': 'Processamento rapido'},
-            {'nome': 'medio', 'caminho': '/medio', 'descricao': 'Processamento medio (0.5s)'},
-            {'nome': 'lento', 'caminho': '/lento', 'descricao': 'Processamento lento (2s)'},
-        ]
+        self.servidores = dict(servidores)
+        self.contexto = contexto or {}
         
         #Configurações de teste (usando valores das configurações do topo)
         #Para alterar: modifique as variáveis no topo do arquivo
+        agendador = AgendadorMatriz(servidores, self.cenarios, self.lista_clientes, self.execucoes, self.requisicoes,
+                                    paralelo=paralelo, armazenamento=armazenamento, pids=pids,
+                                    largura_alvo=self.largura_ic_alvo, cpus_clientes=cpus_clientes)
+        execucoes_por_celula = agendador.executar()
+        self.comparacoes = {}
         
-        for tipo_servidor, ip_servidor in servidores.items():
+        for tipo_servidor in servidores:
             self.resultados[tipo_servidor] = {}
             
-            for cenario in cenarios_teste:
+            for cenario in self.cenarios:
                 self.resultados[tipo_servidor][cenario['nome']] = {}
                 
-                for num_clientes in clientes_teste:
-                    #Realizar multiplas execucoes para calcular estatisticas
-                    execucoes_resultados = []
-                    
-                    for execucao in range(execucoes_por_teste):
-                        testador = TestadorCarga(ip_servidor)
-                        resultado = testador.teste_concorrente(
-                            num_clientes, 
-                            requisicoes_por_cliente,
-                            'GET',
-                            cenario['caminho']
-                        )
-                        execucoes_resultados.append(resultado)
-                        
-                        #Pequena pausa entre execucoes para evitar sobrecarga
-                        time.sleep(0.5)
-                    
+                for num_clientes in self.lista_clientes:
                     #Calcular estatisticas das multiplas execucoes
-                    self.resultados[tipo_servidor][cenario['nome']][num_clientes] = self.calcular_estatisticas(execucoes_resultados)
+                    execucoes_resultados = execucoes_por_celula.get(tipo_servidor, {}).get(cenario['nome'], {}).get(num_clientes)
+                    if execucoes_resultados:
+                        self.resultados[tipo_servidor][cenario['nome']][num_clientes] = self.calcular_estatisticas(execucoes_resultados)
         
         self.salvar_resultados()
+        self.exportar_rastros(execucoes_por_celula)
         self.gerar_comparacao()
+        
+        #Rodada concluida: o arquivo de execucoes em andamento e arquivado
+        if armazenamento is not None:
+            arquivo_arquivado = armazenamento.arquivar()
+            if arquivo_arquivado:
+                print(Cores.info(f"Execucoes brutas arquivadas em {arquivo_arquivado}"))
+    
+    def exportar_rastros(self, execucoes_por_celula):
+        #Grava uma linha por requisicao (instante, cliente, fases, status, thread do servidor) para as series temporais
+        try:
+            caminho = salvar_rastros(tabela_rastros(execucoes_por_celula), self.diretorio_resultados)
+            print(Cores.sucesso(f"Rastros por requisicao salvos em {caminho}"))
+        except Exception as e:
+            print(Cores.erro(f"Falha ao exportar rastros: {e}"))
     
     def calcular_estatisticas(self, execucoes_resultados):
-        #Calcula media e desvio padrao das multiplas execucoes
+        #Calcula media, desvio padrao, IC de 95% e percentis das multiplas execucoes
+        #As requisicoes sao convertidas uma vez em colunas NumPy e agregadas por execucao sem lacos em Python
         if not execucoes_resultados:
             return None
-            
-        #Extrair metricas de cada execucao
-        throughputs = []
-        tempos_resposta_medios = []
-        taxas_sucesso = []
-        tempos_totais = []
         
+        num_execucoes = len(execucoes_resultados)
+        colunas = colunas_execucoes(execucoes_resultados)
+        execucao = colunas['execucao']
+        sucesso = colunas['sucesso']
+        tempo_total = colunas['tempo_total']
+        
+        #Throughput e taxa de sucesso por execucao (somas dos trechos contiguos de cada execucao)
+        sucessos = somar_por_execucao(sucesso, colunas['quantidades'])
+        totais = colunas['quantidades']
+        throughputs = throughputs_execucoes(colunas)
+        taxas_sucesso = np.divide(sucessos * 100, totais, out=np.zeros(num_execucoes), where=totais > 0)
+        
+        #Tempo de resposta medio das requisicoes bem-sucedidas de cada execucao
+        tempos_resposta_medios, _ = media_por_execucao(execucao, colunas['tempo_resposta'], sucesso, num_execucoes)
+        
+        #Decomposicao pelo cabecalho Server-Timing: fila no servidor (aceite ate o inicio do atendimento),
+        #servico (leitura, parse, handler e serializacao) e o restante (rede, backlog do kernel e envio)
+        com_tempos = sucesso & ~np.isnan(colunas['total_servidor'])
+        servico = colunas['total_servidor'] - colunas['fila']
+        rede = np.maximum(0, colunas['tempo_resposta'] - colunas['total_servidor'])
+        tempos_fila, quantidades = media_por_execucao(execucao, colunas['fila'], com_tempos, num_execucoes)
+        tempos_servico, _ = media_por_execucao(execucao, servico, com_tempos, num_execucoes)
+        tempos_rede, _ = media_por_execucao(execucao, rede, com_tempos, num_execucoes)
+        reportadas = quantidades > 0
+        
+        #Recursos do servidor amostrados durante a execucao (ausentes em rodadas sem amostragem)
+        cpus_media, rss_pico, threads_pico, fds_pico, trocas_contexto = [], [], [], [], []
         for resultado in execucoes_resultados:
-            #Calcular throughput básico
-            sucessos = len([r for r in resultado['resultados'] if r['sucesso']])
-            throughput = sucessos / resultado['tempo_total'] if resultado['tempo_total'] > 0 else 0
-            throughputs.append(throughput)
-            
-            #Calcular tempo de resposta medio
-            tempos_resposta = [r['tempo_resposta'] for r in resultado['resultados'] if r['sucesso']]
-            tempo_medio = statistics.mean(tempos_resposta) if tempos_resposta else 0
-            tempos_resposta_medios.append(tempo_medio)
-            
-            #Calcular taxa de sucesso
-            total = len(resultado['resultados'])
-            taxa = (sucessos / total * 100) if total > 0 else 0
-            taxas_sucesso.append(taxa)
-            
-            #Tempo total
-            tempos_totais.append(resultado['tempo_total'])
+            amostras = resultado.get('recursos')
+            if amostras:
+                cpus_media.append(np.mean([a['cpu_percentual'] for a in amostras]))
+                rss_pico.append(max(a['rss_mb'] for a in amostras))
+                threads_pico.append(max(a['threads'] for a in amostras))
+                fds_pico.append(max(a['fds'] for a in amostras))
+                trocas_contexto.append(sum(a['trocas_contexto_voluntarias'] + a['trocas_contexto_involuntarias'] for a in amostras))
         
-        #Calcular estatisticas finais
+        #Calcular estatisticas finais (com IC bootstrap para as metricas comparadas entre servidores)
         resultado_estatistico = {
-            'throughput': {
-                'media': statistics.mean(throughputs),
-                'desvio_padrao': statistics.stdev(throughputs) if len(throughputs) > 1 else 0,
-                'valores': throughputs
-            },
-            'tempo_resposta': {
-                'media': statistics.mean(tempos_resposta_medios),
-                'desvio_padrao': statistics.stdev(tempos_resposta_medios) if len(tempos_resposta_medios) > 1 else 0,
-                'valores': tempos_resposta_medios
-            },
-            'taxa_sucesso': {
-                'media': statistics.mean(taxas_sucesso),
-                'desvio_padrao': statistics.stdev(taxas_sucesso) if len(taxas_sucesso) > 1 else 0,
-                'valores': taxas_sucesso
-            },
-            'tempo_total': {
-                'media': statistics.mean(tempos_totais),
-                'desvio_padrao': statistics.stdev(tempos_totais) if len(tempos_totais) > 1 else 0,
-                'valores': tempos_totais
-            },
-            'execucoes': len(execucoes_resultados),
+            'throughput': resumir(throughputs),
+            'tempo_resposta': resumir(tempos_resposta_medios),
+            'taxa_sucesso': resumir(taxas_sucesso),
+            'tempo_total': resumir(tempo_total),
+            'tempo_fila': resumir(tempos_fila[reportadas]),
+            'tempo_servico': resumir(tempos_servico[reportadas]),
+            'tempo_rede': resumir(tempos_rede[reportadas]),
+            'cpu_percentual': resumir(cpus_media),
+            'rss_pico_mb': resumir(rss_pico),
+            'threads_pico': resumir(threads_pico),
+            'fds_pico': resumir(fds_pico),
+            'trocas_contexto': resumir(trocas_contexto),
+            'percentis_tempo_resposta': percentis(colunas['tempo_resposta'][sucesso]),
+            'execucoes': num_execucoes,
             'resultados_detalhados': execucoes_resultados  # Manter para compatibilidade
         }
+        for metrica in ('throughput', 'tempo_resposta'):
+            resultado_estatistico[metrica]['ic95_bootstrap'] = ic_bootstrap(resultado_estatistico[metrica]['valores'],
+                                                                            reamostragens_bootstrap)
         
         return resultado_estatistico
     
     def salvar_resultados(self):
         #Salva os resultados finais em arquivo TXT e CSV
-        os.makedirs('/app/resultados', exist_ok=True)
+        os.makedirs(self.diretorio_resultados, exist_ok=True)
         
-        #Primeiro gerar o arquivo CSV
+        #Primeiro gerar os arquivos CSV
         self.gerar_csv()
+        self.gerar_csv_comparacao()
         
-        nome_arquivo = '/app/resultados/resultados dos testes.txt'
+        nome_arquivo = os.path.join(self.diretorio_resultados, 'resultados dos testes.txt')
         
         with open(nome_arquivo, 'w', encoding='ascii', errors='ignore') as f:
             f.write(f"ID Personalizado: {ID_CUSTOMIZADO}\n")
+            if self.metadados:
+                f.write(f"Configuracao: {self.metadados['hash_configuracao']} "
+                        f"({self.requisicoes} requisicoes por cliente)\n")
             
             #Resumo detalhado por servidor
-            for tipo_servidor in ['sequencial', 'concorrente']:
+            for tipo_servidor in self.servidores or self.resultados:
                 if tipo_servidor in self.resultados:
                     f.write(f"\n{'='*80}\n")
                     f.write(f"SERVIDOR {tipo_servidor.upper()}\n")
@@ -251,18 +833,12 @@ class TestadorAutomatizado:
                     total_requisicoes = 0
                     total_sucessos = 0
                     
-                    for cenario in ['rapido', 'medio', 'lento']:
+                    for cenario in self.nomes_cenarios():
                         if cenario in self.resultados[tipo_servidor]:
-                            descricoes = {
-                                'rapido': 'Processamento Instantaneo',
-                                'medio': 'Processamento 0.5 segundos',
-                                'lento': 'Processamento 2.0 segundos'
-                            }
-                            
-                            f.write(f"\n[{cenario.upper()} - {descricoes[cenario]}]\n")
+                            f.write(f"\n[{cenario.upper()} - {self.descricao_cenario(cenario)}]\n")
                             f.write(f"{'-'*60}\n")
                             
-                            for num_clientes in clientes_teste:
+                            for num_clientes in self.lista_clientes:
                                 if num_clientes in self.resultados[tipo_servidor][cenario]:
                                     resultado = self.resultados[tipo_servidor][cenario][num_clientes]
                                     
@@ -294,7 +870,28 @@ class TestadorAutomatizado:
                                     f.write(f"    - Sucessos: {sucessos_teste} | Taxa de sucesso media: {taxa_sucesso_media:5.1f}%\n")
                                     f.write(f"    - Throughput medio: {throughput_medio:.3f} req/s\n")
                                     f.write(f"    - Tempo medio de resposta: {tempo_resposta_medio*1000:6.1f}ms\n")
+                                    percentis_resposta = resultado['percentis_tempo_resposta']
+                                    f.write(f"    - Percentis do tempo de resposta: " +
+                                            " | ".join(f"{nome} {valor*1000:.1f}ms" for nome, valor in percentis_resposta.items()) + "\n")
+                                    ic_throughput = resultado['throughput']['ic95']
+                                    ic_tempo = resultado['tempo_resposta']['ic95']
+                                    f.write(f"    - IC 95%: Throughput [{ic_throughput[0]:.3f}, {ic_throughput[1]:.3f}] req/s, "
+                                            f"Tempo [{ic_tempo[0]*1000:.1f}, {ic_tempo[1]*1000:.1f}]ms\n")
+                                    ic_throughput = resultado['throughput']['ic95_bootstrap']
+                                    ic_tempo = resultado['tempo_resposta']['ic95_bootstrap']
+                                    f.write(f"    - IC 95% bootstrap: Throughput [{ic_throughput[0]:.3f}, {ic_throughput[1]:.3f}] req/s, "
+                                            f"Tempo [{ic_tempo[0]*1000:.1f}, {ic_tempo[1]*1000:.1f}]ms\n")
                                     f.write(f"    - Tempo medio de execucao: {tempo_total_medio:.2f} segundos\n")
+                                    if resultado['tempo_fila']['valores']:
+                                        f.write(f"    - Decomposicao (Server-Timing): fila {resultado['tempo_fila']['media']*1000:.1f}ms"
+                                                f" | servico {resultado['tempo_servico']['media']*1000:.1f}ms"
+                                                f" | rede/backlog {resultado['tempo_rede']['media']*1000:.1f}ms\n")
+                                    if resultado['cpu_percentual']['valores']:
+                                        f.write(f"    - Recursos do servidor: CPU {resultado['cpu_percentual']['media']:.1f}%"
+                                                f" | RSS pico {resultado['rss_pico_mb']['media']:.1f}MB"
+                                                f" | threads pico {resultado['threads_pico']['media']:.0f}"
+                                                f" | fds pico {resultado['fds_pico']['media']:.0f}"
+                                                f" | trocas de contexto {resultado['trocas_contexto']['media']:.0f}\n")
                                     
                                     #Avaliacao qualitativa baseada no throughput medio
                                     if throughput_medio >= 50:
@@ -353,21 +950,15 @@ class TestadorAutomatizado:
                 f.write(f"\nFormato: [Cenario] Clientes -> Sequencial vs Concorrente (Diferenca)\n")
                 f.write(f"{'-'*80}\n")
                 
-                for cenario in ['rapido', 'medio', 'lento']:
+                for cenario in self.nomes_cenarios():
                     if (cenario in self.resultados['sequencial'] and 
                         cenario in self.resultados['concorrente']):
                         
-                        descricoes = {
-                            'rapido': 'Processamento Instantaneo',
-                            'medio': 'Processamento 0.5s',
-                            'lento': 'Processamento 2.0s'
-                        }
-                        
-                        f.write(f"\n[{cenario.upper()} - {descricoes[cenario]}]\n")
+                        f.write(f"\n[{cenario.upper()} - {self.descricao_cenario(cenario)}]\n")
                         
                         melhorias_cenario = []
                         
-                        for num_clientes in clientes_teste:
+                        for num_clientes in self.lista_clientes:
                             if (num_clientes in self.resultados['sequencial'][cenario] and 
                                 num_clientes in self.resultados['concorrente'][cenario]):
                                 
@@ -413,6 +1004,15 @@ class TestadorAutomatizado:
                                         f.write(f"SEQUENCIAL MAIS RAPIDO (+{abs(melhoria_tempo):5.1f}%)\n")
                                     else:
                                         f.write(f"SEQUENCIAL MUITO MAIS RAPIDO (+{abs(melhoria_tempo):5.1f}%)\n")
+                                    
+                                    #Significancia: com poucas execucoes e alta variancia a diferenca pode ser ruido
+                                    comparacao = self.comparar_servidores(cenario, num_clientes)
+                                    for metrica, rotulo in (('throughput', 'Throughput'), ('tempo_resposta', 'Tempo')):
+                                        teste = comparacao[metrica]
+                                        f.write(f"    > {rotulo}: diferenca {teste['diferenca_percentual']:+.1f}% "
+                                                f"IC95 bootstrap [{teste['ic95_diferenca'][0]:+.1f}%, {teste['ic95_diferenca'][1]:+.1f}%] | "
+                                                f"p Mann-Whitney {teste['p_mann_whitney']:.4f} | p Welch {teste['p_welch']:.4f} -> "
+                                                f"{teste['conclusao'].upper()}\n")
                                 else:
                                     f.write(f"    > ERRO: Não foi possível comparar (falhas nas requisições)\n")
                                 
@@ -442,27 +1042,36 @@ class TestadorAutomatizado:
         """Gera arquivo CSV com todos os resultados dos testes incluindo estatisticas"""
         import csv
         
-        nome_arquivo_csv = '/app/resultados/resultados_completos.csv'
+        nome_arquivo_csv = os.path.join(self.diretorio_resultados, 'resultados_completos.csv')
         
         try:
             with open(nome_arquivo_csv, 'w', newline='', encoding='utf-8') as csvfile:
                 fieldnames = [
-                    'servidor', 'cenario', 'num_clientes', 'execucoes',
+                    'servidor', 'cenario', 'num_clientes', 'requisicoes_por_cliente', 'execucoes',
                     'throughput_media', 'throughput_desvio', 
                     'tempo_resposta_media', 'tempo_resposta_desvio',
                     'taxa_sucesso_media', 'taxa_sucesso_desvio',
-                    'tempo_total_media', 'tempo_total_desvio'
+                    'tempo_total_media', 'tempo_total_desvio',
+                    'throughput_ic95_inf', 'throughput_ic95_sup',
+                    'tempo_resposta_ic95_inf', 'tempo_resposta_ic95_sup',
+                    'throughput_ic95_bootstrap_inf', 'throughput_ic95_bootstrap_sup',
+                    'tempo_resposta_ic95_bootstrap_inf', 'tempo_resposta_ic95_bootstrap_sup',
+                    'tempo_resposta_p50', 'tempo_resposta_p90', 'tempo_resposta_p95', 'tempo_resposta_p99',
+                    'tempo_fila_media', 'tempo_fila_desvio',
+                    'tempo_servico_media', 'tempo_servico_desvio',
+                    'tempo_rede_media', 'tempo_rede_desvio',
+                    'cpu_media', 'cpu_desvio', 'rss_pico_mb', 'threads_pico', 'fds_pico', 'trocas_contexto'
                 ]
                 
                 writer = csv.DictWriter(csvfile, fieldnames=fieldnames)
                 writer.writeheader()
                 
                 #Processar dados de cada servidor
-                for tipo_servidor in ['sequencial', 'concorrente']:
+                for tipo_servidor in self.servidores or self.resultados:
                     if tipo_servidor in self.resultados:
-                        for cenario in ['rapido', 'medio', 'lento']:
+                        for cenario in self.nomes_cenarios():
                             if cenario in self.resultados[tipo_servidor]:
-                                for num_clientes in clientes_teste:
+                                for num_clientes in self.lista_clientes:
                                     if num_clientes in self.resultados[tipo_servidor][cenario]:
                                         resultado = self.resultados[tipo_servidor][cenario][num_clientes]
                                         
@@ -471,6 +1080,7 @@ class TestadorAutomatizado:
                                             'servidor': tipo_servidor,
                                             'cenario': cenario,
                                             'num_clientes': num_clientes,
+                                            'requisicoes_por_cliente': self.requisicoes,
                                             'execucoes': resultado['execucoes'],
                                             'throughput_media': round(resultado['throughput']['media'], 3),
                                             'throughput_desvio': round(resultado['throughput']['desvio_padrao'], 3),
@@ -479,24 +1089,59 @@ class TestadorAutomatizado:
                                             'taxa_sucesso_media': round(resultado['taxa_sucesso']['media'], 1),
                                             'taxa_sucesso_desvio': round(resultado['taxa_sucesso']['desvio_padrao'], 1),
                                             'tempo_total_media': round(resultado['tempo_total']['media'], 2),
-                                            'tempo_total_desvio': round(resultado['tempo_total']['desvio_padrao'], 2)
+                                            'tempo_total_desvio': round(resultado['tempo_total']['desvio_padrao'], 2),
+                                            'throughput_ic95_inf': round(resultado['throughput']['ic95'][0], 3),
+                                            'throughput_ic95_sup': round(resultado['throughput']['ic95'][1], 3),
+                                            'tempo_resposta_ic95_inf': round(resultado['tempo_resposta']['ic95'][0] * 1000, 1),  # em ms
+                                            'tempo_resposta_ic95_sup': round(resultado['tempo_resposta']['ic95'][1] * 1000, 1),  # em ms
+                                            'throughput_ic95_bootstrap_inf': round(resultado['throughput']['ic95_bootstrap'][0], 3),
+                                            'throughput_ic95_bootstrap_sup': round(resultado['throughput']['ic95_bootstrap'][1], 3),
+                                            'tempo_resposta_ic95_bootstrap_inf': round(resultado['tempo_resposta']['ic95_bootstrap'][0] * 1000, 1),  # em ms
+                                            'tempo_resposta_ic95_bootstrap_sup': round(resultado['tempo_resposta']['ic95_bootstrap'][1] * 1000, 1),  # em ms
+                                            **{f'tempo_resposta_{nome}': round(valor * 1000, 1)  # em ms
+                                               for nome, valor in resultado['percentis_tempo_resposta'].items()},
+                                            'tempo_fila_media': round(resultado['tempo_fila']['media'] * 1000, 3),  # em ms
+                                            'tempo_fila_desvio': round(resultado['tempo_fila']['desvio_padrao'] * 1000, 3),  # em ms
+                                            'tempo_servico_media': round(resultado['tempo_servico']['media'] * 1000, 3),  # em ms
+                                            'tempo_servico_desvio': round(resultado['tempo_servico']['desvio_padrao'] * 1000, 3),  # em ms
+                                            'tempo_rede_media': round(resultado['tempo_rede']['media'] * 1000, 3),  # em ms
+                                            'tempo_rede_desvio': round(resultado['tempo_rede']['desvio_padrao'] * 1000, 3),  # em ms
+                                            'cpu_media': round(resultado['cpu_percentual']['media'], 1),
+                                            'cpu_desvio': round(resultado['cpu_percentual']['desvio_padrao'], 1),
+                                            'rss_pico_mb': round(resultado['rss_pico_mb']['media'], 2),
+                                            'threads_pico': round(resultado['threads_pico']['media'], 1),
+                                            'fds_pico': round(resultado['fds_pico']['media'], 1),
+                                            'trocas_contexto': round(resultado['trocas_contexto']['media'], 1)
                                         })
             
-            pass  # Arquivo CSV gerado silenciosamente
+            self.metadados = salvar_metadados(nome_arquivo_csv, 'estatistico', self.servidores, self.cenarios,
+                                              self.configuracao(), self.contexto)
             
         except Exception as e:
             print(Cores.erro(f"Falha ao gerar CSV: {e}"))
     
+    def configuracao(self):
+        #Parametros que definem a matriz desta rodada (gravados nos metadados e no hash da configuracao)
+        return {
+            'requisicoes_por_cliente': self.requisicoes,
+            'clientes': self.lista_clientes,
+            'execucoes': self.execucoes,
+            'largura_ic_alvo': self.largura_ic_alvo,
+            'execucoes_maximas': execucoes_maximas if self.largura_ic_alvo else None,
+            'requisicoes_aquecimento': requisicoes_aquecimento,
+            'intervalo_amostragem_recursos': intervalo_amostragem_recursos
+        }
+    
     def gerar_comparacao(self):
         #Gera comparação entre servidores com estatisticas
         print(f"\n{Cores.CIANO}{Cores.NEGRITO}=== COMPARAÇÃO ENTRE SERVIDORES (ESTATÍSTICAS) ==={Cores.RESET}")
         
         if 'sequencial' in self.resultados and 'concorrente' in self.resultados:
-            for cenario in ['rapido', 'medio', 'lento']:
+            for cenario in self.nomes_cenarios():
                 if cenario in self.resultados['sequencial'] and cenario in self.resultados['concorrente']:
                     print(f"\n--- Cenário: {cenario} ---")
                     
-                    for num_clientes in clientes_teste:
+                    for num_clientes in self.lista_clientes:
                         if (num_clientes in self.resultados['sequencial'][cenario] and 
                             num_clientes in self.resultados['concorrente'][cenario]):
                             
@@ -513,8 +1158,566 @@ class TestadorAutomatizado:
                             print(f"    Concorrente: {conc_throughput:.3f} +/- {conc_desvio:.3f} req/s")
                             
                             if seq_throughput > 0:
-                                melhoria = ((conc_throughput - seq_throughput) / seq_throughput) * 100
-                                print(f"    Melhoria: {melhoria:.1f}%")
+                                teste = self.comparar_servidores(cenario, num_clientes)['throughput']
+                                print(f"    Melhoria: {teste['diferenca_percentual']:.1f}% "
+                                      f"(IC95 [{teste['ic95_diferenca'][0]:.1f}%, {teste['ic95_diferenca'][1]:.1f}%], "
+                                      f"p={teste['p_mann_whitney']:.3f}, {teste['conclusao']})")
+    
+    def comparar_servidores(self, cenario, num_clientes):
+        #Compara concorrente contra sequencial numa celula: diferenca percentual, IC bootstrap e testes de hipotese
+        #Calculada uma vez por celula: o bootstrap e caro e relatorio, CSV e console devem mostrar o mesmo IC
+        chave = (cenario, num_clientes)
+        if chave not in self.comparacoes:
+            seq = self.resultados['sequencial'][cenario][num_clientes]
+            conc = self.resultados['concorrente'][cenario][num_clientes]
+            self.comparacoes[chave] = {
+                metrica: comparar_amostras(seq[metrica]['valores'], conc[metrica]['valores'],
+                                           nivel_significancia, reamostragens_bootstrap)
+                for metrica in ('throughput', 'tempo_resposta')
+            }
+        return self.comparacoes[chave]
+    
+    def gerar_csv_comparacao(self):
+        #Gera o CSV da comparacao estatistica entre os servidores por celula
+        if 'sequencial' not in self.resultados or 'concorrente' not in self.resultados:
+            return
+        
+        nome_arquivo_csv = os.path.join(self.diretorio_resultados, 'comparacao_servidores.csv')
+        fieldnames = ['cenario', 'num_clientes', 'execucoes_sequencial', 'execucoes_concorrente']
+        for metrica in ('throughput', 'tempo_resposta'):
+            fieldnames += [f'{metrica}_diferenca_percentual', f'{metrica}_diferenca_ic95_inf', f'{metrica}_diferenca_ic95_sup',
+                           f'{metrica}_p_mann_whitney', f'{metrica}_p_welch', f'{metrica}_significativo', f'{metrica}_conclusao']
+        
+        try:
+            with open(nome_arquivo_csv, 'w', newline='', encoding='utf-8') as csvfile:
+                writer = csv.DictWriter(csvfile, fieldnames=fieldnames)
+                writer.writeheader()
+                
+                for cenario in self.nomes_cenarios():
+                    for num_clientes in self.lista_clientes:
+                        if (num_clientes not in self.resultados['sequencial'].get(cenario, {}) or
+                            num_clientes not in self.resultados['concorrente'].get(cenario, {})):
+                            continue
+                        
+                        linha = {
+                            'cenario': cenario,
+                            'num_clientes': num_clientes,
+                            'execucoes_sequencial': self.resultados['sequencial'][cenario][num_clientes]['execucoes'],
+                            'execucoes_concorrente': self.resultados['concorrente'][cenario][num_clientes]['execucoes']
+                        }
+                        for metrica, teste in self.comparar_servidores(cenario, num_clientes).items():
+                            linha.update({
+                                f'{metrica}_diferenca_percentual': round(teste['diferenca_percentual'], 2),
+                                f'{metrica}_diferenca_ic95_inf': round(teste['ic95_diferenca'][0], 2),
+                                f'{metrica}_diferenca_ic95_sup': round(teste['ic95_diferenca'][1], 2),
+                                f'{metrica}_p_mann_whitney': round(teste['p_mann_whitney'], 5),
+                                f'{metrica}_p_welch': round(teste['p_welch'], 5),
+                                f'{metrica}_significativo': teste['significativo'],
+                                f'{metrica}_conclusao': teste['conclusao']
+                            })
+                        writer.writerow(linha)
+        except Exception as e:
+            print(Cores.erro(f"Falha ao gerar CSV de comparacao: {e}"))
+
+class TestadorLocal:
+    #Base dos modos executados pelo harness local (testes/harness_local.py) nos motores de MOTORES
+    #Para cada item de configuracoes() o harness inicia os motores com as variaveis de ambiente dele, chama
+    #executar() com os enderecos e pids dos motores e os encerra; ao final chama gerar_csv()
+    def __init__(self, diretorio_resultados=None):
+        self.diretorio_resultados = diretorio_resultados or DIRETORIO_RESULTADOS
+        self.resultados = []
+    
+    def configuracoes(self):
+        #[(parametros, ambiente)]: parametros identificam a configuracao nos resultados e ambiente vai para os motores
+        return [({}, {})]
+    
+    def executar(self, enderecos, pids, parametros):
+        for servidor, endereco in enderecos.items():
+            descricao = ' '.join(f"{chave}={valor}" for chave, valor in parametros.items())
+            print(Cores.info(f"{servidor} em {endereco} {descricao}".rstrip()))
+            host, porta = separar_endereco(endereco)
+            self.executar_servidor(servidor, host, porta, pids.get(servidor), parametros)
+    
+    def executar_servidor(self, servidor, host, porta, pid, parametros):
+        raise NotImplementedError
+    
+    def gerar_csv(self):
+        raise NotImplementedError
+    
+    def resultados_por_servidor(self):
+        #Resultados agrupados por servidor, na ordem dos motores (varreduras com várias configurações os intercalam)
+        ordem = {}
+        for linha in self.resultados:
+            ordem.setdefault(linha['servidor'], len(ordem))
+        return sorted(self.resultados, key=lambda linha: ordem[linha['servidor']])
+    
+    def salvar_csv(self, nome_arquivo, campos, linhas, descricao):
+        #Grava as linhas (dicionarios com as colunas de campos) em diretorio_resultados/nome_arquivo
+        os.makedirs(self.diretorio_resultados, exist_ok=True)
+        caminho = os.path.join(self.diretorio_resultados, nome_arquivo)
+        with open(caminho, 'w', newline='', encoding='utf-8') as csvfile:
+            writer = csv.DictWriter(csvfile, fieldnames=campos)
+            writer.writeheader()
+            writer.writerows(linhas)
+        print(Cores.sucesso(f"{descricao}: {caminho}"))
+        return caminho
+
+class TestadorBacklog(TestadorLocal):
+    #Varre o tamanho do backlog do listen() e o accept em lote reiniciando os motores do harness a cada configuracao
+    #Mostra o efeito da fila do kernel: com backlog 1 os SYNs excedentes são descartados e o cliente
+    #só retransmite após ~1s, o que derruba o throughput do servidor sequencial a partir de 4 clientes
+    def __init__(self, caminho=caminho_teste_backlog, diretorio_resultados=None):
+        super().__init__(diretorio_resultados)
+        self.caminho = caminho
+
+    def configuracoes(self):
+        #Uma configuracao por backlog x lote, com as opções de socket passadas aos motores por variáveis de ambiente
+        return [({'backlog': backlog, 'lote_accept': lote_accept},
+                 {'BACKLOG_SEQUENCIAL': str(backlog), 'BACKLOG_CONCORRENTE': str(backlog), 'LOTE_ACCEPT': str(lote_accept)})
+                for backlog in backlogs_teste for lote_accept in lotes_accept_teste]
+
+    def executar_servidor(self, servidor, host, porta, pid, parametros):
+        #Executa a varredura de clientes no motor com o backlog e o lote da configuracao
+        calculador = TestadorAutomatizado()
+        monitor = MonitorResfriamento(host, porta)
+        monitor.aquecer()
+        for num_clientes in clientes_teste:
+            execucoes_resultados = []
+            for execucao in range(execucoes_por_backlog):
+                testador = TestadorCarga(host, porta)
+                execucoes_resultados.append(testador.teste_concorrente(
+                    num_clientes, requisicoes_por_cliente, 'GET', self.caminho))
+                monitor.aguardar_resfriamento()
+
+            estatisticas = calculador.calcular_estatisticas(execucoes_resultados)
+            self.resultados.append({
+                'servidor': servidor,
+                'backlog': parametros['backlog'],
+                'lote_accept': parametros['lote_accept'],
+                'num_clientes': num_clientes,
+                'estatisticas': estatisticas
+            })
+            print(f"    {num_clientes:4d} clientes: {estatisticas['throughput']['media']:8.2f} req/s | "
+                  f"{estatisticas['tempo_resposta']['media']*1000:8.1f} ms")
+
+    def gerar_csv(self):
+        #Salva a varredura em resultados_backlog.csv, agrupada por servidor
+        campos = [
+            'servidor', 'backlog', 'lote_accept', 'num_clientes', 'execucoes',
+            'throughput_media', 'throughput_desvio',
+            'tempo_resposta_media', 'tempo_resposta_desvio',
+            'taxa_sucesso_media', 'taxa_sucesso_desvio'
+        ]
+        linhas = []
+        for linha in self.resultados_por_servidor():
+            estatisticas = linha['estatisticas']
+            linhas.append({
+                'servidor': linha['servidor'],
+                'backlog': linha['backlog'],
+                'lote_accept': linha['lote_accept'],
+                'num_clientes': linha['num_clientes'],
+                'execucoes': estatisticas['execucoes'],
+                'throughput_media': round(estatisticas['throughput']['media'], 3),
+                'throughput_desvio': round(estatisticas['throughput']['desvio_padrao'], 3),
+                'tempo_resposta_media': round(estatisticas['tempo_resposta']['media'] * 1000, 1),  # em ms
+                'tempo_resposta_desvio': round(estatisticas['tempo_resposta']['desvio_padrao'] * 1000, 1),  # em ms
+                'taxa_sucesso_media': round(estatisticas['taxa_sucesso']['media'], 1),
+                'taxa_sucesso_desvio': round(estatisticas['taxa_sucesso']['desvio_padrao'], 1)
+            })
+        self.salvar_csv('resultados_backlog.csv', campos, linhas, "Varredura de backlog")
+
+class ClientesLentos:
+    #Mantem N conexoes abertas enviando uma linha de cabecalho a cada intervalo, sem nunca concluir a requisicao
+    #Uma unica thread atende todas as conexoes; as encerradas pelo servidor sao reabertas (e contadas)
+    def __init__(self, host, porta, quantidade, intervalo=intervalo_envio_lento):
+        self.host = host
+        self.porta = porta
+        self.quantidade = quantidade
+        self.intervalo = intervalo
+        self.conexoes = []
+        self.encerradas_pelo_servidor = 0
+        self.evento_parar = threading.Event()
+        self.thread = None
+    
+    def abrir(self):
+        try:
+            if self.host.startswith(PREFIXO_UNIX):
+                #Motor em socket Unix (separar_endereco devolve 'unix:/caminho' sem porta)
+                conexao = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+                conexao.settimeout(1)
+                try:
+                    conexao.connect(self.host[len(PREFIXO_UNIX):])
+                except OSError:
+                    conexao.close()
+                    raise
+            else:
+                conexao = socket.create_connection((self.host, self.porta), timeout=1)
+            conexao.sendall(f"GET {caminho_teste_slowloris} HTTP/1.1\r\nX-Custom-ID: {ID_CUSTOMIZADO}\r\n".encode('utf-8'))
+            self.conexoes.append(conexao)
+        except OSError:
+            pass  #Fila do listen() cheia: tenta de novo na proxima rodada
+    
+    def iniciar(self):
+        if self.quantidade <= 0:
+            return
+        self.evento_parar.clear()
+        self.thread = threading.Thread(target=self.laco, name='clientes-lentos', daemon=True)
+        self.thread.start()
+    
+    def laco(self):
+        while not self.evento_parar.is_set():
+            while len(self.conexoes) < self.quantidade and not self.evento_parar.is_set():
+                self.abrir()
+            if self.evento_parar.wait(self.intervalo):
+                break
+            for conexao in list(self.conexoes):
+                try:
+                    conexao.sendall(b"X-Lento: 1\r\n")
+                except OSError:
+                    #Encerrada pelo servidor (prazo expirado)
+                    self.encerradas_pelo_servidor += 1
+                    self.conexoes.remove(conexao)
+                    conexao.close()
+    
+    def parar(self):
+        self.evento_parar.set()
+        if self.thread is not None:
+            self.thread.join()
+            self.thread = None
+        for conexao in self.conexoes:
+            conexao.close()
+        self.conexoes = []
+
+class TestadorSlowloris(TestadorLocal):
+    #Mede a carga normal com e sem conexoes lentas, com e sem prazo de leitura dos cabecalhos
+    #Sem prazo, uma conexao lenta prende o servidor sequencial e uma thread do concorrente indefinidamente
+    def __init__(self, caminho=caminho_teste_slowloris, diretorio_resultados=None):
+        super().__init__(diretorio_resultados)
+        self.caminho = caminho
+    
+    def configuracoes(self):
+        #O prazo chega aos motores pela variável de ambiente PRAZO_CABECALHOS (0 = sem prazo)
+        return [({'prazo_cabecalhos': prazo}, {'PRAZO_CABECALHOS': str(prazo)}) for prazo in prazos_cabecalhos_slowloris]
+    
+    def executar_servidor(self, servidor, host, porta, pid, parametros):
+        #Executa a carga normal no motor para cada quantidade de conexoes lentas
+        calculador = TestadorAutomatizado()
+        for conexoes_lentas in conexoes_lentas_teste:
+            lentos = ClientesLentos(host, porta, conexoes_lentas)
+            amostrador = AmostradorRecursos(pid=pid, intervalo=intervalo_amostragem_recursos)
+            inicio_lentos = time.time()
+            lentos.iniciar()
+            time.sleep(intervalo_envio_lento)  #Conexoes lentas ja ocupando o servidor antes da carga
+            amostrador.iniciar()
+            execucoes_resultados = []
+            try:
+                for execucao in range(execucoes_por_slowloris):
+                    testador = TestadorCarga(host, porta)
+                    execucoes_resultados.append(testador.teste_concorrente(
+                        clientes_slowloris, requisicoes_por_cliente, 'GET', self.caminho))
+                if conexoes_lentas:
+                    time.sleep(max(0, duracao_minima_slowloris - (time.time() - inicio_lentos)))
+            finally:
+                amostras = amostrador.parar()
+                lentos.parar()
+            
+            estatisticas = calculador.calcular_estatisticas(execucoes_resultados)
+            self.resultados.append({
+                'servidor': servidor,
+                'prazo_cabecalhos': parametros['prazo_cabecalhos'],
+                'conexoes_lentas': conexoes_lentas,
+                'encerradas_por_prazo': lentos.encerradas_pelo_servidor,
+                'threads_pico': max((a['threads'] for a in amostras), default=0),
+                'estatisticas': estatisticas
+            })
+            print(f"    {conexoes_lentas:3d} conexoes lentas: {estatisticas['throughput']['media']:8.2f} req/s | "
+                  f"{estatisticas['tempo_resposta']['media']*1000:8.1f} ms | "
+                  f"sucesso {estatisticas['taxa_sucesso']['media']:5.1f}% | "
+                  f"{lentos.encerradas_pelo_servidor} lentas encerradas pelo servidor")
+            time.sleep(intervalo_envio_lento)  #Servidor livre das conexoes lentas antes da proxima celula
+    
+    def gerar_csv(self):
+        #Salva a varredura em resultados_slowloris.csv, agrupada por servidor
+        campos = [
+            'servidor', 'prazo_cabecalhos', 'conexoes_lentas', 'num_clientes', 'execucoes',
+            'throughput_media', 'throughput_desvio',
+            'tempo_resposta_media', 'tempo_resposta_p99',
+            'taxa_sucesso_media', 'encerradas_por_prazo', 'threads_pico'
+        ]
+        linhas = []
+        for linha in self.resultados_por_servidor():
+            estatisticas = linha['estatisticas']
+            linhas.append({
+                'servidor': linha['servidor'],
+                'prazo_cabecalhos': linha['prazo_cabecalhos'],
+                'conexoes_lentas': linha['conexoes_lentas'],
+                'num_clientes': clientes_slowloris,
+                'execucoes': estatisticas['execucoes'],
+                'throughput_media': round(estatisticas['throughput']['media'], 3),
+                'throughput_desvio': round(estatisticas['throughput']['desvio_padrao'], 3),
+                'tempo_resposta_media': round(estatisticas['tempo_resposta']['media'] * 1000, 1),  # em ms
+                'tempo_resposta_p99': round(estatisticas['percentis_tempo_resposta']['p99'] * 1000, 1),  # em ms
+                'taxa_sucesso_media': round(estatisticas['taxa_sucesso']['media'], 1),
+                'encerradas_por_prazo': linha['encerradas_por_prazo'],
+                'threads_pico': linha['threads_pico']
+            })
+        self.salvar_csv('resultados_slowloris.csv', campos, linhas, "Varredura de clientes lentos")
+
+class TestadorMistura(TestadorLocal):
+    #Executa misturas ponderadas de rotas e separa a latencia por rota dentro da mesma execucao
+    #Mede o bloqueio de cabeca de fila: no sequencial cada /lento atrasa todas as /rapido que chegam depois dele
+    #espera = tempo de resposta - handler (Server-Timing): tudo que a requisicao esperou fora do proprio manipulador
+    def __init__(self, misturas=None, diretorio_resultados=None):
+        super().__init__(diretorio_resultados)
+        self.misturas = misturas if misturas is not None else misturas_rotas
+    
+    def configuracoes(self):
+        return [({}, {'BACKLOG_SEQUENCIAL': str(backlog_mistura), 'BACKLOG_CONCORRENTE': str(backlog_mistura)})]
+    
+    def estatisticas_rotas(self, execucoes_resultados):
+        #{rota: estatisticas} com as requisicoes de todas as execucoes da mistura
+        por_rota = {}
+        for resultado in execucoes_resultados:
+            for requisicao in resultado['resultados']:
+                por_rota.setdefault(requisicao['rota'], []).append(requisicao)
+        
+        estatisticas = {}
+        for rota, requisicoes in por_rota.items():
+            validas = [r for r in requisicoes if r['sucesso'] and r['codigo_status'] == 200]
+            tempos = np.array([r['tempo_resposta'] for r in validas])
+            esperas = np.array([r['tempo_resposta'] - r['tempos_servidor'].get('handler', 0.0) for r in validas])
+            estatisticas[rota] = {
+                'requisicoes': len(requisicoes),
+                'taxa_sucesso': len(validas) * 100 / len(requisicoes),
+                'media': float(tempos.mean()) if tempos.size else 0.0,
+                'espera_media': float(esperas.mean()) if esperas.size else 0.0,
+                **percentis(tempos)
+            }
+        return estatisticas
+    
+    def executar_servidor(self, servidor, host, porta, pid, parametros):
+        #Executa cada mistura no motor
+        calculador = TestadorAutomatizado()
+        monitor = MonitorResfriamento(host, porta)
+        monitor.aquecer()
+        referencias = {}  #rota -> estatisticas na mistura que so contem essa rota
+        for mistura in self.misturas:
+            execucoes_resultados = []
+            for execucao in range(execucoes_por_mistura):
+                testador = TestadorCarga(host, porta)
+                execucoes_resultados.append(testador.teste_mistura(
+                    clientes_mistura, requisicoes_mistura_por_cliente, mistura['rotas'], semente_mistura + execucao))
+                monitor.aguardar_resfriamento()
+            
+            estatisticas = calculador.calcular_estatisticas(execucoes_resultados)
+            rotas = self.estatisticas_rotas(execucoes_resultados)
+            if len(mistura['rotas']) == 1:
+                referencias.update(rotas)
+            
+            print(f"    {mistura['nome']}: {estatisticas['throughput']['media']:8.2f} req/s")
+            for rota, valores in rotas.items():
+                referencia = referencias.get(rota)
+                for percentil in ('p50', 'p99'):
+                    valores[f'inflacao_{percentil}'] = (valores[percentil] / referencia[percentil]
+                                                        if referencia and referencia[percentil] else None)
+                self.resultados.append({
+                    'servidor': servidor,
+                    'mistura': mistura['nome'],
+                    'rota': rota,
+                    'peso': mistura['rotas'][rota],
+                    'throughput_mistura': estatisticas['throughput']['media'],
+                    'estatisticas': valores
+                })
+                #Cada razão é formatada separadamente: sem referência (ou com p99 de referência zero) vira '-'
+                inflacao = ' / '.join(f"{valores[chave]:6.1f}x" if valores[chave] is not None else '      -'
+                                      for chave in ('inflacao_p50', 'inflacao_p99'))
+                print(f"      {rota:10} {valores['requisicoes']:4d} req | p50 {valores['p50']*1000:8.1f} ms | "
+                      f"p99 {valores['p99']*1000:8.1f} ms | espera {valores['espera_media']*1000:8.1f} ms | "
+                      f"p50/p99 vs isolada {inflacao}")
+    
+    def gerar_csv(self):
+        #Salva uma linha por servidor, mistura e rota em resultados_mistura.csv
+        campos = [
+            'servidor', 'mistura', 'rota', 'peso', 'num_clientes', 'requisicoes', 'throughput_mistura',
+            'taxa_sucesso', 'tempo_resposta_media', 'tempo_resposta_p50', 'tempo_resposta_p95',
+            'tempo_resposta_p99', 'espera_media', 'inflacao_p50', 'inflacao_p99'
+        ]
+        linhas = []
+        for linha in self.resultados:
+            estatisticas = linha['estatisticas']
+            linhas.append({
+                'servidor': linha['servidor'],
+                'mistura': linha['mistura'],
+                'rota': linha['rota'],
+                'peso': linha['peso'],
+                'num_clientes': clientes_mistura,
+                'requisicoes': estatisticas['requisicoes'],
+                'throughput_mistura': round(linha['throughput_mistura'], 3),
+                'taxa_sucesso': round(estatisticas['taxa_sucesso'], 1),
+                'tempo_resposta_media': round(estatisticas['media'] * 1000, 1),  # em ms
+                'tempo_resposta_p50': round(estatisticas['p50'] * 1000, 1),  # em ms
+                'tempo_resposta_p95': round(estatisticas['p95'] * 1000, 1),  # em ms
+                'tempo_resposta_p99': round(estatisticas['p99'] * 1000, 1),  # em ms
+                'espera_media': round(estatisticas['espera_media'] * 1000, 1),  # em ms
+                'inflacao_p50': round(estatisticas['inflacao_p50'], 2) if estatisticas['inflacao_p50'] is not None else '',
+                'inflacao_p99': round(estatisticas['inflacao_p99'], 2) if estatisticas['inflacao_p99'] is not None else ''
+            })
+        self.salvar_csv('resultados_mistura.csv', campos, linhas, "Misturas de rotas")
+
+class TestadorPerfis(TestadorLocal):
+    #Executa os perfis de carga variáveis em cada motor do harness e reporta throughput e latência por segundo
+    #O ponto de saturação é o menor número de clientes que já alcança quase o maior throughput observado
+    def __init__(self, perfis=None, caminho=caminho_perfis, diretorio_resultados=None):
+        super().__init__(diretorio_resultados)
+        self.perfis = perfis if perfis is not None else perfis_carga
+        self.caminho = caminho
+        self.saturacoes = []
+    
+    def configuracoes(self):
+        return [({}, {'BACKLOG_SEQUENCIAL': str(backlog_perfis), 'BACKLOG_CONCORRENTE': str(backlog_perfis)})]
+    
+    def executar_servidor(self, servidor, host, porta, pid, parametros):
+        monitor = MonitorResfriamento(host, porta)
+        monitor.aquecer()
+        for perfil in self.perfis:
+            resultado = TestadorCarga(host, porta).teste_perfil(perfil, 'GET', self.caminho)
+            monitor.aguardar_resfriamento()
+            
+            print(f"    {perfil['nome']} ({resultado['total_requisicoes']} requisições)")
+            for ponto in resultado['series']:
+                print(f"      t={ponto['segundo']:3d}s {ponto['clientes']:3d} clientes | "
+                      f"{ponto['throughput']:5d} req/s | p50 {ponto['p50']*1000:8.1f} ms | "
+                      f"p99 {ponto['p99']*1000:8.1f} ms | sucesso {ponto['taxa_sucesso']:5.1f}%")
+                self.resultados.append({'servidor': servidor, 'perfil': perfil['nome'], **ponto})
+            
+            saturacao = detectar_saturacao(resultado['series'])
+            if saturacao:
+                rotulo = "Saturação em" if saturacao['saturado'] else "Sem saturação até"
+                print(Cores.info(f"    {rotulo} {saturacao['clientes']} clientes: "
+                                 f"{saturacao['throughput']:.1f} req/s (máximo {saturacao['throughput_maximo']:.1f}), "
+                                 f"p99 {saturacao['p99']*1000:.1f} ms"))
+                self.saturacoes.append({'servidor': servidor, 'perfil': perfil['nome'], **saturacao})
+    
+    def gerar_csv(self):
+        #Série por segundo em resultados_perfis.csv e o ponto de saturação de cada perfil em resultados_perfis_saturacao.csv
+        campos = [
+            'servidor', 'perfil', 'segundo', 'clientes', 'requisicoes', 'throughput', 'taxa_sucesso',
+            'tempo_resposta_media', 'tempo_resposta_p50', 'tempo_resposta_p95', 'tempo_resposta_p99'
+        ]
+        linhas = [{
+            'servidor': ponto['servidor'],
+            'perfil': ponto['perfil'],
+            'segundo': ponto['segundo'],
+            'clientes': ponto['clientes'],
+            'requisicoes': ponto['requisicoes'],
+            'throughput': ponto['throughput'],
+            'taxa_sucesso': round(ponto['taxa_sucesso'], 1),
+            'tempo_resposta_media': round(ponto['media'] * 1000, 1),  # em ms
+            'tempo_resposta_p50': round(ponto['p50'] * 1000, 1),  # em ms
+            'tempo_resposta_p95': round(ponto['p95'] * 1000, 1),  # em ms
+            'tempo_resposta_p99': round(ponto['p99'] * 1000, 1)  # em ms
+        } for ponto in self.resultados]
+        self.salvar_csv('resultados_perfis.csv', campos, linhas, "Perfis de carga")
+        
+        campos_saturacao = ['servidor', 'perfil', 'saturado', 'clientes_saturacao', 'throughput',
+                            'throughput_maximo', 'tempo_resposta_p99']
+        linhas_saturacao = [{
+            'servidor': saturacao['servidor'],
+            'perfil': saturacao['perfil'],
+            'saturado': saturacao['saturado'],
+            'clientes_saturacao': saturacao['clientes'],
+            'throughput': round(saturacao['throughput'], 1),
+            'throughput_maximo': round(saturacao['throughput_maximo'], 1),
+            'tempo_resposta_p99': round(saturacao['p99'] * 1000, 1)  # em ms
+        } for saturacao in self.saturacoes]
+        self.salvar_csv('resultados_perfis_saturacao.csv', campos_saturacao, linhas_saturacao, "Pontos de saturação")
+
+class TestadorCapacidade(TestadorLocal):
+    #Procura, para cada motor do harness e cenário, a maior taxa que mantém o p99 e a taxa de erro dentro do SLO
+    #e reporta a curva latência x taxa oferecida de todos os pontos testados (com o throughput obtido) e o joelho
+    def __init__(self, cenarios=None, slo=None, diretorio_resultados=None):
+        super().__init__(diretorio_resultados)
+        self.cenarios = cenarios if cenarios is not None else cenarios_capacidade
+        self.slo = slo if slo is not None else slo_capacidade
+        self.curvas = []
+    
+    def configuracoes(self):
+        return [({}, {'BACKLOG_SEQUENCIAL': str(backlog_capacidade), 'BACKLOG_CONCORRENTE': str(backlog_capacidade)})]
+    
+    def executar(self, enderecos, pids, parametros):
+        print(Cores.info(f"SLO: p99 <= {self.slo['p99']*1000:.0f} ms e erros <= {self.slo['taxa_erro']:.1f}%"))
+        super().executar(enderecos, pids, parametros)
+    
+    def executar_servidor(self, servidor, host, porta, pid, parametros):
+        monitor = MonitorResfriamento(host, porta)
+        monitor.aquecer()
+        for cenario in self.cenarios:
+            print(f"    {cenario['nome']}")
+            
+            def medir(taxa):
+                resultado = TestadorCarga(host, porta).teste_taxa(
+                    taxa, duracao_ponto_capacidade, 'GET', cenario['caminho'], clientes_maximos_capacidade)
+                monitor.aguardar_resfriamento()
+                ponto = avaliar_ponto(taxa, resultado, self.slo)
+                print(f"      {taxa:8.1f} req/s -> {ponto['throughput']:8.1f} req/s | "
+                      f"p99 {ponto['p99']*1000:8.1f} ms | erros {ponto['taxa_erro']:5.1f}% | "
+                      f"{'ok' if ponto['dentro_slo'] else 'viola SLO'}")
+                return ponto
+            
+            capacidade, limitada, pontos = buscar_capacidade(medir, taxa_inicial_capacidade, taxa_maxima_capacidade,
+                                                             precisao_capacidade)
+            joelho = detectar_joelho(pontos)
+            self.resultados.append({
+                'servidor': servidor,
+                'cenario': cenario['nome'],
+                'capacidade': capacidade,
+                'limitada': limitada,
+                'pontos_testados': len(pontos),
+                'joelho': joelho
+            })
+            for ponto in pontos:
+                self.curvas.append({'servidor': servidor, 'cenario': cenario['nome'], 'joelho': ponto is joelho, **ponto})
+            
+            texto = f"{'acima de ' if limitada else ''}{capacidade:.1f} req/s"
+            if joelho:
+                texto += f" | joelho em {joelho['taxa_alvo']:.1f} req/s (p99 {joelho['p99']*1000:.1f} ms)"
+            print(Cores.sucesso(f"    Capacidade {servidor}/{cenario['nome']}: {texto}"))
+    
+    def gerar_csv(self):
+        #Capacidade por servidor e cenário em resultados_capacidade.csv e todos os pontos em resultados_capacidade_curva.csv
+        campos = ['servidor', 'cenario', 'capacidade', 'limitada', 'slo_p99', 'slo_taxa_erro', 'pontos_testados',
+                  'joelho_taxa', 'joelho_p99']
+        linhas = [{
+            'servidor': linha['servidor'],
+            'cenario': linha['cenario'],
+            'capacidade': round(linha['capacidade'], 1),
+            'limitada': linha['limitada'],
+            'slo_p99': round(self.slo['p99'] * 1000, 1),  # em ms
+            'slo_taxa_erro': self.slo['taxa_erro'],
+            'pontos_testados': linha['pontos_testados'],
+            'joelho_taxa': round(linha['joelho']['taxa_alvo'], 1) if linha['joelho'] else '',
+            'joelho_p99': round(linha['joelho']['p99'] * 1000, 1) if linha['joelho'] else ''  # em ms
+        } for linha in self.resultados]
+        self.salvar_csv('resultados_capacidade.csv', campos, linhas, "Capacidade")
+        
+        campos_curva = ['servidor', 'cenario', 'taxa_alvo', 'throughput', 'requisicoes', 'taxa_erro',
+                        'tempo_resposta_p50', 'tempo_resposta_p95', 'tempo_resposta_p99', 'atraso_envio_maximo',
+                        'dentro_slo', 'joelho']
+        linhas_curva = [{
+            'servidor': ponto['servidor'],
+            'cenario': ponto['cenario'],
+            'taxa_alvo': round(ponto['taxa_alvo'], 1),
+            'throughput': round(ponto['throughput'], 1),
+            'requisicoes': ponto['requisicoes'],
+            'taxa_erro': round(ponto['taxa_erro'], 1),
+            'tempo_resposta_p50': round(ponto['p50'] * 1000, 1),  # em ms
+            'tempo_resposta_p95': round(ponto['p95'] * 1000, 1),  # em ms
+            'tempo_resposta_p99': round(ponto['p99'] * 1000, 1),  # em ms
+            'atraso_envio_maximo': round(ponto['atraso_envio_maximo'] * 1000, 1),  # em ms
+            'dentro_slo': ponto['dentro_slo'],
+            'joelho': ponto['joelho']
+        } for ponto in self.curvas]
+        self.salvar_csv('resultados_capacidade_curva.csv', campos_curva, linhas_curva, "Curva de capacidade")
 
 class TestadorProjeto:
     #Classe principal para testes do projeto
@@ -887,6 +2090,10 @@ class TestadorProjeto:
                         'tempo_max_ms': round(tempo_max, 1)
                     })
             
+            salvar_metadados(nome_arquivo_csv, 'basico', {servidor: None for servidor in resultados_concorrencia},
+                             [{'nome': 'medio', 'caminho': '/medio', 'descricao': 'Processamento 0.5 segundos'}],
+                             {'requisicoes_por_cliente': concorrencia_requisicoes, 'clientes': [concorrencia_clientes],
+                              'execucoes': 1})
             print(f"\n[SUCESSO] Arquivo CSV gerado: {nome_arquivo_csv}")
             
         except Exception as e:
@@ -907,13 +2114,23 @@ def main():
                        help='Executar apenas teste de concorrência')
     parser.add_argument('--completo', action='store_true',
                        help='Executar testes automatizados completos')
+    parser.add_argument('--reiniciar', action='store_true',
+                       help='Com --completo, descartar execucoes salvas de uma rodada interrompida')
+    parser.add_argument('--varredura', action='store_true',
+                       help='Com --completo, varrer o tempo de servico via /trabalho em vez dos cenarios fixos')
+    parser.add_argument('--adaptativo', action='store_true',
+                       help='Com --completo, repetir cada celula ate o IC95 do throughput atingir largura_relativa_ic_alvo')
     
     args = parser.parse_args()
     
     if args.completo:
         #Executar testes automatizados completos
-        testador_auto = TestadorAutomatizado()
-        testador_auto.executar_todos_testes()
+        cenarios = gerar_cenarios_varredura() if args.varredura else None
+        armazenamento = ArmazenamentoExecucoes()
+        if args.reiniciar:
+            armazenamento.limpar()
+        testador_auto = TestadorAutomatizado(cenarios, largura_ic_alvo=largura_relativa_ic_alvo if args.adaptativo else None)
+        testador_auto.executar_todos_testes(armazenamento=armazenamento)
     else:
         #Executar testes básicos
         testador = TestadorProjeto()
@@ -0,0 +1,149 @@
+#!/usr/bin/env python3
+#Testes de regressão do proxy reverso (servidor_proxy.py) contra réplicas locais iniciadas pelo harness
+#Cada teste imprime OK/FALHOU; o código de saída é o número de testes que falharam
+
+import os
+import sys
+import json
+import time
+import socket
+import tempfile
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from harness_local import HarnessLocal
+from teste_completo import Cores, separar_endereco
+from cliente import ClienteHTTP
+from servidor_proxy import ServidorProxy
+from configuracao import ID_CUSTOMIZADO
+
+#As réplicas fecham conexões ociosas após 1s; as esperas entre requisições passam disso
+TEMPO_OCIOSO_REPLICAS = 1
+ESPERA_OCIOSA = 1.5
+#Com 3 réplicas em round-robin, 10 POSTs reaproveitam 3 vezes a conexão de cada réplica (o bastante para ejetá-la
+#se cada conexão obsoleta contasse como falha, com PROXY_FALHAS_EJECAO = 3)
+POSTS_OCIOSOS = 10
+
+def status_proxy(cliente):
+    return json.loads(cliente.enviar_requisicao('GET', '/proxy/status')['corpo'])
+
+def teste_post_apos_ociosidade(diretorio_resultados, ocioso_pool):
+    #POSTs separados por mais que o tempo ocioso das réplicas: a conexão do pool já foi fechada pelo upstream e a
+    #requisição deve seguir por uma conexão nova, sem 502 e sem contar falha (que acabaria ejetando a réplica)
+    harness = HarnessLocal(['proxy_round_robin'], diretorio_resultados=diretorio_resultados,
+                           ambiente_extra={'TEMPO_OCIOSO_KEEPALIVE': str(TEMPO_OCIOSO_REPLICAS),
+                                           'PROXY_OCIOSO_POOL': str(ocioso_pool)})
+    try:
+        harness.iniciar_motores()
+        cliente = ClienteHTTP(*separar_endereco(harness.enderecos['proxy_round_robin']))
+        codigos = []
+        for _ in range(POSTS_OCIOSOS):
+            codigos.append(cliente.enviar_requisicao('POST', '/dados', corpo='abc')['codigo_status'])
+            time.sleep(ESPERA_OCIOSA)
+        upstreams = status_proxy(cliente)['upstreams']
+    finally:
+        harness.encerrar()
+
+    falhas = sum(u['falhas'] for u in upstreams)
+    ejecoes = sum(u['ejecoes'] for u in upstreams)
+    sucesso = codigos == [200] * len(codigos) and falhas == 0 and ejecoes == 0
+    print(f"  códigos {codigos} | falhas {falhas} | ejeções {ejecoes}")
+    return sucesso
+
+def upstream_sem_resposta():
+    #Socket em escuta com a fila de aceitação cheia: o kernel descarta os SYNs seguintes e o connect expira
+    escuta = socket.socket()
+    escuta.bind(('127.0.0.1', 0))
+    escuta.listen(0)
+    ocupantes = []
+    for _ in range(2):
+        ocupante = socket.socket()
+        ocupante.setblocking(False)
+        ocupante.connect_ex(escuta.getsockname())
+        ocupantes.append(ocupante)
+    time.sleep(0.2)
+    return escuta.getsockname(), [escuta] + ocupantes
+
+def upstream_recusando():
+    #Porta sem ninguém escutando: o connect é recusado
+    livre = socket.socket()
+    livre.bind(('127.0.0.1', 0))
+    endereco = livre.getsockname()
+    livre.close()
+    return endereco, []
+
+def teste_upstream_inacessivel(diretorio_resultados, criar_inacessivel, metodo):
+    #Connect recusado ou expirado não chega a entregar a requisição: ela segue para a próxima réplica (mesmo POST),
+    #conta uma falha para a réplica inacessível e nenhuma conexão aberta
+    harness = HarnessLocal(['concorrente'], diretorio_resultados=diretorio_resultados)
+    inacessivel, sockets = criar_inacessivel()
+    try:
+        harness.iniciar_motores()
+        replica = separar_endereco(harness.enderecos['concorrente'])
+        proxy = ServidorProxy(upstreams=[inacessivel, replica], estrategia='round_robin')
+        dados = (f"{metodo} /dados HTTP/1.1\r\nHost: localhost\r\nX-Custom-ID: {ID_CUSTOMIZADO}\r\n"
+                 f"Content-Length: 3\r\n\r\nabc").encode('utf-8')
+        (cabecalhos, _), upstream = proxy.encaminhar(dados, metodo != 'POST')
+    finally:
+        harness.encerrar()
+        for s in sockets:
+            s.close()
+
+    linha_status = cabecalhos.split(b'\r\n', 1)[0].decode('latin-1')
+    estatisticas = proxy.balanceador.estatisticas()['upstreams'][0]
+    print(f"  {linha_status} via {upstream.endereco()} | réplica inacessível: falhas {estatisticas['falhas']}, "
+          f"conexões abertas {estatisticas['conexoes_abertas']}")
+    return (linha_status.startswith('HTTP/1.1 200') and (upstream.host, upstream.porta) == replica
+            and estatisticas['falhas'] == 1 and estatisticas['conexoes_abertas'] == 0)
+
+def teste_502_linha_status_ascii():
+    #Sem upstream acessível o proxy responde 502 com a frase padrão (ASCII) na linha de status e o detalhe no JSON
+    proxy = ServidorProxy(upstreams=[upstream_recusando()[0]], estrategia='round_robin')
+    lado_cliente, lado_proxy = socket.socketpair()
+    try:
+        lado_cliente.sendall(f"POST /dados HTTP/1.1\r\nHost: localhost\r\nX-Custom-ID: {ID_CUSTOMIZADO}\r\n"
+                             f"Content-Length: 3\r\n\r\nabc".encode('utf-8'))
+        proxy.processar_requisicao(lado_proxy, ('127.0.0.1', 0), 1)
+        resposta = b''
+        while True:
+            parte = lado_cliente.recv(65536)
+            if not parte:
+                break
+            resposta += parte
+    finally:
+        lado_cliente.close()
+
+    bruto_cabecalhos, _, corpo = resposta.partition(b'\r\n\r\n')
+    linha_status = bruto_cabecalhos.split(b'\r\n', 1)[0]
+    mensagem = json.loads(corpo)['mensagem']
+    print(f"  {linha_status!r} | mensagem: {mensagem}")
+    return linha_status == b'HTTP/1.1 502 Bad Gateway' and mensagem == "nenhum upstream respondeu"
+
+def main():
+    diretorio_resultados = tempfile.mkdtemp(prefix='teste_proxy_')  #Logs dos motores (fora de resultados/)
+    testes = [
+        #Pool sem expiração: a conexão reaproveitada recebe só o EOF e é trocada por uma nova
+        ("POST após ociosidade (conexão obsoleta no pool)",
+         lambda: teste_post_apos_ociosidade(diretorio_resultados, ocioso_pool=3600)),
+        #Expiração abaixo do tempo ocioso das réplicas: a conexão nem chega a ser reaproveitada
+        ("POST após ociosidade (conexão expirada no pool)",
+         lambda: teste_post_apos_ociosidade(diretorio_resultados, ocioso_pool=TEMPO_OCIOSO_REPLICAS / 2)),
+        #Réplica inacessível antes da saudável: a requisição chega à saudável, sem 504 nem 502
+        ("POST com connect expirado na primeira réplica",
+         lambda: teste_upstream_inacessivel(diretorio_resultados, upstream_sem_resposta, 'POST')),
+        ("POST com connect recusado na primeira réplica",
+         lambda: teste_upstream_inacessivel(diretorio_resultados, upstream_recusando, 'POST')),
+        ("502 com linha de status ASCII", teste_502_linha_status_ascii),
+    ]
+    falharam = 0
+    for nome, teste in testes:
+        print(Cores.info(nome))
+        if teste():
+            print(Cores.sucesso("OK"))
+        else:
+            print(Cores.erro("FALHOU"))
+            falharam += 1
+    return falharam
+
+if __name__ == "__main__":
+    sys.exit(main())